@@ -1,9 +1,19 @@
 import os
-import psycopg2
-import pymongo
-import mysql.connector
+import sys
+import sqlite3
+import secrets
+import hashlib
+import threading
+from collections import namedtuple
+from urllib.parse import urlsplit
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from cryptography.fernet import Fernet
 
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "src"))
+from tata_common.config import DEFAULT_ENV_FILE, parse_env_file
+
 # Generate and store encryption key for password security
 def generate_key():
     return Fernet.generate_key()
@@ -22,82 +32,300 @@ def decrypt_password(encrypted_password, key):
 def generate_core_name(core_name, db_type):
     return f"{core_name}_{db_type}".upper()
 
-# Set up PostgreSQL database
-def setup_postgresql_db(user, password, db_name, host, port):
-    try:
-        conn = psycopg2.connect(
-            dbname=db_name,
-            user=user,
-            password=password,
-            host=host,
-            port=port
-        )
-        print(f"PostgreSQL DB '{db_name}' setup successful.")
-        conn.close()
-    except Exception as e:
-        print(f"Error setting up PostgreSQL DB: {e}")
-
-# Set up MongoDB database
-def setup_mongodb_db(user, password, db_name, host, port):
-    try:
-        client = pymongo.MongoClient(f"mongodb://{user}:{password}@{host}:{port}/")
-        db = client[db_name]
-        print(f"MongoDB DB '{db_name}' setup successful.")
-        client.close()
-    except Exception as e:
-        print(f"Error setting up MongoDB DB: {e}")
-
-# Set up MySQL database
-def setup_mysql_db(user, password, db_name, host, port):
-    try:
-        conn = mysql.connector.connect(
-            user=user,
-            password=password,
-            host=host,
-            database=db_name,
-            port=port
-        )
-        print(f"MySQL DB '{db_name}' setup successful.")
-        conn.close()
-    except Exception as e:
-        print(f"Error setting up MySQL DB: {e}")
+# What one core needs from its backend; `backend` is a key into the backends mapping
+DatabaseSpec = namedtuple("DatabaseSpec", ["core", "backend", "db_name", "user", "encrypted_password"])
+
+# Provisioning steps, in the order they must be applied
+ACTIONS = ("create_database", "create_user", "grant_privileges")
+
+# Compare existing state with the spec and return only the missing steps
+def plan_actions(state):
+    return [action for action, present in zip(ACTIONS, (state["database"], state["user"], state["privileges"]))
+            if not present]
+
+def quote_mysql(identifier):
+    return "`" + identifier.replace("`", "``") + "`"
+
+# Set up PostgreSQL databases over a pool of admin connections
+class PostgresBackend:
+    def __init__(self, host, port, user, password, max_connections=4):
+        from psycopg2 import pool, sql
+        self.sql = sql
+        self.pool = pool.ThreadedConnectionPool(1, max_connections, dbname="postgres", user=user,
+                                                password=password, host=host, port=port)
+
+    @contextmanager
+    def cursor(self):
+        conn = self.pool.getconn()
+        try:
+            conn.autocommit = True  # CREATE DATABASE cannot run inside a transaction
+            with conn.cursor() as cur:
+                yield cur
+        finally:
+            self.pool.putconn(conn)
+
+    def inspect(self, spec):
+        with self.cursor() as cur:
+            cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (spec.db_name,))
+            database = cur.fetchone() is not None
+            cur.execute("SELECT 1 FROM pg_roles WHERE rolname = %s", (spec.user,))
+            user = cur.fetchone() is not None
+            privileges = False
+            if database and user:
+                # A list of privileges is true if any one is held, and PUBLIC has CONNECT and TEMPORARY
+                cur.execute("SELECT has_database_privilege(%(user)s, %(db)s, 'CREATE') "
+                            "AND has_database_privilege(%(user)s, %(db)s, 'CONNECT') "
+                            "AND has_database_privilege(%(user)s, %(db)s, 'TEMPORARY')",
+                            {"user": spec.user, "db": spec.db_name})
+                privileges = cur.fetchone()[0]
+        return {"database": database, "user": user, "privileges": privileges}
+
+    def apply(self, spec, actions, password):
+        sql = self.sql
+        with self.cursor() as cur:
+            if "create_database" in actions:
+                cur.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(spec.db_name)))
+            if "create_user" in actions:
+                cur.execute(sql.SQL("CREATE ROLE {} LOGIN PASSWORD %s").format(sql.Identifier(spec.user)),
+                            (password,))
+            if "grant_privileges" in actions:
+                cur.execute(sql.SQL("GRANT ALL PRIVILEGES ON DATABASE {} TO {}").format(
+                    sql.Identifier(spec.db_name), sql.Identifier(spec.user)))
+
+    def close(self):
+        self.pool.closeall()
+
+# Set up MySQL databases over a pool of admin connections
+class MySQLBackend:
+    def __init__(self, host, port, user, password, max_connections=4):
+        from mysql.connector import pooling
+        self.pool = pooling.MySQLConnectionPool(pool_name=f"tata_admin_{host}_{port}", pool_size=max_connections,
+                                                host=host, port=port, user=user, password=password)
+
+    @contextmanager
+    def cursor(self):
+        conn = self.pool.get_connection()
+        try:
+            cur = conn.cursor()
+            try:
+                yield cur
+                conn.commit()
+            finally:
+                cur.close()
+        finally:
+            conn.close()  # returns the connection to the pool
+
+    def inspect(self, spec):
+        with self.cursor() as cur:
+            cur.execute("SELECT 1 FROM information_schema.SCHEMATA WHERE SCHEMA_NAME = %s", (spec.db_name,))
+            database = cur.fetchone() is not None
+            cur.execute("SELECT 1 FROM mysql.user WHERE user = %s AND host = %s", (spec.user, "%"))
+            user = cur.fetchone() is not None
+            cur.execute("SELECT 1 FROM information_schema.SCHEMA_PRIVILEGES WHERE GRANTEE = %s AND TABLE_SCHEMA = %s "
+                        "LIMIT 1", (f"'{spec.user}'@'%'", spec.db_name))
+            privileges = cur.fetchone() is not None
+        return {"database": database, "user": user, "privileges": privileges}
+
+    def apply(self, spec, actions, password):
+        with self.cursor() as cur:
+            if "create_database" in actions:
+                cur.execute(f"CREATE DATABASE {quote_mysql(spec.db_name)}")
+            if "create_user" in actions:
+                cur.execute("CREATE USER %s@%s IDENTIFIED BY %s", (spec.user, "%", password))
+            if "grant_privileges" in actions:
+                cur.execute(f"GRANT ALL PRIVILEGES ON {quote_mysql(spec.db_name)}.* TO %s@%s", (spec.user, "%"))
+
+    def close(self):
+        pass  # pooled connections are closed when the pool is garbage collected
+
+# Set up MongoDB databases; MongoClient pools connections itself, and any
+# compatible client (e.g. mongomock.MongoClient()) can be passed in instead
+class MongoBackend:
+    def __init__(self, host=None, port=None, user=None, password=None, max_connections=4, client=None):
+        if client is None:
+            import pymongo
+            client = pymongo.MongoClient(host=host, port=port, username=user, password=password,
+                                         maxPoolSize=max_connections)
+        self.client = client
+
+    def inspect(self, spec):
+        database = spec.db_name in self.client.list_database_names()
+        users = self.client[spec.db_name].command("usersInfo", spec.user).get("users", [])
+        user = bool(users)
+        privileges = any(role.get("db") == spec.db_name and role.get("role") in ("readWrite", "dbOwner")
+                         for found in users for role in found.get("roles", []))
+        return {"database": database, "user": user, "privileges": privileges}
+
+    def apply(self, spec, actions, password):
+        db = self.client[spec.db_name]
+        if "create_database" in actions:
+            # MongoDB only lists a database once it holds data, so record who provisioned it
+            db["_tata_meta"].update_one({"_id": "provisioning"}, {"$set": {"core": spec.core}}, upsert=True)
+        if "create_user" in actions:
+            db.command("createUser", spec.user, pwd=password, roles=[{"role": "readWrite", "db": spec.db_name}])
+        elif "grant_privileges" in actions:
+            db.command("grantRolesToUser", spec.user, roles=[{"role": "readWrite", "db": spec.db_name}])
+
+    def close(self):
+        self.client.close()
+
+# Local stand-in for the SQL backends: each database is a SQLite file under
+# `directory` and users/grants live in a catalog database next to them
+class SQLiteBackend:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.catalog = sqlite3.connect(os.path.join(directory, "_catalog.sqlite"), check_same_thread=False)
+        with self.lock, self.catalog:
+            self.catalog.execute("CREATE TABLE IF NOT EXISTS users (name TEXT PRIMARY KEY, password_hash TEXT)")
+            self.catalog.execute("CREATE TABLE IF NOT EXISTS grants (user TEXT, db TEXT, PRIMARY KEY (user, db))")
+
+    def _db_path(self, db_name):
+        return os.path.join(self.directory, f"{db_name}.sqlite")
+
+    def inspect(self, spec):
+        with self.lock:
+            user = self.catalog.execute("SELECT 1 FROM users WHERE name = ?", (spec.user,)).fetchone() is not None
+            privileges = self.catalog.execute("SELECT 1 FROM grants WHERE user = ? AND db = ?",
+                                              (spec.user, spec.db_name)).fetchone() is not None
+        return {"database": os.path.exists(self._db_path(spec.db_name)), "user": user, "privileges": privileges}
+
+    def apply(self, spec, actions, password):
+        if "create_database" in actions:
+            sqlite3.connect(self._db_path(spec.db_name)).close()
+        with self.lock, self.catalog:
+            if "create_user" in actions:
+                self.catalog.execute("INSERT INTO users VALUES (?, ?)",
+                                     (spec.user, hashlib.sha256(password.encode()).hexdigest()))
+            if "grant_privileges" in actions:
+                self.catalog.execute("INSERT INTO grants VALUES (?, ?)", (spec.user, spec.db_name))
+
+    def close(self):
+        self.catalog.close()
+
+# Provision one core: inspect, diff, apply only what is missing. A user with no
+# configured password gets a generated one, saved before the user is created.
+def provision_core(spec, backend, key, dry_run=False, save_password=None):
+    state = backend.inspect(spec)
+    actions = plan_actions(state)
+    if actions and not dry_run:
+        password = decrypt_password(spec.encrypted_password, key) if spec.encrypted_password else None
+        if "create_user" in actions and password is None:
+            if save_password is None:
+                raise ValueError(f"No password configured for {spec.user}")
+            password = secrets.token_urlsafe(16)
+            save_password(spec, password)
+        backend.apply(spec, actions, password)
+    return {"core": spec.core, "backend": spec.backend, "actions": actions, "applied": bool(actions) and not dry_run}
+
+# Run every core's provisioning concurrently over the shared backend pools
+def provision(specs, backends, key, dry_run=False, workers=None, save_password=None):
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers or max(1, len(specs))) as pool:
+        futures = {pool.submit(provision_core, spec, backends[spec.backend], key, dry_run, save_password): spec
+                   for spec in specs}
+        for future, spec in futures.items():
+            try:
+                results[spec.core] = future.result()
+            except Exception as e:
+                results[spec.core] = {"core": spec.core, "backend": spec.backend, "actions": [], "applied": False,
+                                      "error": str(e)}
+    return results
+
+# Which backend each core uses, matching docker-compose.yml
+core_backends = {
+    "Tata-CORE": ("postgresql", 5432),
+    "Tata-MEMEX": ("mongodb", 27018),
+    "Tata-MOTO": ("mysql", 3306),
+    "Tata-ZKP": ("postgresql", 5433),
+}
+
+backend_classes = {"postgresql": PostgresBackend, "mysql": MySQLBackend, "mongodb": MongoBackend}
+
+# Default admin accounts per backend; override with TATA_<BACKEND>_ADMIN_USER / _PASSWORD
+admin_defaults = {"postgresql": "postgres", "mysql": "root", "mongodb": "root"}
+
+# Save generated credentials to the env file the services read them from:
+# get_client(..., prefix="TATA_<CORE>_DB") reads TATA_<CORE>_DB_HOST, _PORT,
+# _DB, _USER and _PASSWORD. Keys already in the file are replaced in place.
+class EnvFileWriter:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def __call__(self, spec, password):
+        prefix = f"{spec.core.replace('-', '_').upper()}_DB"
+        backend = urlsplit(spec.backend)
+        updates = {f"{prefix}_HOST": backend.hostname, f"{prefix}_PORT": str(backend.port),
+                   f"{prefix}_DB": spec.db_name, f"{prefix}_USER": spec.user, f"{prefix}_PASSWORD": password}
+        with self.lock:
+            lines = []
+            if os.path.exists(self.path):
+                with open(self.path, "r") as f:
+                    lines = f.read().splitlines()
+            for i, line in enumerate(lines):
+                key = line.split("=", 1)[0].strip()
+                if "=" in line and key in updates:
+                    lines[i] = f"{key}={updates.pop(key)}"
+            lines += [f"{key}={value}" for key, value in updates.items()]
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_TRUNC | os.O_CREAT, 0o600)
+            with os.fdopen(fd, "w") as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        print(f"Generated a password for {spec.user}; saved as {prefix}_PASSWORD in {self.path}")
 
 # Main function to automate all steps
-def automate_system_setup():
-    # Define credentials and naming conventions
+def automate_system_setup(dry_run=False, env_file=DEFAULT_ENV_FILE):
     core_names = ["Tata-CORE", "Tata-FLOW", "Tata-MEMEX", "Tata-MOTO", "Tata-ZKP"]
-    db_types = ["db_user", "db_password", "db_name", "db_host", "db_port"]
-    
+    host = os.environ.get("TATA_DB_HOST", "localhost")
+    env = parse_env_file(env_file)
+    env.update(os.environ)
+
     # Generate encryption key for secure password storage
     key = generate_key()
-    
-    # Loop through each core and set up corresponding database
+
+    specs, backends = [], {}
     for core in core_names:
-        print(f"Setting up {core}...")
-        
-        # Database-specific credentials and information
-        user = f"{core.lower()}_admin"
-        password = f"Rouge74"  # Replace with your password manager if needed
-        db_name = f"{core.lower()}_db"
-        host = "localhost"
-        port = 5432 if "CORE" in core else 27017 if "MEMEX" in core else 3306
-        
-        # Encrypt password
-        encrypted_password = encrypt_password(password, key)
-        
-        # Store credentials securely (in your case, you'd store this in a secure location or vault)
-        print(f"Storing encrypted password for {core}...")
-        
-        # Set up databases
-        if "CORE" in core:
-            setup_postgresql_db(user, encrypted_password, db_name, host, port)
-        elif "MEMEX" in core:
-            setup_mongodb_db(user, encrypted_password, db_name, host, port)
-        elif "MOTO" in core:
-            setup_mysql_db(user, encrypted_password, db_name, host, port)
+        if core not in core_backends:
+            print(f"No database to provision for {core}.")
+            continue
+        kind, port = core_backends[core]
+        env_prefix = core.replace("-", "_").upper()
+        # Keep the password encrypted until the moment it is handed to the driver
+        password = env.get(f"{env_prefix}_DB_PASSWORD")
+        backend_key = f"{kind}://{host}:{port}"
+        specs.append(DatabaseSpec(core, backend_key, f"{core.lower()}_db", f"{core.lower()}_admin",
+                                  encrypt_password(password, key) if password else None))
+        if backend_key not in backends:
+            admin_user = os.environ.get(f"TATA_{kind.upper()}_ADMIN_USER", admin_defaults[kind])
+            admin_password = os.environ.get(f"TATA_{kind.upper()}_ADMIN_PASSWORD", "")
+            try:
+                backends[backend_key] = backend_classes[kind](host, port, admin_user, admin_password)
+            except Exception as e:
+                print(f"Error connecting to {backend_key}: {e}")
+
+    specs = [spec for spec in specs if spec.backend in backends]
+    try:
+        results = provision(specs, backends, key, dry_run=dry_run, save_password=EnvFileWriter(env_file))
+    finally:
+        for backend in backends.values():
+            backend.close()
+
+    for core, result in results.items():
+        if result.get("error"):
+            print(f"Error setting up {core}: {result['error']}")
+        elif not result["actions"]:
+            print(f"{core}: already provisioned.")
         else:
-            print(f"Unknown core type: {core}")
+            verb = "would apply" if dry_run else "applied"
+            print(f"{core}: {verb} {', '.join(result['actions'])}.")
+    return results
 
 # Execute the setup process
 if __name__ == "__main__":
-    automate_system_setup()
+    automate_system_setup(dry_run="--dry-run" in sys.argv)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Offline batch inference over a JSONL file of prompts.
+
+Prompts are streamed from the input in windows, sorted by length within each
+window so batches need little padding, and run as batched greedy generate()
+calls across a pool of worker processes (each loading the model once with
+inference_backends.load_backend). Results are written to the output JSONL in
+input order as soon as every earlier line is done, and a checkpoint next to
+the output records how far the output is complete, so an interrupted run
+picks up where it stopped.
+
+    python3 batch_inference.py prompts.jsonl results.jsonl --workers 4 --batch-size 32
+    python3 batch_inference.py prompts.jsonl results.jsonl          # re-run to resume
+
+Input lines look like {"id": "...", "text": "..."}; output lines are
+{"id": ..., "result": "..."} (or "error" instead of "result").
+"""
+import os
+import json
+import time
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from inference_backends import default_threads, load_backend
+
+# Write the checkpoint at most this often (seconds); always at the end
+checkpoint_interval = 5.0
+
+_backend = None
+
+def init_worker(kind, threads):
+    global _backend
+    _backend = load_backend(kind, threads)
+    tokenizer = _backend.tokenizer
+    tokenizer.padding_side = "left"  # decoder-only models continue from the right edge
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+def run_batch(batch, max_new_tokens):
+    """Generates for [(index, id, text), ...] and returns [(index, output record), ...]."""
+    import torch
+    tokenizer, model = _backend.tokenizer, _backend.model
+    try:
+        inputs = tokenizer([text for _, _, text in batch], return_tensors="pt", padding=True)
+        with torch.no_grad():
+            outputs = model.generate(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"],
+                                     max_new_tokens=max_new_tokens, pad_token_id=tokenizer.pad_token_id)
+        texts = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        return [(index, {"id": record_id, "result": text}) for (index, record_id, _), text in zip(batch, texts)]
+    except Exception as e:
+        return [(index, {"id": record_id, "error": f"{type(e).__name__}: {e}"}) for index, record_id, _ in batch]
+
+def read_prompts(path, start_offset, start_index, text_key):
+    """Yields (index, end byte offset, id, text) from the input, starting at a byte offset."""
+    with open(path, "rb") as f:
+        f.seek(start_offset)
+        index, offset = start_index, start_offset
+        for raw in f:
+            offset += len(raw)
+            if not raw.strip():
+                continue
+            record = json.loads(raw)
+            yield index, offset, record.get("id", index), record[text_key]
+            index += 1
+
+def batches(prompts, window, batch_size):
+    """Groups the prompt stream into length-sorted batches, one window at a time."""
+    chunk = []
+    for prompt in prompts:
+        chunk.append(prompt)
+        if len(chunk) == window:
+            yield from _bucket(chunk, batch_size)
+            chunk = []
+    if chunk:
+        yield from _bucket(chunk, batch_size)
+
+def _bucket(chunk, batch_size):
+    chunk.sort(key=lambda prompt: len(prompt[3]))
+    for start in range(0, len(chunk), batch_size):
+        yield chunk[start:start + batch_size]
+
+class Checkpoint:
+    """Lines done, output size and input offset; written atomically next to the output."""
+
+    def __init__(self, output_path, input_path):
+        self.path = f"{output_path}.checkpoint.json"
+        self.input_path = os.path.abspath(input_path)
+        self.state = {"input": self.input_path, "lines": 0, "output_bytes": 0, "input_offset": 0}
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                state = json.load(f)
+            if state.get("input") != self.input_path:
+                raise SystemExit(f"{self.path} belongs to {state.get('input')}; remove it or pick another output")
+            self.state = state
+        return self.state
+
+    def save(self, **state):
+        self.state.update(state)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+def run(input_path, output_path, kind=None, workers=1, threads=None, batch_size=16, window=4096,
+        max_new_tokens=64, text_key="text", resume=True):
+    checkpoint = Checkpoint(output_path, input_path)
+    state = checkpoint.load() if resume else checkpoint.state
+    mode = "r+b" if resume and os.path.exists(output_path) else "w+b"
+    output = open(output_path, mode)
+    output.truncate(state["output_bytes"])  # drop anything written after the last checkpoint
+    output.seek(state["output_bytes"])
+    if state["lines"]:
+        print(f"Resuming after {state['lines']} lines")
+
+    offsets = {}    # index -> input end offset, for lines not yet written
+    finished = {}   # index -> output record, waiting for earlier lines
+    progress = {"lines": state["lines"], "input_offset": state["input_offset"], "written": 0}
+    started = last_checkpoint = time.perf_counter()
+
+    def save():
+        output.flush()
+        os.fsync(output.fileno())
+        checkpoint.save(lines=progress["lines"], output_bytes=output.tell(), input_offset=progress["input_offset"])
+
+    def flush_ready():
+        nonlocal last_checkpoint
+        while progress["lines"] in finished:
+            index = progress["lines"]
+            output.write(json.dumps(finished.pop(index)).encode() + b"\n")
+            progress.update(lines=index + 1, input_offset=offsets.pop(index), written=progress["written"] + 1)
+        if time.perf_counter() - last_checkpoint >= checkpoint_interval:
+            save()
+            last_checkpoint = time.perf_counter()
+
+    prompts = read_prompts(input_path, state["input_offset"], state["lines"], text_key)
+    pending_batches = batches(prompts, window, batch_size)
+    max_in_flight = workers * 2
+    threads = threads or max(1, default_threads() // workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(kind, threads)) as pool:
+        in_flight = set()
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < max_in_flight:
+                batch = next(pending_batches, None)
+                if batch is None:
+                    exhausted = True
+                    break
+                for index, offset, _, _ in batch:
+                    offsets[index] = offset
+                in_flight.add(pool.submit(run_batch, [(index, record_id, text) for index, _, record_id, text in batch],
+                                          max_new_tokens))
+            if not in_flight:
+                break
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                for index, record in future.result():
+                    finished[index] = record
+            flush_ready()
+    save()
+    output.close()
+    written = progress["written"]
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {written} results to {output_path} in {elapsed:.1f}s "
+          f"({written / elapsed if elapsed else 0:.1f} prompts/s)")
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Run batched inference over a JSONL file of prompts")
+    parser.add_argument("input", help="JSONL file with one {\"text\": ...} object per line")
+    parser.add_argument("output", help="JSONL file to write results to, in input order")
+    parser.add_argument("--backend", choices=["torch", "onnx"], help="default: TATA_INFERENCE_BACKEND or torch")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes, each with its own model")
+    parser.add_argument("--threads", type=int, help="intra-op threads per worker (default: CPUs / workers)")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--window", type=int, default=4096, help="prompts sorted by length together")
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--text-key", default="text")
+    parser.add_argument("--restart", action="store_true", help="ignore any checkpoint and start over")
+    args = parser.parse_args()
+    run(args.input, args.output, kind=args.backend, workers=args.workers, threads=args.threads,
+        batch_size=args.batch_size, window=args.window, max_new_tokens=args.max_new_tokens,
+        text_key=args.text_key, resume=not args.restart)
+
+if __name__ == "__main__":
+    main()
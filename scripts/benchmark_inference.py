@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Compare the PyTorch and onnxruntime inference backends on the same prompts.
+
+Each backend runs every prompt with greedy decoding after one warm-up call;
+the report gives mean latency, generated tokens per second, and whether the
+ONNX output matched PyTorch token for token.
+
+    python3 benchmark_inference.py --prompt "Hello" --prompt "Summarise ..." --threads 4
+    python3 benchmark_inference.py --prompts prompts.jsonl --max-new-tokens 64 --json
+"""
+import json
+import time
+import argparse
+from inference_backends import default_threads, load_backend
+
+default_prompts = [
+    "The Tata AI platform coordinates",
+    "Explain in one paragraph how a zero-knowledge proof works:",
+    "List three ways to reduce inference latency on CPUs:",
+]
+
+def run(backend, prompts, max_new_tokens, repeats):
+    import torch
+    tokenizer = backend.tokenizer
+    pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+    outputs, latencies, generated = [], [], 0
+
+    def generate(prompt):
+        inputs = tokenizer(prompt, return_tensors="pt")
+        with torch.no_grad():
+            return inputs, backend.model.generate(input_ids=inputs["input_ids"],
+                                                  attention_mask=inputs["attention_mask"], do_sample=False,
+                                                  num_beams=1, max_new_tokens=max_new_tokens,
+                                                  pad_token_id=pad_token_id)
+
+    generate(prompts[0])  # warm-up: lazy allocations, thread pools
+    for prompt in prompts:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            inputs, output = generate(prompt)
+            latencies.append(time.perf_counter() - start)
+        generated += (output.shape[1] - inputs["input_ids"].shape[1]) * repeats
+        outputs.append(output[0].tolist())
+    total = sum(latencies)
+    return outputs, {"backend": backend.name, "mean_latency_ms": round(1000 * total / len(latencies), 2),
+                     "tokens_per_s": round(generated / total, 2) if total else None}
+
+def load_prompts(args):
+    prompts = list(args.prompt or [])
+    if args.prompts:
+        with open(args.prompts, "r") as f:
+            prompts += [json.loads(line)["text"] for line in f if line.strip()]
+    return prompts or default_prompts
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the torch and onnx inference backends")
+    parser.add_argument("--prompt", action="append", help="prompt text (repeatable)")
+    parser.add_argument("--prompts", help="JSONL file of {\"text\": ...} prompts")
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3, help="runs per prompt")
+    parser.add_argument("--threads", type=int, default=None, help="intra-op threads (default: all CPUs)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    prompts = load_prompts(args)
+    threads = args.threads or default_threads()
+    results, outputs = [], {}
+    for kind in ("torch", "onnx"):
+        backend = load_backend(kind, threads)
+        outputs[kind], summary = run(backend, prompts, args.max_new_tokens, args.repeats)
+        summary["threads"] = threads
+        results.append(summary)
+        del backend
+    matches = sum(a == b for a, b in zip(outputs["torch"], outputs["onnx"]))
+    speedup = results[0]["mean_latency_ms"] / results[1]["mean_latency_ms"] if results[1]["mean_latency_ms"] else None
+
+    if args.json:
+        print(json.dumps({"backends": results, "identical_outputs": f"{matches}/{len(prompts)}",
+                          "onnx_speedup": round(speedup, 3) if speedup else None}, indent=2))
+        return
+    print(f"{'backend':<8} {'threads':>7} {'mean ms':>10} {'tokens/s':>10}")
+    for row in results:
+        print(f"{row['backend']:<8} {row['threads']:>7} {row['mean_latency_ms']:>10} {row['tokens_per_s']:>10}")
+    print(f"Identical greedy outputs: {matches}/{len(prompts)}")
+    if speedup:
+        print(f"ONNX speedup: {speedup:.2f}x")
+
+if __name__ == "__main__":
+    main()
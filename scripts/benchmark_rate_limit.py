@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Benchmark the tata-flow rate limiter against redis_flow.
+
+Measures what the limiter adds to each admitted request. The leased fast path
+admits most requests from tokens held in process. The per-request mode makes
+one script round trip per request. Limits are set high enough that nothing is
+rejected. An overload scenario then runs several limiters, standing in for
+processes, against one small bucket. It checks that admissions stay within
+burst + rate * elapsed and counts the round trips that cost.
+
+    python3 benchmark_rate_limit.py --requests 20000 --concurrency 1 16 64
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "src"))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "src", "tata-flow"))
+from tata_common.db import close_all, get_client
+from rate_limit import Limit, Limits, RateLimiter
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else 0.0
+
+async def bench_mode(client, mode, requests, concurrency, prefix):
+    unlimited = Limit(1e9, 1e9)
+    limiter = RateLimiter(client, Limits(unlimited, endpoints={"bench:/admit": unlimited}),
+                          prefix=f"{prefix}:{mode}:{concurrency}", local=mode == "leased")
+    latencies = []
+
+    async def worker():
+        for _ in range(requests // concurrency):
+            start = time.perf_counter()
+            if mode == "none":
+                await asyncio.sleep(0)  # the await a request would pay anyway
+                admitted = True
+            else:
+                admitted = (await limiter.acquire("tenant-1", "bench:/admit")).allowed
+            if admitted:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    round_trips = limiter.round_trips
+    await limiter.close()
+    return {"mode": mode, "concurrency": concurrency, "admitted": len(latencies),
+            "admitted_per_s": round(len(latencies) / elapsed),
+            "mean_us": round(1e6 * sum(latencies) / max(1, len(latencies)), 2),
+            "p99_us": round(1e6 * percentile(latencies, 99), 2),
+            "round_trips_per_1k": round(1000 * round_trips / max(1, len(latencies)), 2)}
+
+async def bench_overload(client, processes, seconds, rate, burst, prefix):
+    limits = Limits(Limit(rate, burst))
+    limiters = [RateLimiter(client, limits, prefix=f"{prefix}:overload") for _ in range(processes)]
+    admitted = rejected = 0
+    start = time.monotonic()
+
+    async def worker(limiter):
+        nonlocal admitted, rejected
+        while time.monotonic() - start < seconds:
+            decision = await limiter.acquire("tenant-1", "bench:/overload")
+            if decision.allowed:
+                admitted += 1
+            else:
+                rejected += 1
+                await asyncio.sleep(min(decision.retry_after, 0.005))
+
+    await asyncio.gather(*(worker(limiter) for limiter in limiters for _ in range(8)))
+    elapsed = time.monotonic() - start
+    for limiter in limiters:
+        await limiter.close()
+    bound = burst + rate * elapsed
+    return {"processes": processes, "seconds": round(elapsed, 2), "admitted": admitted, "rejected": rejected,
+            "allowed_at_most": round(bound), "utilisation": round(admitted / bound, 3),
+            "round_trips": sum(limiter.round_trips for limiter in limiters)}
+
+async def run(args):
+    client = await get_client("redis", prefix=args.prefix)
+    bench_prefix = f"tata:ratelimit-bench:{os.getpid()}"
+    try:
+        rows = []
+        for concurrency in args.concurrency:
+            for mode in ("none", "leased", "per-request"):
+                rows.append(await bench_mode(client, mode, args.requests, concurrency, bench_prefix))
+        overload = await bench_overload(client, args.processes, args.seconds, args.rate, args.burst, bench_prefix)
+    finally:
+        await close_all()
+    return rows, overload
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rate limiter overhead per admitted request")
+    parser.add_argument("--requests", type=int, default=20000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64], help="requests in flight")
+    parser.add_argument("--prefix", default="TATA_FLOW_REDIS", help="env prefix of the redis_flow settings")
+    parser.add_argument("--processes", type=int, default=4, help="limiters sharing the overloaded bucket")
+    parser.add_argument("--seconds", type=float, default=5.0, help="length of the overload scenario")
+    parser.add_argument("--rate", type=float, default=500.0, help="overload bucket rate (tokens/s)")
+    parser.add_argument("--burst", type=float, default=100.0, help="overload bucket capacity")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    rows, overload = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps({"scenarios": rows, "overload": overload}, indent=2))
+        return
+    print(f"{'mode':<12} {'in flight':>9} {'admits/s':>9} {'mean us':>9} {'p99 us':>9} {'trips/1k':>9}")
+    for row in rows:
+        print(f"{row['mode']:<12} {row['concurrency']:>9} {row['admitted_per_s']:>9} {row['mean_us']:>9} "
+              f"{row['p99_us']:>9} {row['round_trips_per_1k']:>9}")
+    print(f"overload: {overload['admitted']} admitted of at most {overload['allowed_at_most']} "
+          f"({overload['utilisation']:.1%}) by {overload['processes']} processes in {overload['seconds']}s, "
+          f"{overload['rejected']} rejected, {overload['round_trips']} round trips")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Benchmark tata_common.rpc against a JSON over HTTP/1.1 baseline.
+
+Both servers run in their own process and echo a decision-sized document back.
+The HTTP baseline keeps connections alive (one per client thread, since HTTP/1.1
+can't multiplex); the RPC client shares one connection between all in-flight calls.
+
+    python3 benchmark_rpc.py --calls 5000 --concurrency 1 16 64
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import http.client
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "src"))
+import msgpack
+from tata_common.rpc import RpcClient, RpcServer
+
+# Roughly what CORE passes around per decision step
+payload = {
+    "decision_id": "d-000042",
+    "node": "Universal.Tata-CORE.JB.5.0",
+    "context": {"user": "u-1234", "session": "s-98765", "tags": ["routing", "memex", "zkp"]},
+    "features": [i * 0.125 for i in range(64)],
+    "candidates": [{"id": f"c-{i}", "score": 1.0 / (i + 1), "label": f"option {i}"} for i in range(8)],
+    "trace": {"hops": ["tata-flow", "tata-core"], "budget_ms": 250},
+}
+
+class EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # otherwise delayed ACKs add ~40 ms per response
+    wbufsize = -1  # send headers and body in one write
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        data = json.dumps({"result": body}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def run_http_server(port, ready):
+    server = ThreadingHTTPServer(("127.0.0.1", port), EchoHandler)
+    ready.set()
+    server.serve_forever()
+
+def run_rpc_server(port, ready):
+    server = RpcServer("bench")
+    server.register("echo", lambda params: params)
+
+    async def main():
+        await server.start("127.0.0.1", port)
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+def start_server(target, port):
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(target=target, args=(port, ready), daemon=True)
+    process.start()
+    ready.wait(10)
+    return process
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else 0.0
+
+def summarize(name, concurrency, latencies, elapsed):
+    return {"transport": name, "concurrency": concurrency, "calls": len(latencies),
+            "calls_per_s": round(len(latencies) / elapsed), "p50_ms": round(1000 * percentile(latencies, 50), 3),
+            "p99_ms": round(1000 * percentile(latencies, 99), 3)}
+
+def bench_http(port, calls, concurrency):
+    per_worker = calls // concurrency
+
+    def worker(_):
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        latencies = []
+        for _ in range(per_worker):
+            start = time.perf_counter()
+            data = json.dumps(payload).encode()
+            conn.request("POST", "/rpc/echo", body=data, headers={"Content-Type": "application/json"})
+            json.loads(conn.getresponse().read())
+            latencies.append(time.perf_counter() - start)
+        conn.close()
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = [lat for chunk in pool.map(worker, range(concurrency)) for lat in chunk]
+    return summarize("json/http", concurrency, latencies, time.perf_counter() - start)
+
+def bench_rpc(port, calls, concurrency):
+    async def main():
+        client = await RpcClient("127.0.0.1", port).connect()
+        latencies = []
+
+        async def worker():
+            for _ in range(calls // concurrency):
+                start = time.perf_counter()
+                await client.call("echo", payload, timeout=5)
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        await client.close()
+        return summarize("msgpack/rpc", concurrency, latencies, elapsed)
+
+    return asyncio.run(main())
+
+def bench_codecs(rounds=20000):
+    results = {}
+    for name, dump, load in (("json", lambda o: json.dumps(o).encode(), json.loads),
+                             ("msgpack", lambda o: msgpack.packb(o, use_bin_type=True), msgpack.unpackb)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            load(dump(payload))
+        results[name] = {"us_per_roundtrip": round(1e6 * (time.perf_counter() - start) / rounds, 2),
+                         "bytes": len(dump(payload))}
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark msgpack RPC against JSON over HTTP")
+    parser.add_argument("--calls", type=int, default=5000, help="calls per scenario")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64], help="calls in flight")
+    parser.add_argument("--http-port", type=int, default=18080)
+    parser.add_argument("--rpc-port", type=int, default=18081)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    servers = [start_server(run_http_server, args.http_port), start_server(run_rpc_server, args.rpc_port)]
+    try:
+        rows = []
+        for concurrency in args.concurrency:
+            rows.append(bench_http(args.http_port, args.calls, concurrency))
+            rows.append(bench_rpc(args.rpc_port, args.calls, concurrency))
+        codecs = bench_codecs()
+    finally:
+        for process in servers:
+            process.terminate()
+
+    if args.json:
+        print(json.dumps({"scenarios": rows, "codecs": codecs}, indent=2))
+        return
+    print(f"{'transport':<12} {'in flight':>9} {'calls/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for row in rows:
+        print(f"{row['transport']:<12} {row['concurrency']:>9} {row['calls_per_s']:>9} "
+              f"{row['p50_ms']:>9} {row['p99_ms']:>9}")
+    for name, result in codecs.items():
+        print(f"{name} codec: {result['us_per_roundtrip']} us per encode+decode, {result['bytes']} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import time
+import threading
+import torch
+from transformers import StoppingCriteria
+
+# Stopping generation early when nobody is waiting for the result.
+#
+# The inference server runs generate() off the event loop and watches the client
+# connection; a Cancellation is set when the client disconnects or the request's
+# deadline passes, and CancelCriteria (checked by generate() after every decoding
+# step) or speculative_generate's should_stop hook then ends generation at the
+# next step instead of running to max_length.
+
+DISCONNECTED = "disconnected"
+DEADLINE = "deadline"
+
+class Cancellation:
+    """Thread-safe cancel flag with an optional deadline, given as seconds from now."""
+
+    def __init__(self, timeout=None):
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.reason = None
+        self._event = threading.Event()
+
+    def cancel(self, reason):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    def is_cancelled(self):
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel(DEADLINE)
+        return self._event.is_set()
+
+    def remaining(self):
+        """Seconds left before the deadline, or None without one."""
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+class CancelCriteria(StoppingCriteria):
+    def __init__(self, cancellation):
+        self.cancellation = cancellation
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full((input_ids.shape[0],), self.cancellation.is_cancelled(), dtype=torch.bool,
+                          device=input_ids.device)
+
+class CancellationStats:
+    """Cancelled requests and the decoding work they gave back, for /metrics."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cancelled = {DISCONNECTED: 0, DEADLINE: 0}
+        self.skipped = 0           # cancelled while still queued, before any decoding
+        self.tokens_generated = 0  # tokens decoded before the cancel took effect
+        self.tokens_saved = 0      # remaining token budget that was never decoded
+
+    def record(self, reason, generated, budget, started=True):
+        with self.lock:
+            self.cancelled[reason] = self.cancelled.get(reason, 0) + 1
+            self.skipped += not started
+            self.tokens_generated += generated
+            self.tokens_saved += max(0, budget - generated)
+
+    def snapshot(self):
+        with self.lock:
+            return {"cancelled": dict(self.cancelled), "skipped_before_start": self.skipped,
+                    "tokens_generated": self.tokens_generated, "tokens_saved": self.tokens_saved}
@@ -1,51 +1,122 @@
 import os
+import sys
+import json
+import time
+import subprocess
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 
-# List of important directories and files to check
-expected_directories = [
-    "/Volumes/akron/Tata-ai/backend",
-    "/Volumes/akron/Tata-ai/frontend",
-    "/Volumes/akron/Tata-ai/data",
-    "/Volumes/akron/Tata-ai/docker",
-    "/Volumes/akron/Tata-ai/logs",
-    "/Volumes/akron/Tata-ai/tests"
-]
-
-expected_files = [
-    "/Volumes/akron/Tata-ai/docker-compose.yml",
-    "/Volumes/akron/Tata-ai/README.md",
-    "/Volumes/akron/Tata-ai/bootstrap.sh"
-]
-
-# Check directories
-def check_directories():
-    for directory in expected_directories:
-        if not os.path.exists(directory):
-            print(f"Directory missing: {directory}")
-        else:
-            print(f"Directory exists: {directory}")
-
-# Check files
-def check_files():
-    for file in expected_files:
-        if not os.path.isfile(file):
-            print(f"File missing: {file}")
-        else:
-            print(f"File exists: {file}")
-
-# Check if the language models are in the correct folder
-def check_language_models():
-    models_dir = "/Volumes/akron/Tata-ai/data/models"
-    if not os.path.isdir(models_dir):
-        print(f"Language models directory missing: {models_dir}")
-    else:
-        print(f"Language models directory exists: {models_dir}")
-        _files = os.listdir(models_dir)
-        if _files:
-            print(f"Models found in {models_dir}: {_files}")
-        else:
-            print(f"No models found in {models_dir}")
-
-# Run checks
-check_directories()
-check_files()
-check_language_models()
+# Define paths
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_PATH = os.path.join(PROJECT_DIR, "configs", "project_check_manifest.json")
+REPORT_PATH = os.path.join(PROJECT_DIR, "tata_ai_project_check_report.json")
+
+def load_manifest(path=MANIFEST_PATH):
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    for section in ("directories", "files", "nonEmptyDirectories", "commands"):
+        manifest.setdefault(section, {})
+    return manifest
+
+def scan_tree(root, targets):
+    """Walks the tree once with os.scandir, descending only into ancestors of the target paths.
+
+    Returns {relative path: "dir" | "file"} plus the set of directories that have entries.
+    """
+    wanted = set()
+    for target in targets:
+        parts = target.strip("/").split("/")
+        for depth in range(1, len(parts) + 1):
+            wanted.add("/".join(parts[:depth]))
+    found, non_empty = {}, set()
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            with os.scandir(os.path.join(root, rel_dir)) as entries:
+                for entry in entries:
+                    if rel_dir in wanted:
+                        non_empty.add(rel_dir)
+                    rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                    if rel_path not in wanted:
+                        continue
+                    if entry.is_dir():
+                        found[rel_path] = "dir"
+                        stack.append(rel_path)
+                    elif entry.is_file():
+                        found[rel_path] = "file"
+        except OSError:
+            continue
+    return found, non_empty
+
+def run_command(name, spec, cwd=PROJECT_DIR):
+    """Runs one shell command with its own timeout and returns a check result."""
+    if isinstance(spec, str):
+        spec = {"command": spec}
+    start = time.perf_counter()
+    try:
+        subprocess.run(spec["command"], shell=True, check=True, stdout=subprocess.PIPE,
+                       stderr=subprocess.PIPE, timeout=spec.get("timeout", 120), cwd=cwd)
+        passed, detail = True, "Passed"
+    except subprocess.CalledProcessError as e:
+        passed, detail = False, f"Failed: {e.stderr.decode(errors='replace').strip()[-500:]}"
+    except subprocess.TimeoutExpired:
+        passed, detail = False, f"Timed out after {spec.get('timeout', 120)}s"
+    return name, {"passed": passed, "detail": detail, "durationMs": round((time.perf_counter() - start) * 1000, 1)}
+
+def run_checks(manifest, root=PROJECT_DIR, workers=None):
+    """Runs every manifest check; filesystem checks run while the commands are in flight."""
+    checks = {}
+    commands = manifest["commands"]
+    with ThreadPoolExecutor(max_workers=workers or max(1, len(commands))) as pool:
+        futures = [pool.submit(run_command, name, spec, root) for name, spec in commands.items()]
+
+        start = time.perf_counter()
+        targets = list(manifest["directories"].values()) + list(manifest["files"].values()) \
+            + list(manifest["nonEmptyDirectories"].values())
+        found, non_empty = scan_tree(root, targets)
+        scan_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        for name, rel_path in manifest["directories"].items():
+            passed = found.get(rel_path.strip("/")) == "dir"
+            checks[name] = {"passed": passed, "detail": "Found" if passed else "Missing", "durationMs": scan_ms}
+        for name, rel_path in manifest["files"].items():
+            passed = found.get(rel_path.strip("/")) == "file"
+            checks[name] = {"passed": passed, "detail": "Found" if passed else "Missing", "durationMs": scan_ms}
+        for name, rel_path in manifest["nonEmptyDirectories"].items():
+            passed = rel_path.strip("/") in non_empty
+            checks[name] = {"passed": passed, "detail": "Found" if passed else f"Nothing in {rel_path}/",
+                            "durationMs": scan_ms}
+
+        for future in futures:
+            name, result = future.result()
+            checks[name] = result
+    return checks
+
+def write_report(checks, root=PROJECT_DIR, report_path=REPORT_PATH, total_ms=None):
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+        "projectRoot": root,
+        "results": {name: result["passed"] for name, result in checks.items()},
+        "checks": checks,
+        "totalDurationMs": total_ms,
+        "allPassed": all(result["passed"] for result in checks.values()),
+    }
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def main(manifest_path=MANIFEST_PATH, report_path=REPORT_PATH):
+    print("Running project health checks...\n")
+    start = time.perf_counter()
+    checks = run_checks(load_manifest(manifest_path))
+    total_ms = round((time.perf_counter() - start) * 1000, 1)
+    for name, result in checks.items():
+        mark = "✅" if result["passed"] else "❌"
+        print(f"{mark} {name}: {result['detail']} ({result['durationMs']} ms)")
+    report = write_report(checks, report_path=report_path, total_ms=total_ms)
+    print(f"\nChecks finished in {total_ms} ms; report saved to {report_path}")
+    return 0 if report["allPassed"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
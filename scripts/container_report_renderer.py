@@ -0,0 +1,105 @@
+import os
+import csv
+import json
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+# Page geometry (points)
+page_width, page_height = letter
+left_margin = 30
+top_margin = 750
+bottom_margin = 40
+
+# Longest row drawn at 8pt before it is clipped to the page width
+max_row_chars = 120
+
+# Format a KiB count the same way `du -sh` does
+def human_size(kb):
+    size = float(kb)
+    for unit in ("K", "M", "G", "T"):
+        if size < 1024 or unit == "T":
+            return f"{size:.0f}{unit}" if size >= 10 else f"{size:.1f}{unit}"
+        size /= 1024
+
+class FleetReportRenderer:
+    """Streams container sections into one paginated PDF plus CSV/JSON twins.
+
+    Rows are written as each container arrives, so memory stays bounded by the
+    largest single container rather than the whole fleet.
+    """
+
+    def __init__(self, output_dir, basename="fleet_report"):
+        os.makedirs(output_dir, exist_ok=True)
+        self.pdf_path = os.path.join(output_dir, f"{basename}.pdf")
+        self.csv_path = os.path.join(output_dir, f"{basename}.csv")
+        self.json_path = os.path.join(output_dir, f"{basename}.json")
+
+        self.canvas = canvas.Canvas(self.pdf_path, pagesize=letter)
+        self.page = 1
+        self.y_position = top_margin
+        self.containers = 0
+
+        self.csv_file = open(self.csv_path, "w", newline="")
+        self.csv_writer = csv.writer(self.csv_file)
+        self.csv_writer.writerow(["container_name", "container_image", "category", "size_kb", "path"])
+
+        self.json_file = open(self.json_path, "w")
+        self.json_file.write("[")
+
+        self._draw_line("Container Fleet Report", font="Helvetica-Bold", size=16, step=24)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # Start a new page once the next line would run into the bottom margin
+    def _draw_line(self, text, font="Helvetica", size=8, step=12):
+        if self.y_position - step < bottom_margin:
+            self._new_page()
+        self.canvas.setFont(font, size)
+        if len(text) > max_row_chars:
+            text = text[:max_row_chars - 3] + "..."
+        self.canvas.drawString(left_margin, self.y_position, text)
+        self.y_position -= step
+
+    def _new_page(self):
+        self.canvas.setFont("Helvetica", 8)
+        self.canvas.drawRightString(page_width - left_margin, bottom_margin - 20, f"Page {self.page}")
+        self.canvas.showPage()
+        self.page += 1
+        self.y_position = top_margin
+
+    def add_container(self, container_name, container_image, sections):
+        """Render one container; `sections` is a list of (title, category, [(kb, path), ...])."""
+        # Keep the container heading together with at least its first section title
+        if self.y_position - 60 < bottom_margin:
+            self._new_page()
+        self.y_position -= 6
+        self._draw_line(f"Container Report: {container_name}", font="Helvetica-Bold", size=14, step=20)
+        self._draw_line(f"Container Image: {container_image}", size=10, step=20)
+
+        record = {"container_name": container_name, "container_image": container_image}
+        for title, category, rows in sections:
+            self._draw_line(title, size=10, step=15)
+            record[category] = []
+            for kb, path in rows:
+                self._draw_line(f"{human_size(kb):>6}  {path}")
+                self.csv_writer.writerow([container_name, container_image, category, kb, path])
+                record[category].append({"size_kb": kb, "path": path})
+            self.y_position -= 5
+
+        self.json_file.write(("," if self.containers else "") + "\n" + json.dumps(record))
+        self.containers += 1
+
+    def close(self):
+        if self.canvas is None:
+            return
+        self.canvas.setFont("Helvetica", 8)
+        self.canvas.drawRightString(page_width - left_margin, bottom_margin - 20, f"Page {self.page}")
+        self.canvas.save()
+        self.canvas = None
+        self.csv_file.close()
+        self.json_file.write("\n]\n")
+        self.json_file.close()
@@ -1,92 +1,183 @@
 import os
+import json
+import shlex
 import subprocess
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.pdfgen import canvas
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from container_report_renderer import FleetReportRenderer
+from docker_scan_cache import ScanCache, apply_diff, default_cache_path, parse_diff
 import time
 
 # Define the directory to save the reports
 output_dir = './docker_container_reports'
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
+
+# Upper bound on containers scanned at once (each scan is one `docker exec`)
+max_workers = int(os.environ.get("DOCKER_REPORT_WORKERS", "8"))
+
+# Size threshold for the "large files" section, in KiB (100MB)
+large_file_kb = 100 * 1024
+
+db_extensions = (".db", ".sqlite", ".mdb")
+config_extensions = (".conf", ".yml", ".json")
+
+# Docker CLI to call; point DOCKER_BIN at fake_docker.py to run without a daemon
+docker_cmd = shlex.split(os.environ.get("DOCKER_BIN", "docker"))
+
+# Number of changed paths passed to a single rescan `find`
+rescan_batch_size = 200
+
+# One find over the whole filesystem that matches every category at once;
+# `du -k` prints "<KiB>\t<path>" so the results can be classified locally.
+# /proc and /sys are pruned since they only hold virtual files.
+file_filter = (
+    '-type f \\( -size +100M'
+    + "".join(f' -o -name "*{ext}"' for ext in db_extensions + config_extensions)
+    + ' \\) -exec du -k {} + 2>/dev/null'
+)
+scan_command = 'find / \\( -path /proc -o -path /sys \\) -prune -o ' + file_filter
+
+def docker(*args):
+    result = subprocess.run([*docker_cmd, *args], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return result.stdout
 
 # Get container list
-container_ids = subprocess.getoutput("docker ps -aq").splitlines()
+def list_containers():
+    return docker("ps", "-aq").split()
+
+# Inspect every container with a single `docker inspect` call
+def inspect_containers(container_ids):
+    if not container_ids:
+        return {}
+    try:
+        entries = json.loads(docker("inspect", *container_ids) or "[]")
+    except json.JSONDecodeError:
+        entries = []
+    details = {}
+    for entry in entries:
+        details[entry["Id"]] = {
+            "container_name": entry.get("Name", "").strip("/"),
+            "container_image": entry.get("Config", {}).get("Image", ""),
+            "image_id": entry.get("Image", ""),
+        }
+    # `docker ps -q` returns short ids, inspect returns full ones
+    return {cid: next((v for k, v in details.items() if k.startswith(cid)), None) for cid in container_ids}
 
-def get_container_details(container_id):
+# Resolve the layer digests of every image with a single `docker image inspect` call
+def inspect_image_layers(image_ids):
+    image_ids = sorted({image_id for image_id in image_ids if image_id})
+    if not image_ids:
+        return {}
+    try:
+        entries = json.loads(docker("image", "inspect", *image_ids) or "[]")
+    except json.JSONDecodeError:
+        entries = []
+    return {entry["Id"]: entry.get("RootFS", {}).get("Layers", []) for entry in entries}
+
+# Parse `du -k` output into a {path: KiB} mapping
+def parse_du(du_output):
+    files = {}
+    for line in du_output.splitlines():
+        kb, _, path = line.partition("\t")
+        if path and kb.isdigit():
+            files[path] = int(kb)
+    return files
+
+# Split a file listing into large/db/config sections of (KiB, path) rows in one pass
+def classify_files(files):
+    large_files, db_files, config_files = [], [], []
+    for path, kb in sorted(files.items()):
+        row = (kb, path)
+        if kb > large_file_kb:
+            large_files.append(row)
+        if path.endswith(db_extensions):
+            db_files.append(row)
+        if path.endswith(config_extensions):
+            config_files.append(row)
+    return large_files, db_files, config_files
+
+def scan_container(container_id):
+    return parse_du(docker("exec", "-i", container_id, "sh", "-c", scan_command))
+
+# Rescan only the given paths (no recursion; `docker diff` lists every changed entry)
+def rescan_paths(container_id, paths):
+    files = {}
+    for i in range(0, len(paths), rescan_batch_size):
+        batch = " ".join(shlex.quote(path) for path in paths[i:i + rescan_batch_size])
+        command = f"find {batch} -maxdepth 0 {file_filter}"
+        files.update(parse_du(docker("exec", "-i", container_id, "sh", "-c", command)))
+    return files
+
+# Scan a container, reusing cached results for unchanged image layers
+def scan_container_cached(container_id, info, cache):
+    layers_key = cache.layers_key(info.get("layers") or [info.get("image_id", "")])
+    changes = parse_diff(docker("diff", container_id))
+    changed = sorted({path for kind, path in changes if kind != "D"})
+    files = cache.lookup_container(container_id, layers_key, cache.diff_key(changes))
+    if files is not None:
+        # The diff only says which paths differ from the image, not whether they
+        # changed again since the last run, so those are always read afresh
+        if not changed:
+            return files
+        files = apply_diff(files, [("C", path) for path in changed], rescan_paths(container_id, changed))
+        cache.store(container_id, layers_key, changes, files)
+        return files
+    image = cache.lookup_image(layers_key)
+    if image is not None:
+        base_files, stale = image
+        paths = sorted(set(changed) | set(stale))
+        files = apply_diff(base_files, changes + [("C", path) for path in stale], rescan_paths(container_id, paths))
+    else:
+        files = scan_container(container_id)
+    cache.store(container_id, layers_key, changes, files)
+    return files
+
+def get_container_details(container_id, info=None, cache=None):
     # Retrieve basic information about the container
-    container_name = subprocess.getoutput(f"docker inspect --format '{{{{.Name}}}}' {container_id}").strip("/")
-    container_image = subprocess.getoutput(f"docker inspect --format '{{{{.Config.Image}}}}' {container_id}")
-    
-    # Check for large files
-    large_files = subprocess.getoutput(f'docker exec -i {container_id} find / -type f -size +100M -exec du -sh {{}} \; 2>/dev/null')
-    
-    # Check for database files
-    db_files = subprocess.getoutput(f'docker exec -i {container_id} find / -type f -name "*.db" -o -name "*.sqlite" -o -name "*.mdb" -exec du -sh {{}} \; 2>/dev/null')
-    
-    # Check for configuration files
-    config_files = subprocess.getoutput(f'docker exec -i {container_id} find / -type f -name "*.conf" -o -name "*.yml" -o -name "*.json" -exec du -sh {{}} \; 2>/dev/null')
-    
+    if info is None:
+        info = inspect_containers([container_id]).get(container_id) or {}
+    container_name = info.get("container_name") or container_id
+    container_image = info.get("container_image", "")
+
+    # Check for large, database and configuration files in a single walk
+    if cache is None:
+        files = scan_container(container_id)
+    else:
+        files = scan_container_cached(container_id, info, cache)
+    large_files, db_files, config_files = classify_files(files)
+
     return container_name, container_image, large_files, db_files, config_files
 
-def generate_pdf(container_data):
-    # Define the filename for the report
-    container_name = container_data['container_name']
-    pdf_filename = os.path.join(output_dir, f"{container_name}_report.pdf")
-
-    # Create a canvas for the PDF
-    c = canvas.Canvas(pdf_filename, pagesize=letter)
-    c.setFont("Helvetica", 10)
-    
-    # Add Title
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(30, 750, f"Container Report: {container_name}")
-    
-    # Add Container Image Info
-    c.setFont("Helvetica", 10)
-    c.drawString(30, 730, f"Container Image: {container_data['container_image']}")
-    
-    # Add large files
-    c.drawString(30, 710, "Large Files (over 100MB):")
-    c.setFont("Helvetica", 8)
-    y_position = 695
-    for line in container_data['large_files'].splitlines():
-        c.drawString(30, y_position, line)
-        y_position -= 12
-
-    # Add database files
-    c.setFont("Helvetica", 10)
-    c.drawString(30, y_position, "Database Files:")
-    y_position -= 15
-    for line in container_data['db_files'].splitlines():
-        c.drawString(30, y_position, line)
-        y_position -= 12
-
-    # Add configuration files
-    c.setFont("Helvetica", 10)
-    c.drawString(30, y_position, "Configuration Files:")
-    y_position -= 15
-    for line in container_data['config_files'].splitlines():
-        c.drawString(30, y_position, line)
-        y_position -= 12
-
-    # Save PDF
-    c.save()
+# Collect details for all containers over a bounded worker pool, yielding
+# each container as soon as its scan finishes
+def collect_container_details(container_ids, workers=max_workers, cache=None):
+    inspected = inspect_containers(container_ids)
+    if cache is not None:
+        layers = inspect_image_layers(info["image_id"] for info in inspected.values() if info)
+        for info in inspected.values():
+            if info:
+                info["layers"] = layers.get(info["image_id"])
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(get_container_details, cid, inspected.get(cid) or {}, cache) for cid in container_ids]
+        for future in as_completed(futures):
+            yield future.result()
 
 def main():
-    for container_id in container_ids:
-        container_name, container_image, large_files, db_files, config_files = get_container_details(container_id)
-        
-        container_data = {
-            'container_name': container_name,
-            'container_image': container_image,
-            'large_files': large_files,
-            'db_files': db_files,
-            'config_files': config_files
-        }
-        
-        generate_pdf(container_data)
-        print(f"Report generated for container: {container_name}")
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.time()
+    container_ids = list_containers()
+    cache = ScanCache(default_cache_path) if default_cache_path else None
+    with FleetReportRenderer(output_dir) as renderer:
+        for container_name, container_image, large_files, db_files, config_files in collect_container_details(container_ids, cache=cache):
+            renderer.add_container(container_name, container_image, [
+                ("Large Files (over 100MB):", "large_files", large_files),
+                ("Database Files:", "db_files", db_files),
+                ("Configuration Files:", "config_files", config_files),
+            ])
+            print(f"Report section added for container: {container_name}")
+    if cache is not None:
+        cache.prune(set(container_ids))
+        cache.save()
+    print(f"Scanned {len(container_ids)} containers in {time.time() - start:.1f}s")
+    print(f"Fleet report written to {renderer.pdf_path} ({renderer.csv_path}, {renderer.json_path})")
 
 if __name__ == "__main__":
     main()
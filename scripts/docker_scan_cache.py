@@ -0,0 +1,109 @@
+import os
+import json
+import hashlib
+import threading
+
+# Default location of the scan cache, next to the generated reports
+default_cache_path = os.environ.get("DOCKER_SCAN_CACHE", "./docker_container_reports/.scan_cache.json")
+
+# Parse `docker diff` output ("A /path", "C /path", "D /path") into (kind, path) pairs
+def parse_diff(diff_output):
+    changes = []
+    for line in diff_output.splitlines():
+        kind, _, path = line.strip().partition(" ")
+        if kind in ("A", "C", "D") and path:
+            changes.append((kind, path))
+    return changes
+
+# Overlay the rescanned writable-layer entries on top of a cached file listing
+def apply_diff(base_files, changes, rescanned):
+    removed = {path for _, path in changes}
+    deleted_dirs = tuple(path.rstrip("/") + "/" for kind, path in changes if kind == "D")
+    files = {
+        path: kb for path, kb in base_files.items()
+        if path not in removed and not (deleted_dirs and path.startswith(deleted_dirs))
+    }
+    files.update(rescanned)
+    return files
+
+class ScanCache:
+    """Container scan results keyed by image layer digests and writable-layer diff."""
+
+    def __init__(self, path=default_cache_path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {"images": {}, "containers": {}}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    loaded = json.load(f)
+                self.data["images"].update(loaded.get("images", {}))
+                self.data["containers"].update(loaded.get("containers", {}))
+            except (OSError, ValueError):
+                print(f"Ignoring unreadable scan cache at {path}")
+
+    @staticmethod
+    def layers_key(layers):
+        return hashlib.sha256("\n".join(layers).encode()).hexdigest()
+
+    @staticmethod
+    def diff_key(changes):
+        lines = sorted(f"{kind} {path}" for kind, path in changes)
+        return hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+    def lookup_container(self, container_id, layers_key, diff_key):
+        """Return the cached listing if neither the image nor the writable layer changed."""
+        with self.lock:
+            entry = self.data["containers"].get(container_id)
+        if entry and entry["layers"] == layers_key and entry["diff"] == diff_key:
+            return entry["files"]
+        return None
+
+    def lookup_image(self, layers_key):
+        """Return (files, paths to rescan) for an image, or None."""
+        with self.lock:
+            entry = self.data["images"].get(layers_key)
+        if not entry or "files" not in entry:  # missing, or written by an older version
+            return None
+        return entry["files"], entry["rescan"]
+
+    def store(self, container_id, layers_key, changes, files):
+        """Record a container listing and seed the image baseline from it when possible."""
+        with self.lock:
+            self.data["containers"][container_id] = {
+                "layers": layers_key,
+                "diff": self.diff_key(changes),
+                "files": files,
+            }
+            # Deleted paths are missing from the container but still present in the
+            # image, so only containers without deletions can describe the image.
+            # Added paths aren't in the image at all; changed ones are, but with
+            # the image's size unknown, so containers built on it rescan them.
+            if layers_key not in self.data["images"] and not any(kind == "D" for kind, _ in changes):
+                added = {path for kind, path in changes if kind == "A"}
+                self.data["images"][layers_key] = {
+                    "files": {path: kb for path, kb in files.items() if path not in added},
+                    "rescan": sorted(path for kind, path in changes if kind == "C"),
+                }
+
+    def prune(self, live_container_ids):
+        """Drop containers that no longer exist and images none of them use."""
+        with self.lock:
+            containers = self.data["containers"]
+            for container_id in list(containers):
+                if container_id not in live_container_ids:
+                    del containers[container_id]
+            used = {entry["layers"] for entry in containers.values()}
+            for layers_key in list(self.data["images"]):
+                if layers_key not in used:
+                    del self.data["images"][layers_key]
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with self.lock:
+            with open(tmp_path, "w") as f:
+                json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Minimal stand-in for the docker CLI, backed by directories on disk.
+
+Run the container report without a docker daemon:
+
+    FAKE_DOCKER_ROOT=/tmp/fleet DOCKER_BIN="python3 fake_docker.py" python3 docker_container_report_generator.py
+
+FAKE_DOCKER_ROOT/containers.json describes the fleet:
+
+    {
+      "images": {"sha256:img1": {"layers": ["sha256:l1", "sha256:l2"]}},
+      "containers": {
+        "abc123def4567890": {"name": "web", "image": "nginx:latest", "image_id": "sha256:img1",
+                             "rootfs": "web", "diff": [["A", "/etc/app.conf"]]}
+      }
+    }
+
+Each container's filesystem is the `rootfs` directory under FAKE_DOCKER_ROOT.
+Every invocation is appended to FAKE_DOCKER_LOG (if set) so callers can count
+how many `docker exec` scans a run needed.
+"""
+import os
+import sys
+import json
+import math
+import shlex
+import fnmatch
+
+fake_root = os.environ.get("FAKE_DOCKER_ROOT", ".")
+
+def load_fleet():
+    with open(os.path.join(fake_root, "containers.json"), "r") as f:
+        fleet = json.load(f)
+    fleet.setdefault("images", {})
+    fleet.setdefault("containers", {})
+    return fleet
+
+def find_container(fleet, container_id):
+    """(full id, container) for an id prefix or name; (None, None) if there is none."""
+    for cid, container in fleet["containers"].items():
+        if cid.startswith(container_id) or container.get("name") == container_id:
+            return cid, container
+    return None, None
+
+def require_container(fleet, container_id):
+    cid, container = find_container(fleet, container_id)
+    if cid is None:
+        sys.exit(f"Error: No such container: {container_id}")
+    return cid, container
+
+def cmd_ps(fleet, args):
+    for cid in fleet["containers"]:
+        print(cid[:12])
+
+# Like `docker inspect`: print the containers that exist, report the rest on
+# stderr and exit 1 if any were missing
+def cmd_inspect(fleet, args):
+    entries, missing = [], []
+    for container_id in args:
+        cid, container = find_container(fleet, container_id)
+        if cid is None:
+            missing.append(container_id)
+            continue
+        entries.append({
+            "Id": cid,
+            "Name": "/" + container.get("name", cid[:12]),
+            "Image": container.get("image_id", ""),
+            "Config": {"Image": container.get("image", "")},
+        })
+    print(json.dumps(entries))
+    for container_id in missing:
+        print(f"Error: No such object: {container_id}", file=sys.stderr)
+    if missing:
+        sys.exit(1)
+
+def cmd_image(fleet, args):
+    if not args or args[0] != "inspect":
+        sys.exit("fake_docker: only `image inspect` is supported")
+    entries = [{"Id": image_id, "RootFS": {"Layers": fleet["images"].get(image_id, {}).get("layers", [])}}
+               for image_id in args[1:] if image_id in fleet["images"]]
+    print(json.dumps(entries))
+
+def cmd_diff(fleet, args):
+    _, container = require_container(fleet, args[0])
+    for kind, path in container.get("diff", []):
+        print(f"{kind} {path}")
+
+# Parse the subset of find syntax the report generator emits
+def parse_find(tokens):
+    tokens = tokens[1:]
+    start_paths = []
+    while tokens and not tokens[0].startswith(("-", "(", "!")):
+        start_paths.append(tokens.pop(0))
+    patterns, min_size_kb, max_depth, pruned = [], None, None, []
+    for i, token in enumerate(tokens):
+        if token == "-name":
+            patterns.append(tokens[i + 1])
+        elif token == "-size":
+            value = tokens[i + 1].lstrip("+")
+            units = {"k": 1, "M": 1024, "G": 1024 * 1024}
+            min_size_kb = int(value[:-1]) * units.get(value[-1], 1)
+        elif token == "-maxdepth":
+            max_depth = int(tokens[i + 1])
+        elif token == "-path":
+            pruned.append(tokens[i + 1])
+    return start_paths, patterns, min_size_kb, max_depth, pruned
+
+def cmd_exec(fleet, args):
+    while args and args[0].startswith("-"):
+        args = args[1:]
+    _, container = require_container(fleet, args[0])
+    command = args[-1]
+    tokens = shlex.split(command)
+    if not tokens or tokens[0] != "find":
+        sys.exit(f"fake_docker: unsupported exec command: {command}")
+    start_paths, patterns, min_size_kb, max_depth, pruned = parse_find(tokens)
+    rootfs = os.path.join(fake_root, container.get("rootfs", ""))
+
+    def emit(path):
+        host_path = rootfs + path
+        if not os.path.isfile(host_path):
+            return
+        kb = math.ceil(os.path.getsize(host_path) / 1024)
+        name = os.path.basename(path)
+        if (min_size_kb is not None and kb > min_size_kb) or any(fnmatch.fnmatch(name, p) for p in patterns):
+            print(f"{kb}\t{path}")
+
+    for start in start_paths:
+        if max_depth == 0:
+            emit(start)
+            continue
+        for dirpath, dirnames, filenames in os.walk(rootfs + start):
+            container_dir = "/" + os.path.relpath(dirpath, rootfs).lstrip(".").lstrip("/")
+            dirnames[:] = [d for d in dirnames if os.path.join(container_dir, d) not in pruned]
+            for filename in filenames:
+                emit(os.path.join(container_dir, filename))
+
+commands = {"ps": cmd_ps, "inspect": cmd_inspect, "image": cmd_image, "diff": cmd_diff, "exec": cmd_exec}
+
+def main(argv):
+    log_path = os.environ.get("FAKE_DOCKER_LOG")
+    if log_path:
+        with open(log_path, "a") as f:
+            f.write(" ".join(argv) + "\n")
+    if not argv or argv[0] not in commands:
+        sys.exit(f"fake_docker: unsupported command: {' '.join(argv)}")
+    commands[argv[0]](load_fleet(), argv[1:])
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
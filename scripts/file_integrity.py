@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Incremental, parallel file integrity scanner.
+
+Regenerates file_integrity_report.txt ("<digest>  <path>" lines, as written by
+md5sum) and prints what was added, changed or removed since the last run.
+Files whose (size, mtime, inode) match the persisted index are not re-read,
+so re-runs over large model files under data/models finish in seconds.
+
+    python3 file_integrity.py                # incremental scan of the project
+    python3 file_integrity.py --verify       # re-hash everything and flag silent corruption
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Define paths
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT_PATH = os.path.join(PROJECT_DIR, "file_integrity_report.txt")
+INDEX_PATH = os.path.join(PROJECT_DIR, ".file_integrity_index.json")
+
+# Directories never worth hashing
+skip_dirs = {".git", "node_modules", ".next", "__pycache__", ".pytest_cache", ".venv", "venv"}
+
+# Read size per hashlib update; large reads let hashlib release the GIL for longer
+chunk_size = 1024 * 1024
+
+def walk_files(root, exclude=()):
+    """Yields (path, stat) for every regular file under root using os.scandir."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError as e:
+            print(f"[WARNING] Cannot read {directory}: {e}", file=sys.stderr)
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in skip_dirs:
+                    stack.append(entry.path)
+            elif entry.is_file(follow_symlinks=False) and entry.path not in exclude:
+                yield entry.path, entry.stat(follow_symlinks=False)
+
+def hash_file(path, algorithm):
+    digest = hashlib.new(algorithm)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+def load_index(path, algorithm):
+    try:
+        with open(path, "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if index.get("algorithm") != algorithm:
+        return {}  # digests from another algorithm can't be reused
+    return index.get("files", {})
+
+def save_index(path, algorithm, files):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"algorithm": algorithm, "files": files}, f)
+    os.replace(tmp_path, path)
+
+def scan(root, algorithm="blake2b", index_path=INDEX_PATH, report_path=REPORT_PATH, workers=None, verify=False):
+    """Hashes new/modified files in parallel and returns (files, diff, stats)."""
+    previous = load_index(index_path, algorithm)
+    current, to_hash = {}, []
+    exclude = {os.path.abspath(p) for p in (index_path, f"{index_path}.tmp", report_path)}
+    for path, st in walk_files(root, exclude):
+        key = [st.st_size, st.st_mtime_ns, st.st_ino]
+        old = previous.get(path)
+        if old and old[:3] == key and not verify:
+            current[path] = old
+        else:
+            current[path] = key + [None]
+            to_hash.append(path)
+
+    workers = workers or min(32, (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for path, digest in zip(to_hash, pool.map(lambda p: _safe_hash(p, algorithm), to_hash)):
+            if digest is None:
+                del current[path]  # vanished or unreadable mid-scan
+            else:
+                current[path][3] = digest
+
+    diff = {"added": [], "changed": [], "removed": [], "corrupted": []}
+    for path, entry in current.items():
+        old = previous.get(path)
+        if old is None:
+            diff["added"].append(path)
+        elif old[3] != entry[3]:
+            # Same size/mtime/inode but a different digest means the bytes changed underneath us
+            diff["corrupted" if old[:3] == entry[:3] else "changed"].append(path)
+    diff["removed"] = [path for path in previous if path not in current]
+    for paths in diff.values():
+        paths.sort()
+
+    save_index(index_path, algorithm, current)
+    with open(report_path, "w") as f:
+        for path in sorted(current):
+            f.write(f"{current[path][3]}  {path}\n")
+    stats = {"files": len(current), "hashed": len(to_hash),
+             "bytes_hashed": sum(current[p][0] for p in to_hash if p in current)}
+    return current, diff, stats
+
+def _safe_hash(path, algorithm):
+    try:
+        return hash_file(path, algorithm)
+    except OSError as e:
+        print(f"[WARNING] Cannot hash {path}: {e}", file=sys.stderr)
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental file integrity scanner")
+    parser.add_argument("root", nargs="?", default=PROJECT_DIR)
+    # shake_* digests need a length, so they are not offered
+    parser.add_argument("--algorithm", default="blake2b",
+                        choices=sorted(name for name in hashlib.algorithms_guaranteed
+                                       if not name.startswith("shake_")))
+    parser.add_argument("--index", default=INDEX_PATH)
+    parser.add_argument("--report", default=REPORT_PATH)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--verify", action="store_true", help="re-hash all files, ignoring the index")
+    args = parser.parse_args()
+
+    start = time.time()
+    _, diff, stats = scan(os.path.abspath(args.root), args.algorithm, args.index, args.report, args.workers, args.verify)
+    for kind in ("added", "changed", "removed", "corrupted"):
+        for path in diff[kind]:
+            print(f"{kind.upper():9} {path}")
+    print(f"{stats['files']} files, {stats['hashed']} hashed ({stats['bytes_hashed'] / 1e6:.1f} MB) "
+          f"in {time.time() - start:.2f}s; {len(diff['added'])} added, {len(diff['changed'])} changed, "
+          f"{len(diff['removed'])} removed, {len(diff['corrupted'])} corrupted")
+    return 1 if diff["corrupted"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
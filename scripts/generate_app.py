@@ -1,4 +1,5 @@
 import os
+from scaffold import parse_args, report, sync_files
 
 # Define the root project directory
 project_root = os.path.expanduser("~/dev/Tata-AI")
@@ -17,27 +18,24 @@ print("{service_name} Service Running...")
 # Add actual application logic here
 """
 
-# Function to generate app.py for each service
-def generate_app_py():
+# Function to generate app.py for each service (existing service code is never overwritten)
+def generate_app_py(dry_run=False, show_diff=False):
+    targets = {}
     for service_dir in service_directories:
         service_name = service_dir.split("/")[-1]  # Extract the service name (tata-core, tata-memex, etc.)
         service_path = os.path.join(project_root, service_dir)
-        
+
         # Check if the service directory exists
         if not os.path.exists(service_path):
             print(f"Directory {service_path} does not exist.")
             continue
+        targets[os.path.join(service_path, "app.py")] = app_code.format(service_name=service_name)
 
-        # Define the path for the app.py file
-        app_path = os.path.join(service_path, "app.py")
-
-        # Create app.py if it doesn't exist
-        if not os.path.exists(app_path):
-            with open(app_path, 'w') as f:
-                f.write(app_code.format(service_name=service_name))
-            print(f"Created app.py in {service_path}")
-        else:
-            print(f"app.py already exists in {service_path}")
+    results = sync_files(targets, overwrite=False, dry_run=dry_run)
+    report(results, dry_run=dry_run, show_diff=show_diff)
+    return results
 
 # Run the script to generate app.py files
-generate_app_py()
+if __name__ == "__main__":
+    args = parse_args("Generate app.py for each service")
+    generate_app_py(dry_run=args.dry_run, show_diff=args.diff)
@@ -1,49 +1,62 @@
 import os
+from scaffold import parse_args, report, sync_files
+
+# Define the root directory for your project (defaults to the checkout this script lives in)
+project_root = os.environ.get("TATA_PROJECT_ROOT", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Services that get a docker/<service>/Dockerfile; builds run with the project root as context
+services = ["tata-core", "tata-memex", "tata-zkp", "tata-flow"]
+
+# Dockerfile content template. Layers go from least to most frequently changed:
+# dependencies are built and installed from requirements.txt alone, so editing
+# service code only rebuilds the final COPY layers. Wheels are built in a separate
+# stage with a pip cache shared by every service build and bind-mounted into the
+# final stage, so they never end up in the image.
+dockerfile_content = """# syntax=docker/dockerfile:1
+# Generated by scripts/generate_dockerfiles.py -- edit the generator, not this file.
+# Build from the project root: docker build -f docker/{service}/Dockerfile .
+
+# Build wheels for the pinned dependencies (only invalidated by requirements.txt)
+FROM python:3.11-slim AS wheels
+WORKDIR /wheels
+COPY ./docker/{service}/requirements.txt /wheels/requirements.txt
+RUN --mount=type=cache,id=tata-pip,target=/root/.cache/pip \\
+    pip wheel --wheel-dir /wheels/dist -r /wheels/requirements.txt
 
-# Define the root directory for your project
-project_root = "~/dev/Tata-AI"
-
-# List of directories where Dockerfiles need to be generated
-service_directories = [
-    "docker/tata-core", 
-    "docker/tata-memex", 
-    "docker/tata-zkp", 
-    "docker/tata-flow"
-]
-
-# Dockerfile content template
-dockerfile_content = """# Use an appropriate base image
 FROM python:3.11-slim
+ENV PYTHONDONTWRITEBYTECODE=1 PYTHONUNBUFFERED=1
 
 # Set the working directory inside the container
 WORKDIR /app
 
-# Copy the current directory contents into the container
-COPY . .
+# Install dependencies before copying any source code
+COPY ./docker/{service}/requirements.txt /app/requirements.txt
+RUN --mount=type=bind,from=wheels,source=/wheels/dist,target=/wheels \\
+    pip install --no-cache-dir --no-index --find-links=/wheels -r /app/requirements.txt
 
-# Install dependencies (if any)
-RUN pip install --no-cache-dir -r requirements.txt
+# Copy the shared tata_common package, then the service itself
+COPY ./src/tata_common /app/tata_common
+COPY ./src/{service} /app
 
-# Command to run the application (replace with the actual command)
-CMD ["python", "app.py"]
+# Command to run the application (using app.py)
+CMD ["python", "/app/app.py"]
 """
 
-# Function to create Dockerfiles
-def generate_dockerfiles():
-    for service_dir in service_directories:
-        service_path = os.path.expanduser(os.path.join(project_root, service_dir))
+# Function to (re)generate the Dockerfile of each service
+def generate_dockerfiles(dry_run=False, show_diff=False):
+    targets = {}
+    for service in services:
+        service_path = os.path.join(project_root, "docker", service)
         if not os.path.exists(service_path):
             print(f"Directory {service_path} does not exist.")
             continue
+        targets[os.path.join(service_path, "Dockerfile")] = dockerfile_content.format(service=service)
 
-        dockerfile_path = os.path.join(service_path, "Dockerfile")
-        # Create the Dockerfile if it doesn't exist
-        if not os.path.exists(dockerfile_path):
-            with open(dockerfile_path, 'w') as f:
-                f.write(dockerfile_content)
-            print(f"Created Dockerfile in {service_path}")
-        else:
-            print(f"Dockerfile already exists in {service_path}")
+    results = sync_files(targets, overwrite=True, dry_run=dry_run)
+    report(results, dry_run=dry_run, show_diff=show_diff)
+    return results
 
 # Run the script to generate the Dockerfiles
-generate_dockerfiles()
+if __name__ == "__main__":
+    args = parse_args("Generate layer-cache friendly Dockerfiles for each service")
+    generate_dockerfiles(dry_run=args.dry_run, show_diff=args.diff)
@@ -1,23 +1,21 @@
-import json
 import os
+import sys
 
-CONFIG_DIR = "/Volumes/Akron/tata-ai/configs/"
-OUTPUT_DIR = "/Volumes/Akron/tata-ai/envs/"
+# Configs are resolved by the shared loader (TATA_CONFIG_DIR, then configs/)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "src"))
+from tata_common.config import DEFAULT_ENV_FILE, load_config
 
-# Ensure output directory exists
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+# Where the services and the config loader read it from (TATA_ENV_FILE), unless TATA_ENV_DIR is given
+env_file = os.path.join(os.environ["TATA_ENV_DIR"], ".env") if os.environ.get("TATA_ENV_DIR") else DEFAULT_ENV_FILE
 
-# Load and merge configurations
-def load_config(filename):
-    path = os.path.join(CONFIG_DIR, filename)
-    if os.path.exists(path):
-        with open(path, "r") as file:
-            return json.load(file)
-    return {}
+# Ensure output directory exists
+os.makedirs(os.path.dirname(env_file), exist_ok=True)
 
-huggingface = load_config("huggingface_config.json")
-monitoring = load_config("monitor_config.json")
-postgresql = load_config("postgresql_config.json")
+# Load and merge configurations (missing files fall back to empty configs)
+huggingface = load_config("huggingface_config", default={})
+monitoring = load_config("monitor_config", default={})
+postgresql = load_config("postgresql_config", default={})
 
 # Generate .env files
 env_vars = {
@@ -33,9 +31,8 @@ env_vars = {
 }
 
 # Write to .env file
-env_file = os.path.join(OUTPUT_DIR, ".env")
 with open(env_file, "w") as f:
     for key, value in env_vars.items():
         f.write(f"{key}={value}\n")
 
-print(f"✅ Environment file created at {env_file}")s
+print(f"✅ Environment file created at {env_file}")
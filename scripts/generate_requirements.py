@@ -1,45 +1,216 @@
 import os
+import re
+import ast
+import sys
+import sysconfig
+import importlib.util
+from packaging.requirements import InvalidRequirement, Requirement
+from scaffold import parse_args, report, sync_files
 
-# Define the root project directory
-project_root = "~/dev/Tata-AI"
-
-# List of directories where requirements.txt should be created
-service_directories = [
-    "docker/tata-core", 
-    "docker/tata-memex", 
-    "docker/tata-zkp", 
-    "docker/tata-flow"
-]
-
-# Example requirements for each module (adjust as needed)
-default_requirements = """
-flask
-requests
-numpy
-pandas
-# Add any other dependencies your project requires
+# Define the root project directory (defaults to the checkout this script lives in)
+project_root = os.environ.get("TATA_PROJECT_ROOT", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Services whose docker/<service>/requirements.txt is generated from src/<service>
+services = ["tata-core", "tata-memex", "tata-zkp", "tata-flow"]
+
+# Shared package copied into every image; its imports count for services that use it
+shared_package = "tata_common"
+
+# Import names that differ from the distribution name on PyPI
+module_to_distribution = {
+    "PIL": "Pillow",
+    "yaml": "PyYAML",
+    "dotenv": "python-dotenv",
+    "sklearn": "scikit-learn",
+    "psycopg2": "psycopg2-binary",
+    "mysql": "mysql-connector-python",
+    "bson": "pymongo",
+    "jwt": "PyJWT",
+    "dateutil": "python-dateutil",
+    "google": "protobuf",
+    "msgpack": "msgpack",
+    "cv2": "opencv-python-headless",
+}
+
+header = """# Generated by scripts/generate_requirements.py from the imports in src/{service}
+# and the declared dependencies in src/{service}/requirements.txt -- edit those, not this file.
 """
 
-# Function to create requirements.txt in each directory
-def generate_requirements_txt():
-    for service_dir in service_directories:
-        service_path = os.path.expanduser(os.path.join(project_root, service_dir))
-        
-        # Check if the service directory exists
+# Standard library modules that can't be located on every platform
+platform_stdlib = {"msvcrt", "winreg", "winsound", "_winapi", "nt", "_overlapped", "posix", "pwd", "grp",
+                   "termios", "fcntl", "resource", "syslog", "crypt", "spwd", "nis", "ossaudiodev", "_posixsubprocess"}
+stdlib_dirs = tuple(os.path.realpath(sysconfig.get_paths()[key]) + os.sep for key in ("stdlib", "platstdlib"))
+
+def is_stdlib(module):
+    if hasattr(sys, "stdlib_module_names"):  # 3.10+
+        return module in sys.stdlib_module_names
+    if module in sys.builtin_module_names or module in platform_stdlib:
+        return True
+    # Older interpreters: a module is in the standard library if it is found there
+    try:
+        spec = importlib.util.find_spec(module)
+    except (ImportError, ValueError):
+        return False
+    if spec is None or spec.origin is None:
+        return False
+    if spec.origin in ("built-in", "frozen"):
+        return True
+    origin = os.path.realpath(spec.origin)
+    return origin.startswith(stdlib_dirs) and "-packages" + os.sep not in origin
+
+def normalize(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+# Parse a requirements file into {normalized name: requirement line}, keeping the first entry
+def read_requirements(path):
+    requirements = {}
+    if not os.path.exists(path):
+        return requirements
+    with open(path, "r") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line or line.startswith("-"):
+                continue
+            name = re.split(r"[\s<>=!~;\[]", line, 1)[0]
+            requirements.setdefault(normalize(name), line)
+    return requirements
+
+# Top-level modules imported by one file, plus the tata_common modules it pulls in
+def file_imports(path, package=None):
+    with open(path, "r") as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules, shared = set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            if node.level and not package:
+                continue  # relative import within the service
+            if node.level:
+                base = package.split(".")[:len(package.split(".")) - node.level + 1]
+                target = ".".join(base + ([node.module] if node.module else []))
+                shared.add(target)
+                shared.update(f"{target}.{alias.name}" for alias in node.names)
+                continue
+            names = [node.module] if node.module else []
+        else:
+            continue
+        for name in names:
+            if name.split(".")[0] == shared_package:
+                shared.add(name)
+            else:
+                modules.add(name.split(".")[0])
+    return modules, shared
+
+# Map a tata_common module name to its file (None for names that are not modules)
+def shared_module_path(name):
+    path = os.path.join(project_root, "src", *name.split("."))
+    if os.path.isdir(path):
+        return os.path.join(path, "__init__.py"), name
+    if os.path.isfile(f"{path}.py"):
+        return f"{path}.py", name.rsplit(".", 1)[0]
+    return None, None
+
+# Python files of a service, subpackages included
+def service_files(service_dir):
+    for dirpath, dirnames, filenames in os.walk(service_dir):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith((".", "__pycache__")))
+        for filename in sorted(filenames):
+            if filename.endswith(".py"):
+                yield os.path.join(dirpath, filename)
+
+# Every third-party module a service imports, following tata_common imports transitively
+def service_imports(service):
+    service_dir = os.path.join(project_root, "src", service)
+    local = {os.path.splitext(entry)[0] for entry in os.listdir(service_dir)}
+    modules, pending = set(), set()
+    for path in service_files(service_dir):
+        found, shared = file_imports(path)
+        modules |= found
+        pending |= shared
+    seen = set()
+    while pending:
+        name = pending.pop()
+        # Importing a submodule runs every package __init__ above it
+        parts = name.split(".")
+        for depth in range(1, len(parts) + 1):
+            path, package = shared_module_path(".".join(parts[:depth]))
+            if path is None or path in seen:
+                continue
+            seen.add(path)
+            found, shared = file_imports(path, package)
+            modules |= found
+            pending |= shared
+    return {module for module in modules if not is_stdlib(module) and module not in local
+            and module != "__future__"}
+
+def pinned_version(requirement):
+    """The exact version a requirement pins, or None."""
+    specifiers = list(requirement.specifier)
+    if len(specifiers) == 1 and specifiers[0].operator in ("==", "===") and "*" not in specifiers[0].version:
+        return specifiers[0].version
+    return None
+
+# Version to pin to: the declared pin, else the installed version or the previously
+# generated pin, whichever first satisfies the declared specifier (e.g. redis>=5.0)
+def resolve_pin(name, declared, previous):
+    requirement = Requirement(declared)
+    if pinned_version(requirement):
+        return declared
+    candidates = []
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+        try:
+            candidates.append(version(name))
+        except PackageNotFoundError:
+            pass
+    except ImportError:
+        pass
+    try:
+        candidates.append(pinned_version(Requirement(previous)) if previous else None)
+    except InvalidRequirement:
+        pass
+    for candidate in candidates:
+        if candidate and requirement.specifier.contains(candidate, prereleases=True):
+            extras = f"[{','.join(sorted(requirement.extras))}]" if requirement.extras else ""
+            marker = f"; {requirement.marker}" if requirement.marker else ""
+            return f"{requirement.name}{extras}=={candidate}{marker}"
+    return None
+
+def service_requirements(service):
+    declared = read_requirements(os.path.join(project_root, "src", service, "requirements.txt"))
+    for module in service_imports(service):
+        distribution = module_to_distribution.get(module, module)
+        declared.setdefault(normalize(distribution), distribution)
+    previous = read_requirements(os.path.join(project_root, "docker", service, "requirements.txt"))
+    lines = []
+    for key in sorted(declared):
+        requirement = declared[key]
+        name = re.split(r"[\s<>=!~;\[]", requirement, 1)[0]
+        pinned = resolve_pin(name, requirement, previous.get(key, ""))
+        if pinned is None:
+            print(f"Warning: {service}: could not pin {requirement}; install a matching version locally and re-run")
+            pinned = requirement
+        lines.append(pinned)
+    return header.format(service=service) + "".join(f"{line}\n" for line in lines)
+
+# Function to (re)generate docker/<service>/requirements.txt for each service
+def generate_requirements_txt(dry_run=False, show_diff=False):
+    targets = {}
+    for service in services:
+        service_path = os.path.join(project_root, "src", service)
+
+        # Check if the service source directory exists
         if not os.path.exists(service_path):
             print(f"Directory {service_path} does not exist.")
             continue
+        targets[os.path.join(project_root, "docker", service, "requirements.txt")] = service_requirements(service)
 
-        # Define the path to the requirements.txt file
-        requirements_path = os.path.join(service_path, "requirements.txt")
-
-        # Create the requirements.txt if it doesn't exist
-        if not os.path.exists(requirements_path):
-            with open(requirements_path, 'w') as f:
-                f.write(default_requirements)
-            print(f"Created requirements.txt in {service_path}")
-        else:
-            print(f"requirements.txt already exists in {service_path}")
+    results = sync_files(targets, overwrite=True, dry_run=dry_run)
+    report(results, dry_run=dry_run, show_diff=show_diff)
+    return results
 
 # Run the script to generate requirements.txt files
-generate_requirements_txt()
+if __name__ == "__main__":
+    args = parse_args("Generate pinned requirements.txt for each service from its imports")
+    generate_requirements_txt(dry_run=args.dry_run, show_diff=args.diff)
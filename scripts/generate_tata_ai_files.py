@@ -1,4 +1,5 @@
 import os
+from scaffold import parse_args, report, sync_files
 
 # Define the existing project folder
 root_dir = "~/dev/Tata-AI"
@@ -150,20 +151,18 @@ pytest tests/tata-flow/
 """
 }
 
-# Function to create the project files and folders
-def create_project_files(root_dir):
-    # Create the directories if not already present
-    os.makedirs(root_dir, exist_ok=True)
-    
-    # Loop through the files and write the content to them
-    for file, content in files.items():
-        file_path = os.path.join(root_dir, file)
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'w') as f:
-            f.write(content)
-    
-    print(f"Project files created successfully at {root_dir}")
+# Function to create the project files and folders; only files whose content
+# changed are rewritten, so untouched files keep their mtimes
+def create_project_files(root_dir, dry_run=False, show_diff=False):
+    targets = {os.path.join(root_dir, file): content for file, content in files.items()}
+    results = sync_files(targets, dry_run=dry_run)
+    report(results, dry_run=dry_run, show_diff=show_diff)
+
+    print(f"Project files {'checked' if dry_run else 'synced'} at {root_dir}")
+    return results
 
 # Run the script to generate files without nesting
-root_dir = os.path.expanduser("~/dev/Tata-AI")
-create_project_files(root_dir)
+if __name__ == "__main__":
+    args = parse_args("Generate the Tata AI project files")
+    root_dir = os.path.expanduser("~/dev/Tata-AI")
+    create_project_files(root_dir, dry_run=args.dry_run, show_diff=args.diff)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Long-running health monitor for the Tata AI stack.
+
+Samples service health, host CPU/memory/disk and per-container stats every
+--interval seconds into a multi-resolution time-series store (see
+timeseries_store.py) instead of writing one JSON file per run.
+
+    python3 health_monitor.py --interval 10
+    python3 health_monitor.py --query host.cpu_percent --window 3600
+"""
+import os
+import json
+import time
+import signal
+import asyncio
+import argparse
+import subprocess
+import psutil
+from setup_tata_ai import probe_services, tata_services
+from timeseries_store import TimeSeriesStore
+
+# Define paths
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_PATH = os.path.join(PROJECT_DIR, "logs", "health_metrics.tsdb")
+
+# Persist the store every N samples rather than on every tick
+save_every = 6
+
+# Host CPU, memory and disk usage as percentages
+def sample_host():
+    return {
+        "host.cpu_percent": psutil.cpu_percent(interval=None),
+        "host.memory_percent": psutil.virtual_memory().percent,
+        "host.disk_percent": psutil.disk_usage(PROJECT_DIR).percent,
+    }
+
+# Per-container CPU/memory from a single `docker stats` call
+def sample_containers():
+    result = subprocess.run(["docker", "stats", "--no-stream", "--format", "{{json .}}"],
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    samples = {}
+    for line in result.stdout.splitlines():
+        try:
+            stats = json.loads(line)
+            name = stats["Name"]
+            samples[f"container.{name}.cpu_percent"] = float(stats["CPUPerc"].rstrip("%"))
+            samples[f"container.{name}.memory_percent"] = float(stats["MemPerc"].rstrip("%"))
+        except (ValueError, KeyError):
+            continue
+    return samples
+
+# Service health as 1/0 plus probe latency; single attempt since the next tick retries anyway
+def sample_services():
+    results = asyncio.run(probe_services(tata_services, retries=1))
+    samples = {}
+    for name, result in results.items():
+        samples[f"service.{name}.up"] = 1.0 if result["healthy"] else 0.0
+        samples[f"service.{name}.latency_ms"] = result["latency_ms"]
+    return samples
+
+def sample_all():
+    samples = {}
+    for sampler in (sample_host, sample_containers, sample_services):
+        try:
+            samples.update(sampler())
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"[WARNING] {sampler.__name__} failed: {e}")
+    return samples
+
+def run_monitor(store, interval):
+    stopping = []
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stopping.append(True))
+    psutil.cpu_percent(interval=None)  # prime the CPU counter so the first sample is meaningful
+    ticks = 0
+    next_tick = time.monotonic()
+    print(f"Monitoring every {interval}s into {store.path}")
+    while not stopping:
+        store.append_many(sample_all())
+        ticks += 1
+        if ticks % save_every == 0:
+            store.save()
+        next_tick += interval
+        while not stopping and time.monotonic() < next_tick:
+            time.sleep(min(0.5, next_tick - time.monotonic()))
+    store.save()
+    print("Monitor stopped, metrics saved.")
+
+def print_query(store, metric, window):
+    metrics = [m for m in store.metrics() if m.startswith(metric)] if metric.endswith(".") else [metric]
+    for name in metrics:
+        print(name)
+        for ts, mean, low, high, count in store.query(name, window=window):
+            stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(ts))
+            print(f"  {stamp}  mean={mean:.2f} min={low:.2f} max={high:.2f} n={count}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Continuous Tata AI health monitor")
+    parser.add_argument("--interval", type=float, default=10, help="seconds between samples")
+    parser.add_argument("--store", default=STORE_PATH, help="time-series store file")
+    parser.add_argument("--query", help="print a metric (or a prefix ending in '.') instead of monitoring")
+    parser.add_argument("--window", type=float, default=3600, help="query window in seconds")
+    parser.add_argument("--list", action="store_true", help="list stored metrics")
+    args = parser.parse_args()
+
+    store = TimeSeriesStore(args.store)
+    if args.list:
+        print("\n".join(store.metrics()))
+    elif args.query:
+        print_query(store, args.query, args.window)
+    else:
+        run_monitor(store, args.interval)
+
+if __name__ == "__main__":
+    main()
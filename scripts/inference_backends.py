@@ -0,0 +1,98 @@
+import os
+
+# Model loading shared by the inference server, the batch runner and the benchmarks.
+#
+# prepare_deployment.py records where things are in public/: model_path.txt (the
+# Hugging Face snapshot), draft_model_path.txt (optional speculative-decoding
+# draft) and onnx_model_path.txt (optional optimized ONNX export). A backend is
+# just a tokenizer plus a model object with the transformers generate() API,
+# so callers don't care which runtime is underneath.
+
+PUBLIC_DIR = os.environ.get("TATA_PUBLIC_DIR", "public")
+
+# Optimized graph written by export_onnx(); plain model.onnx is used if it is missing
+ONNX_FILE_NAMES = ("model_optimized.onnx", "model.onnx")
+
+def read_path(name, env_var=None):
+    """Path stored in public/<name>, overridden by env_var when that is set; None if neither is."""
+    if env_var and os.environ.get(env_var):
+        return os.environ[env_var]
+    path = os.path.join(PUBLIC_DIR, name)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return f.read().strip() or None
+
+def default_threads():
+    """Intra-op threads per process: TATA_INFERENCE_THREADS, else every CPU this process may use."""
+    if os.environ.get("TATA_INFERENCE_THREADS"):
+        return int(os.environ["TATA_INFERENCE_THREADS"])
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+class TorchBackend:
+    name = "torch"
+
+    def __init__(self, model_path, threads=None):
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+        torch.set_num_threads(threads or default_threads())
+        self.model_path = model_path
+        self.model = AutoModelForCausalLM.from_pretrained(model_path).eval()
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+
+class OnnxBackend:
+    """onnxruntime session with the KV cache as graph inputs/outputs, behind generate()."""
+
+    name = "onnx"
+
+    def __init__(self, onnx_path, threads=None):
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForCausalLM
+        from transformers import AutoTokenizer
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = threads or default_threads()
+        options.inter_op_num_threads = 1
+        file_name = next((name for name in ONNX_FILE_NAMES if os.path.exists(os.path.join(onnx_path, name))),
+                         ONNX_FILE_NAMES[-1])
+        self.model_path = onnx_path
+        self.model = ORTModelForCausalLM.from_pretrained(onnx_path, file_name=file_name, use_cache=True,
+                                                         session_options=options,
+                                                         provider="CPUExecutionProvider")
+        self.tokenizer = AutoTokenizer.from_pretrained(onnx_path)
+
+def load_backend(kind=None, threads=None):
+    """Loads the backend named by `kind` or TATA_INFERENCE_BACKEND ("torch" by default)."""
+    kind = (kind or os.environ.get("TATA_INFERENCE_BACKEND", "torch")).lower()
+    if kind == "torch":
+        model_path = read_path("model_path.txt", "TATA_MODEL_PATH")
+        if model_path is None:
+            raise FileNotFoundError(f"No model configured: run prepare_deployment.py to write "
+                                    f"{os.path.join(PUBLIC_DIR, 'model_path.txt')}")
+        return TorchBackend(model_path, threads)
+    if kind == "onnx":
+        onnx_path = read_path("onnx_model_path.txt", "TATA_ONNX_MODEL_PATH")
+        if onnx_path is None:
+            raise FileNotFoundError("No ONNX model configured: run prepare_deployment.py --onnx")
+        return OnnxBackend(onnx_path, threads)
+    raise ValueError(f"Unknown inference backend: {kind!r} (expected 'torch' or 'onnx')")
+
+def export_onnx(model_path, output_dir, optimization_level=2):
+    """Exports a causal LM with its KV cache to ONNX and applies onnxruntime graph fusions."""
+    from optimum.onnxruntime import ORTModelForCausalLM, ORTOptimizer
+    from optimum.onnxruntime.configuration import OptimizationConfig
+    from transformers import AutoTokenizer
+    model = ORTModelForCausalLM.from_pretrained(model_path, export=True, use_cache=True)
+    model.save_pretrained(output_dir)
+    try:
+        optimizer = ORTOptimizer.from_pretrained(model)
+        optimizer.optimize(save_dir=output_dir,
+                           optimization_config=OptimizationConfig(optimization_level=optimization_level))
+    except Exception as e:  # unsupported architecture for fusions: keep the plain export
+        print(f"ONNX graph optimization skipped: {e}")
+    AutoTokenizer.from_pretrained(model_path).save_pretrained(output_dir)
+    return output_dir
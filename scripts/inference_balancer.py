@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Least-outstanding-work load balancer for inference server replicas.
+
+Generation requests differ a lot in cost, so round-robin can stack several long
+jobs on one replica while another sits idle. This proxy keeps a running total
+of the tokens each replica has in flight (an estimate from the prompt length
+plus the generation budget) and sends every request to the replica with the
+least outstanding work.
+
+Replicas are probed in the background (GET /metrics). A replica is ejected
+after `fall` failed probes in a row, or as soon as a proxied request fails to
+connect. It comes back after `rise` good probes. Clients that disconnect have
+their upstream request cancelled, which the inference server turns into a
+cancelled generation. X-Request-Timeout is passed through.
+
+    TATA_INFERENCE_REPLICAS=http://10.0.0.5:8000,http://10.0.0.6:8000 python3 inference_balancer.py
+    python3 inference_balancer.py --replica http://localhost:8001 --replica http://localhost:8002 --port 8000
+"""
+import os
+import json
+import time
+import asyncio
+import random
+import argparse
+from contextlib import asynccontextmanager
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response
+
+# Tokens assumed per request for generation when the body doesn't say (the server's max_length)
+default_generation_tokens = 100
+# Rough characters per prompt token for the in-flight estimate
+chars_per_token = 4
+
+# Hop-by-hop headers that must not be forwarded
+hop_headers = {"connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailers",
+               "transfer-encoding", "upgrade", "host", "content-length"}
+
+class Replica:
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+        self.healthy = True
+        self.in_flight = 0
+        self.in_flight_tokens = 0
+        self.failures = 0   # consecutive failed probes
+        self.successes = 0  # consecutive good probes while ejected
+        self.requests = 0
+        self.errors = 0
+        self.latency_ms = None  # moving average of proxied request latency
+
+    def snapshot(self):
+        return {"url": self.url, "healthy": self.healthy, "in_flight": self.in_flight,
+                "in_flight_tokens": self.in_flight_tokens, "requests": self.requests, "errors": self.errors,
+                "latency_ms": round(self.latency_ms, 2) if self.latency_ms is not None else None}
+
+def estimate_tokens(body):
+    """Expected decoding work for a request body: prompt tokens plus the generation budget."""
+    try:
+        payload = json.loads(body)
+        text = payload.get("text", "")
+        generation = int(payload.get("max_new_tokens", default_generation_tokens))
+    except (ValueError, AttributeError, TypeError):
+        return len(body) // chars_per_token + default_generation_tokens
+    return len(text) // chars_per_token + generation
+
+class Balancer:
+    def __init__(self, replicas, policy="least_tokens", probe_interval=2.0, probe_timeout=1.0, fall=2, rise=2,
+                 request_timeout=300.0, disconnect_poll_interval=0.1):
+        if not replicas:
+            raise ValueError("No inference replicas configured")
+        if policy not in ("least_tokens", "round_robin"):
+            raise ValueError(f"Unknown balancing policy: {policy!r}")
+        self.replicas = [Replica(url) for url in replicas]
+        self.policy = policy
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.fall = fall
+        self.rise = rise
+        self.disconnect_poll_interval = disconnect_poll_interval
+        self.next_index = 0
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=64)
+        self.client = httpx.AsyncClient(timeout=httpx.Timeout(request_timeout, connect=probe_timeout),
+                                        limits=limits)
+        self.probe_task = None
+
+    def pick(self, exclude=()):
+        candidates = [r for r in self.replicas if r.healthy and r not in exclude]
+        if not candidates:
+            return None
+        if self.policy == "round_robin":
+            replica = candidates[self.next_index % len(candidates)]
+            self.next_index += 1
+            return replica
+        least = min((r.in_flight_tokens, r.in_flight) for r in candidates)
+        return random.choice([r for r in candidates if (r.in_flight_tokens, r.in_flight) == least])
+
+    def eject(self, replica, reason):
+        if replica.healthy:
+            print(f"Ejecting {replica.url}: {reason}")
+        replica.healthy = False
+        replica.successes = 0
+
+    async def probe(self, replica):
+        try:
+            response = await self.client.get(f"{replica.url}/metrics", timeout=self.probe_timeout)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            replica.failures = 0
+            if not replica.healthy:
+                replica.successes += 1
+                if replica.successes >= self.rise:
+                    replica.healthy = True
+                    print(f"Restoring {replica.url}")
+        else:
+            replica.failures += 1
+            replica.successes = 0
+            if replica.failures >= self.fall:
+                self.eject(replica, f"{replica.failures} failed probes")
+
+    async def probe_forever(self):
+        while True:
+            await asyncio.gather(*(self.probe(r) for r in self.replicas))
+            await asyncio.sleep(self.probe_interval)
+
+    def start(self):
+        self.probe_task = asyncio.get_running_loop().create_task(self.probe_forever())
+
+    async def close(self):
+        if self.probe_task is not None:
+            self.probe_task.cancel()
+        await self.client.aclose()
+
+    async def forward(self, request, path):
+        body = await request.body()
+        tokens = estimate_tokens(body) if request.method == "POST" else 0
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in hop_headers}
+        tried = []
+        while True:
+            replica = self.pick(exclude=tried)
+            if replica is None:
+                raise HTTPException(status_code=503, detail="No healthy inference replicas")
+            tried.append(replica)
+            replica.in_flight += 1
+            replica.in_flight_tokens += tokens
+            replica.requests += 1
+            start = time.perf_counter()
+            try:
+                upstream = asyncio.ensure_future(self.client.request(
+                    request.method, f"{replica.url}/{path}", content=body, headers=headers,
+                    params=request.query_params))
+                while not (await asyncio.wait({upstream}, timeout=self.disconnect_poll_interval))[0]:
+                    if await request.is_disconnected():
+                        upstream.cancel()  # closes the upstream connection; the replica stops generating
+                        raise HTTPException(status_code=499, detail="Client disconnected")
+                response = upstream.result()
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                # Nothing reached the replica, so the request is safe to send elsewhere
+                replica.errors += 1
+                self.eject(replica, f"connect failed: {e}")
+                continue
+            except httpx.HTTPError as e:
+                replica.errors += 1
+                raise HTTPException(status_code=502, detail=f"{replica.url}: {type(e).__name__}")
+            finally:
+                replica.in_flight -= 1
+                replica.in_flight_tokens -= tokens
+            elapsed = 1000 * (time.perf_counter() - start)
+            replica.latency_ms = elapsed if replica.latency_ms is None else 0.9 * replica.latency_ms + 0.1 * elapsed
+            response_headers = {k: v for k, v in response.headers.items()
+                                if k.lower() not in hop_headers and k.lower() != "content-encoding"}
+            return Response(content=response.content, status_code=response.status_code, headers=response_headers)
+
+def create_app(balancer):
+    @asynccontextmanager
+    async def lifespan(app):
+        balancer.start()
+        yield
+        await balancer.close()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.get("/balancer/status")
+    async def status():
+        return {"policy": balancer.policy, "replicas": [r.snapshot() for r in balancer.replicas]}
+
+    @app.api_route("/{path:path}", methods=["GET", "POST"])
+    async def proxy(path: str, request: Request):
+        return await balancer.forward(request, path)
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-balance requests across inference server replicas")
+    parser.add_argument("--replica", action="append", help="replica base URL (repeatable; default: "
+                                                             "TATA_INFERENCE_REPLICAS, comma-separated)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--policy", choices=["least_tokens", "round_robin"], default="least_tokens")
+    parser.add_argument("--probe-interval", type=float, default=2.0, help="seconds between health probes")
+    parser.add_argument("--fall", type=int, default=2, help="failed probes before a replica is ejected")
+    parser.add_argument("--rise", type=int, default=2, help="good probes before it is restored")
+    args = parser.parse_args()
+
+    replicas = args.replica or [url for url in os.environ.get("TATA_INFERENCE_REPLICAS", "").split(",") if url]
+    balancer = Balancer(replicas, policy=args.policy, probe_interval=args.probe_interval,
+                        fall=args.fall, rise=args.rise)
+    import uvicorn
+    uvicorn.run(create_app(balancer), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Search the Tata AI monitor logs through the indexed log store.
+
+New lines in logs/system_monitor_*.log and logs/monitor_results_*.json are
+ingested incrementally before every query (see log_store.py), so only data
+written since the last run is parsed.
+
+    python3 log_search.py --level ERROR --service tata-core --window 86400
+    python3 log_search.py --contains "memory" --limit 20
+    python3 log_search.py --follow
+"""
+import os
+import json
+import asyncio
+import argparse
+from log_store import LogStore, parse_iso
+
+# Define paths
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOG_DIR = os.path.join(PROJECT_DIR, "logs")
+
+def print_rows(rows, as_json=False):
+    for row in rows:
+        if as_json:
+            print(json.dumps(row))
+        else:
+            print(f"[{row['ts']}] [{row['level']}] {row['message']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the Tata AI monitor logs")
+    parser.add_argument("--logs", default=LOG_DIR, help="log directory")
+    parser.add_argument("--level", action="append", help="level to match (repeatable), e.g. ERROR")
+    parser.add_argument("--service", action="append", help="service to match (repeatable), e.g. tata-core")
+    parser.add_argument("--window", type=float, help="only the last N seconds")
+    parser.add_argument("--since", help="ISO timestamp lower bound, e.g. 2025-03-07T00:00:00")
+    parser.add_argument("--until", help="ISO timestamp upper bound")
+    parser.add_argument("--contains", help="case-insensitive text the message must contain")
+    parser.add_argument("--limit", type=int, help="maximum number of rows")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per row")
+    parser.add_argument("--stats", action="store_true", help="print index statistics instead of rows")
+    parser.add_argument("--follow", action="store_true", help="keep tailing the logs and print new matches")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between polls with --follow")
+    args = parser.parse_args()
+
+    store = LogStore(args.logs)
+    store.ingest()
+    if args.stats:
+        print(json.dumps(store.stats(), indent=2))
+        return
+
+    since = parse_iso(args.since) / 1000 if args.since else None
+    until = parse_iso(args.until) / 1000 if args.until else None
+    filters = {"level": args.level, "service": args.service, "contains": args.contains}
+    rows = store.query(window=args.window, since=since, until=until, limit=args.limit, **filters)
+    print_rows(rows, args.json)
+    if not args.follow:
+        return
+
+    # Rows already printed at the latest timestamp, since several lines can share a millisecond
+    seen = {(row["ts"], row["source"], row["message"]) for row in rows if row["ts"] == rows[-1]["ts"]} if rows else set()
+    last_ts = rows[-1]["ts"] if rows else None
+
+    def on_rows(_):
+        nonlocal last_ts, seen
+        since_last = parse_iso(last_ts) / 1000 if last_ts else None
+        new_rows = [row for row in store.query(window=args.window, since=since_last, **filters)
+                    if (row["ts"], row["source"], row["message"]) not in seen]
+        print_rows(new_rows, args.json)
+        if new_rows:
+            last_ts = new_rows[-1]["ts"]
+            seen = {(row["ts"], row["source"], row["message"]) for row in new_rows if row["ts"] == last_ts}
+
+    try:
+        asyncio.run(store.follow(args.interval, on_rows))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
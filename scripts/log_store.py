@@ -0,0 +1,411 @@
+import os
+import re
+import json
+import zlib
+import time
+import struct
+import asyncio
+import calendar
+from array import array
+from itertools import accumulate
+from bisect import bisect_left, bisect_right
+
+# Columnar, indexed store for the monitor logs in logs/.
+#
+# `[timestamp] [LEVEL] message` lines from system_monitor_*.log and the per-run
+# monitor_results_*.json files are tailed incrementally (byte offset + inode per
+# file, so only new data is parsed) and appended to immutable segments of up to
+# `segment_rows` rows. Each segment stores its rows sorted by time as packed
+# columns (ts, level, services bitmask, source) plus a zlib-compressed message
+# blob and one row-id posting list per level. The store state keeps a zone map
+# per segment (time range, level counts, services seen), so a query only opens
+# segments that can match, bisects the time column and walks the posting list
+# of the requested level instead of scanning any log text.
+
+segment_rows = 65536
+
+# Read at most this many new bytes per file per pass so huge files catch up gradually
+max_read_bytes = 64 * 1024 * 1024
+
+segment_magic = b"TATALG1\n"
+
+# Level codes are stable once assigned; unknown levels are appended as they are seen
+default_levels = ("DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL")
+
+line_pattern = re.compile(r"^\[(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(\.\d+)?Z?\] \[([A-Za-z]+)\] ?(.*)$")
+
+# Service names are recognised in messages as e.g. "tata-core", "Tata Core API" or "tata_core"
+service_pattern = re.compile(r"\btata[\s_-]?(core|flow|memex|zkp|moto)\b", re.IGNORECASE)
+
+log_glob = re.compile(r"^system_monitor_.*\.log$")
+results_glob = re.compile(r"^monitor_results_.*\.json$")
+
+_second_cache = {}
+
+# "2025-03-07T16:19:30" + ".935" -> epoch milliseconds; whole seconds are cached because
+# consecutive lines almost always share them
+def parse_ts(seconds, fraction=None):
+    base = _second_cache.get(seconds)
+    if base is None:
+        if len(_second_cache) > 100000:
+            _second_cache.clear()
+        base = calendar.timegm(time.strptime(seconds, "%Y-%m-%dT%H:%M:%S")) * 1000
+        _second_cache[seconds] = base
+    return base + (int(float(fraction) * 1000) if fraction else 0)
+
+def parse_iso(value):
+    match = re.match(r"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(\.\d+)?", value or "")
+    return parse_ts(match.group(1), match.group(2)) if match else None
+
+def format_ts(ms):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(ms // 1000)) + f".{ms % 1000:03d}Z"
+
+def find_services(message):
+    return {f"tata-{name.lower()}" for name in service_pattern.findall(message)}
+
+# Parse new log lines; returns rows (ts_ms, level, message) and the number of bytes consumed.
+# Only complete lines are consumed, and lines without a header (e.g. tracebacks) are folded
+# into the message of the line before them.
+def parse_log_chunk(data, last=None):
+    rows = []
+    end = data.rfind(b"\n") + 1
+    for raw in data[:end].decode("utf-8", errors="replace").splitlines():
+        match = line_pattern.match(raw)
+        if match:
+            seconds, fraction, level, message = match.groups()
+            rows.append([parse_ts(seconds, fraction), level.upper(), message])
+        elif rows:
+            rows[-1][2] += "\n" + raw
+        elif raw.strip():
+            ts, level = last if last else (0, "INFO")
+            rows.append([ts, level, raw])
+    return rows, end
+
+# One row per service, container and resource check in a monitor_results_*.json file
+def parse_results(data):
+    results = json.loads(data)
+    ts = parse_iso(results.get("timestamp")) or 0
+    rows = []
+    for name, result in (results.get("services") or {}).items():
+        if result.get("success"):
+            rows.append([ts, "SUCCESS", f"Service {name} is healthy"])
+        else:
+            detail = result.get("error") or f"Status code: {result.get('statusCode')}"
+            rows.append([ts, "ERROR", f"Service {name} is unhealthy: {detail}"])
+    for name, status in ((results.get("docker") or {}).get("containerStatus") or {}).items():
+        running = status.get("running") if isinstance(status, dict) else bool(status)
+        rows.append([ts, "SUCCESS" if running else "ERROR",
+                     f"Container {name} is {'running' if running else 'not running'}"])
+    resources = results.get("resources") or {}
+    for name in ("cpu", "memory", "disk"):
+        if isinstance(resources.get(name), dict) and "usage" in resources[name]:
+            rows.append([ts, "INFO", f"{name} usage: {resources[name]['usage']}"])
+    return rows
+
+class Segment:
+    """One immutable block of rows sorted by time; messages are decompressed on first access."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(segment_magic)) != segment_magic:
+                raise ValueError(f"{path} is not a log segment")
+            (length,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(length))
+            count = header["count"]
+            self.ts = array("q")
+            self.ts.fromfile(f, count)
+            self.level = array("B")
+            self.level.fromfile(f, count)
+            self.services = array("Q")
+            self.services.fromfile(f, count)
+            self.source = array("H")
+            self.source.fromfile(f, count)
+            self.postings = {}
+            for code, n in header["postings"]:
+                rows = array("I")
+                rows.fromfile(f, n)
+                self.postings[code] = rows
+            self.offsets = array("I")
+            self.offsets.fromfile(f, count + 1)
+            self._compressed = f.read(header["messages"])
+        self._messages = None
+
+    def message(self, row):
+        if self._messages is None:
+            self._messages = zlib.decompress(self._compressed)
+        return self._messages[self.offsets[row]:self.offsets[row + 1]].decode("utf-8")
+
+    @staticmethod
+    def write(path, rows):
+        """Writes rows [(ts, level_code, services_mask, source_code, message), ...] sorted by ts."""
+        rows = sorted(rows, key=lambda row: row[0])
+        postings = {}
+        for i, row in enumerate(rows):
+            postings.setdefault(row[1], array("I")).append(i)
+        messages = [row[4].encode("utf-8") for row in rows]
+        offsets = array("I", [0])
+        offsets.extend(accumulate(len(message) for message in messages))
+        blob = b"".join(messages)
+        compressed = zlib.compress(blob, 6)
+        header = {"count": len(rows), "messages": len(compressed),
+                  "postings": [[code, len(ids)] for code, ids in sorted(postings.items())]}
+        encoded = json.dumps(header).encode()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(segment_magic)
+            f.write(struct.pack("<I", len(encoded)))
+            f.write(encoded)
+            f.write(array("q", (row[0] for row in rows)).tobytes())
+            f.write(array("B", (row[1] for row in rows)).tobytes())
+            f.write(array("Q", (row[2] for row in rows)).tobytes())
+            f.write(array("H", (row[3] for row in rows)).tobytes())
+            for code, ids in sorted(postings.items()):
+                f.write(ids.tobytes())
+            f.write(offsets.tobytes())
+            f.write(compressed)
+        os.replace(tmp_path, path)
+        levels = {}
+        services = 0
+        for row in rows:
+            levels[row[1]] = levels.get(row[1], 0) + 1
+            services |= row[2]
+        return {"count": len(rows), "min_ts": rows[0][0], "max_ts": rows[-1][0],
+                "levels": {str(code): n for code, n in levels.items()}, "services": services}
+
+class LogStore:
+    """Incrementally ingested, segment-indexed store for the files in a logs directory."""
+
+    def __init__(self, log_dir, index_dir=None):
+        self.log_dir = log_dir
+        self.index_dir = index_dir or os.path.join(log_dir, ".log_index")
+        self.state_path = os.path.join(self.index_dir, "state.json")
+        self.state = {"levels": list(default_levels), "services": [], "sources": [], "files": {},
+                      "segments": [], "next_segment": 0}
+        self._segments = {}  # name -> loaded Segment
+        self._masks = {}  # service names found in a message -> bitmask
+        self._codes = {}  # table -> {value: code}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r") as f:
+                self.state.update(json.load(f))
+
+    def _code(self, table, value, limit):
+        codes = self._codes.setdefault(table, {})
+        if value not in codes:
+            values = self.state[table]
+            if value not in values:
+                if len(values) >= limit:
+                    raise ValueError(f"Too many distinct {table} in the log index (limit {limit})")
+                values.append(value)
+            codes[value] = values.index(value)
+        return codes[value]
+
+    def _services_mask(self, message):
+        found = tuple(service_pattern.findall(message))
+        mask = self._masks.get(found)
+        if mask is None:
+            mask = 0
+            for name in find_services(message):
+                mask |= 1 << self._code("services", name, 64)
+            self._masks[found] = mask
+        return mask
+
+    # Read whatever is new in one file; safe to run in a worker thread (it only reads state)
+    def _read_new(self, name):
+        path = os.path.join(self.log_dir, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return name, None, []
+        known = self.state["files"].get(name, {})
+        offset = known.get("offset", 0)
+        if known.get("inode") != st.st_ino or st.st_size < offset:
+            offset = 0  # rotated or truncated: start over
+        if results_glob.match(name):
+            if known.get("inode") == st.st_ino and known.get("size") == st.st_size and offset:
+                return name, known, []
+            with open(path, "rb") as f:
+                data = f.read()
+            try:
+                rows = parse_results(data)
+            except ValueError:
+                return name, known, []  # still being written; picked up on the next pass
+            return name, {"inode": st.st_ino, "size": st.st_size, "offset": st.st_size}, rows
+        if st.st_size == offset:
+            return name, known, []
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(max_read_bytes)
+        last = (known["last_ts"], known["last_level"]) if "last_ts" in known else None
+        rows, consumed = parse_log_chunk(data, last)
+        updated = {"inode": st.st_ino, "size": st.st_size, "offset": offset + consumed}
+        if rows:
+            updated.update(last_ts=rows[-1][0], last_level=rows[-1][1])
+        elif last:
+            updated.update(last_ts=last[0], last_level=last[1])
+        return name, updated, rows
+
+    def sources(self):
+        try:
+            names = os.listdir(self.log_dir)
+        except OSError:
+            return []
+        return sorted(name for name in names if log_glob.match(name) or results_glob.match(name))
+
+    async def ingest_async(self):
+        """Reads new data from every log file concurrently and appends it; returns rows added."""
+        reads = await asyncio.gather(*(asyncio.to_thread(self._read_new, name) for name in self.sources()))
+        return self._append(reads)
+
+    def ingest(self):
+        return asyncio.run(self.ingest_async())
+
+    async def follow(self, interval=5.0, on_rows=None):
+        """Tails the log directory forever, ingesting new lines every `interval` seconds."""
+        while True:
+            added = await self.ingest_async()
+            if added and on_rows:
+                on_rows(added)
+            await asyncio.sleep(interval)
+
+    def _append(self, reads):
+        pending = []
+        files = self.state["files"]
+        for name, updated, rows in reads:
+            if updated is None:
+                files.pop(name, None)
+                continue
+            source = self._code("sources", name, 65535)
+            for ts, level, message in rows:
+                pending.append((ts, self._code("levels", level, 255), self._services_mask(message), source, message))
+            files[name] = updated
+        if not pending:
+            if reads:
+                self._save_state()
+            return 0
+        os.makedirs(self.index_dir, exist_ok=True)
+        # Top up the last segment if it is not full yet so tailing doesn't leave many tiny segments
+        segments = self.state["segments"]
+        added = len(pending)
+        if segments and segments[-1]["count"] < segment_rows:
+            tail = segments.pop()
+            pending = self._rows(tail["name"]) + pending
+            self._retire(tail["name"])
+        for start in range(0, len(pending), segment_rows):
+            chunk = pending[start:start + segment_rows]
+            name = f"segment_{self.state['next_segment']:06d}.seg"
+            self.state["next_segment"] += 1
+            meta = Segment.write(os.path.join(self.index_dir, name), chunk)
+            meta["name"] = name
+            segments.append(meta)
+        self._save_state()
+        return added
+
+    def _rows(self, name):
+        segment = self._segment(name)
+        return [(segment.ts[i], segment.level[i], segment.services[i], segment.source[i], segment.message(i))
+                for i in range(len(segment.ts))]
+
+    def _retire(self, name):
+        self._segments.pop(name, None)
+        self.state.setdefault("retired", []).append(name)  # deleted once the new state is on disk
+
+    def _save_state(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        retired = self.state.pop("retired", [])
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+        for name in retired:
+            try:
+                os.remove(os.path.join(self.index_dir, name))
+            except OSError:
+                pass
+
+    def _segment(self, name):
+        if name not in self._segments:
+            self._segments[name] = Segment(os.path.join(self.index_dir, name))
+        return self._segments[name]
+
+    def query(self, level=None, service=None, window=None, since=None, until=None, contains=None,
+              limit=None, now=None):
+        """Returns matching rows, oldest first, as dicts with ts, level, services, source and message.
+
+        `level` and `service` may be a single name or a list; `window` is in seconds back from
+        now (with `since` too, the later bound wins); `since`/`until` are epoch seconds and
+        `contains` is a case-insensitive substring.
+        """
+        if window is not None:
+            start = (time.time() if now is None else now) - window
+            since = start if since is None else max(since, start)
+        since_ms = None if since is None else int(since * 1000)
+        until_ms = None if until is None else int(until * 1000)
+        levels = self.state["levels"]
+        level_codes = None
+        if level is not None:
+            wanted = {level.upper()} if isinstance(level, str) else {name.upper() for name in level}
+            level_codes = [levels.index(name) for name in wanted if name in levels]
+            if not level_codes:
+                return []
+        mask = 0
+        if service is not None:
+            for name in ([service] if isinstance(service, str) else service):
+                name = name.lower()
+                if name in self.state["services"]:
+                    mask |= 1 << self.state["services"].index(name)
+            if not mask:
+                return []
+        needle = contains.lower() if contains else None
+
+        results = []
+        for meta in sorted(self.state["segments"], key=lambda meta: meta["min_ts"]):
+            # Zone map: skip segments outside the time range or without the level/service
+            if since_ms is not None and meta["max_ts"] < since_ms:
+                continue
+            if until_ms is not None and meta["min_ts"] > until_ms:
+                continue
+            if level_codes is not None and not any(str(code) in meta["levels"] for code in level_codes):
+                continue
+            if mask and not meta["services"] & mask:
+                continue
+            segment = self._segment(meta["name"])
+            lo = 0 if since_ms is None else bisect_left(segment.ts, since_ms)
+            hi = len(segment.ts) if until_ms is None else bisect_right(segment.ts, until_ms)
+            if level_codes is None:
+                candidates = range(lo, hi)
+            else:
+                candidates = sorted(row for code in level_codes
+                                    for row in self._posting_range(segment.postings.get(code), lo, hi))
+            for row in candidates:
+                if mask and not segment.services[row] & mask:
+                    continue
+                message = segment.message(row)
+                if needle and needle not in message.lower():
+                    continue
+                results.append({
+                    "ts": format_ts(segment.ts[row]),
+                    "level": levels[segment.level[row]],
+                    "services": [name for bit, name in enumerate(self.state["services"])
+                                 if segment.services[row] >> bit & 1],
+                    "source": self.state["sources"][segment.source[row]],
+                    "message": message,
+                })
+        results.sort(key=lambda row: row["ts"])
+        return results[:limit] if limit else results
+
+    @staticmethod
+    def _posting_range(rows, lo, hi):
+        if not rows:
+            return []
+        # Posting lists hold ascending row ids, so the time range maps to a slice
+        return rows[bisect_left(rows, lo):bisect_left(rows, hi)]
+
+    def stats(self):
+        levels = self.state["levels"]
+        totals = {}
+        for meta in self.state["segments"]:
+            for code, n in meta["levels"].items():
+                totals[levels[int(code)]] = totals.get(levels[int(code)], 0) + n
+        return {"segments": len(self.state["segments"]), "rows": sum(m["count"] for m in self.state["segments"]),
+                "files": len(self.state["files"]), "levels": totals, "services": list(self.state["services"])}
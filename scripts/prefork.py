@@ -0,0 +1,112 @@
+import os
+import gc
+import signal
+import socket
+
+# Pre-fork serving for run_inference_server.py.
+#
+# The master process loads the model once, binds the listening socket and then
+# forks N workers that all accept on it. Forked workers share the master's
+# memory copy-on-write, and model weights are never written after loading, so
+# their pages stay shared: N workers cost roughly the RAM of one plus per-worker
+# activations. gc.freeze() keeps the cyclic GC from touching (and so copying)
+# the objects that exist at fork time.
+#
+# Each worker is pinned to its own slice of the CPUs and sets its intra-op thread
+# count to the slice size, so N workers never run more compute threads than cores.
+# Only PyTorch can change that count after loading; onnxruntime fixes it when the
+# session is created, so prefork serving is for the torch backend only.
+
+def cpu_slices(workers, threads_per_worker=None):
+    """Splits the CPUs this process may use into one list per worker."""
+    try:
+        cpus = sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = list(range(os.cpu_count() or 1))
+    threads = threads_per_worker or max(1, len(cpus) // workers)
+    return [[cpus[(i * threads + j) % len(cpus)] for j in range(threads)] for i in range(workers)]
+
+def memory_usage():
+    """RSS, PSS and shared memory of this process in MB (Linux only; {} elsewhere)."""
+    usage = {}
+    try:
+        with open("/proc/self/smaps_rollup", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("Rss", "Pss", "Shared_Clean", "Shared_Dirty"):
+                    usage[key] = int(value.split()[0]) / 1024
+    except OSError:
+        return {}
+    return {"rss_mb": round(usage.get("Rss", 0), 1), "pss_mb": round(usage.get("Pss", 0), 1),
+            "shared_mb": round(usage.get("Shared_Clean", 0) + usage.get("Shared_Dirty", 0), 1)}
+
+def _pin_worker(cpus):
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    os.environ["OMP_NUM_THREADS"] = os.environ["MKL_NUM_THREADS"] = str(len(cpus))
+    try:
+        import torch
+        torch.set_num_threads(len(cpus))
+    except ImportError:
+        pass
+
+def _run_worker(app, sock, cpus, log_level):
+    import uvicorn
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _pin_worker(cpus)
+    config = uvicorn.Config(app, log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+def serve(app, host="0.0.0.0", port=8000, workers=2, threads_per_worker=None, log_level="info"):
+    """Forks `workers` uvicorn servers sharing one socket and this process's loaded model."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    slices = cpu_slices(workers, threads_per_worker)
+    gc.collect()
+    gc.freeze()
+
+    children = {}
+    stopping = False
+
+    def spawn(index):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(app, sock, slices[index], log_level)
+            finally:
+                os._exit(0)
+        children[pid] = index
+        print(f"Worker {index} (pid {pid}) on CPUs {slices[index]}")
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for index in range(workers):
+        spawn(index)
+
+    # Restart workers that die, until asked to stop
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index = children.pop(pid, None)
+        if index is not None and not stopping:
+            print(f"Worker {index} (pid {pid}) exited with status {status}; restarting")
+            spawn(index)
+    sock.close()
@@ -1,11 +1,14 @@
 import os
-import json
+import sys
 from huggingface_hub import HfApi, snapshot_download
 
-def prepare_deployment():
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "src"))
+from tata_common.config import load_config
+
+def prepare_deployment(onnx=None):
     # Load Hugging Face config
-    with open('configs/huggingface_config.json', 'r') as f:
-        hf_config = json.load(f)
+    hf_config = load_config("huggingface_config")
 
     # Download the latest model
     model_path = snapshot_download(repo_id=hf_config['model_repo'])
@@ -17,8 +20,21 @@ def prepare_deployment():
     with open('public/model_path.txt', 'w') as f:
         f.write(model_path)
 
+    # Optional small model from the same family for speculative decoding
+    if hf_config.get('draft_model_repo'):
+        draft_model_path = snapshot_download(repo_id=hf_config['draft_model_repo'])
+        with open('public/draft_model_path.txt', 'w') as f:
+            f.write(draft_model_path)
+
+    # Optional optimized ONNX export (with KV cache) for the onnxruntime backend
+    if hf_config.get('onnx_export', False) if onnx is None else onnx:
+        from inference_backends import export_onnx
+        onnx_path = export_onnx(model_path, os.path.join('public', 'onnx_model'))
+        with open('public/onnx_model_path.txt', 'w') as f:
+            f.write(os.path.abspath(onnx_path))
+
     print("Deployment preparation complete.")
 
 if __name__ == "__main__":
-    prepare_deployment()
+    prepare_deployment(onnx=True if "--onnx" in sys.argv else None)
 
@@ -1,37 +1,141 @@
-from fastapi import FastAPI, HTTPException
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException, Request
 from pydantic import BaseModel
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from transformers import AutoModelForCausalLM, AutoTokenizer, StoppingCriteriaList
 import torch
+from cancellation import DEADLINE, DISCONNECTED, CancelCriteria, Cancellation, CancellationStats
+from speculative_decoding import SpeculativeStats, check_compatible, speculative_generate
+from inference_backends import load_backend, read_path
+from prefork import memory_usage
 
 app = FastAPI()
 
-# Load model path
-with open('public/model_path.txt', 'r') as f:
-    model_path = f.read().strip()
+# TATA_INFERENCE_WORKERS > 1 serves from that many pre-forked processes sharing the
+# weights loaded here (see prefork.py). The master then loads with a single thread
+# so no thread pool exists at fork time; each worker sets its own thread count.
+# That only works for PyTorch: an onnxruntime session fixes its thread count when
+# it is created, so every ONNX worker would stay single-threaded.
+workers = int(os.environ.get("TATA_INFERENCE_WORKERS", "1"))
+backend_kind = os.environ.get("TATA_INFERENCE_BACKEND", "torch").lower()
+if workers > 1 and backend_kind != "torch":
+    raise ValueError(f"TATA_INFERENCE_WORKERS={workers} needs the torch backend, not {backend_kind!r}; "
+                     f"run the ONNX backend with one worker per process")
 
-# Load model and tokenizer
-model = AutoModelForCausalLM.from_pretrained(model_path)
-tokenizer = AutoTokenizer.from_pretrained(model_path)
+# Load model and tokenizer with the configured backend (TATA_INFERENCE_BACKEND=torch|onnx)
+backend = load_backend(backend_kind, threads=1 if workers > 1 else None)
+model, tokenizer = backend.model, backend.tokenizer
+
+# Optional draft model for speculative decoding, written next to model_path.txt by
+# prepare_deployment.py; TATA_DRAFT_MODEL_PATH overrides it and TATA_SPECULATIVE=0 turns it off.
+# It needs the PyTorch backend, whose KV cache can be rolled back.
+draft_model_path = read_path("draft_model_path.txt", "TATA_DRAFT_MODEL_PATH")
+num_draft_tokens = int(os.environ.get("TATA_DRAFT_TOKENS", "4"))
+
+# Total length (prompt + generated tokens) per request
+max_length = 100
+
+draft_model = None
+if draft_model_path and backend.name == "torch" and os.environ.get("TATA_SPECULATIVE", "1") != "0":
+    try:
+        check_compatible(tokenizer, AutoTokenizer.from_pretrained(draft_model_path))
+        draft_model = AutoModelForCausalLM.from_pretrained(draft_model_path).eval()
+    except (OSError, ValueError) as e:
+        print(f"Speculative decoding disabled: {e}")
+
+speculative_stats = SpeculativeStats()
+
+# Requests stop decoding as soon as their client disconnects or their deadline passes.
+# Callers send their remaining budget in seconds as X-Request-Timeout (a budget rather
+# than a timestamp, as in the RPC layer); TATA_INFERENCE_TIMEOUT is the default.
+default_timeout = float(os.environ["TATA_INFERENCE_TIMEOUT"]) if os.environ.get("TATA_INFERENCE_TIMEOUT") else None
+disconnect_poll_interval = 0.1
+cancellation_stats = CancellationStats()
+
+# One generation at a time per process, off the event loop so it can keep watching
+# client connections while the model runs
+generation_executor = ThreadPoolExecutor(max_workers=1)
+
+# Speculative decoding reproduces greedy search only; sampling or beam configs use generate()
+def is_greedy(generation_config):
+    return not generation_config.do_sample and (generation_config.num_beams or 1) == 1
 
 class InferenceRequest(BaseModel):
     text: str
+    # None uses the draft model when one is loaded; False forces plain generate(),
+    # which also feeds the baseline the /metrics speedup is measured against
+    speculative: Optional[bool] = None
+
+def generate(inputs, use_draft, cancellation):
+    """Runs on generation_executor; returns None if the request was cancelled while queued."""
+    if cancellation.is_cancelled():
+        return None
+    prompt_length = inputs["input_ids"].shape[1]
+    start = time.perf_counter()
+    with torch.no_grad():
+        if use_draft:
+            return speculative_generate(model, draft_model, inputs["input_ids"],
+                                        max(0, max_length - prompt_length), num_draft_tokens,
+                                        eos_token_id=model.generation_config.eos_token_id,
+                                        stats=speculative_stats, should_stop=cancellation.is_cancelled)
+        outputs = model.generate(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"],
+                                 max_length=max_length,
+                                 stopping_criteria=StoppingCriteriaList([CancelCriteria(cancellation)]))
+    if cancellation.reason is None:
+        speculative_stats.record_baseline(outputs.shape[1] - prompt_length, time.perf_counter() - start)
+    return outputs
 
 @app.post("/inference")
-async def run_inference(request: InferenceRequest):
+async def run_inference(request: InferenceRequest, connection: Request,
+                        x_request_timeout: Optional[float] = Header(None)):
+    cancellation = Cancellation(x_request_timeout if x_request_timeout is not None else default_timeout)
     try:
         inputs = tokenizer(request.text, return_tensors="pt")
-        with torch.no_grad():
-            outputs = model.generate(**inputs, max_length=100)
+        prompt_length = inputs["input_ids"].shape[1]
+        use_draft = draft_model is not None and request.speculative is not False \
+            and is_greedy(model.generation_config)
+        future = asyncio.get_running_loop().run_in_executor(generation_executor, generate, inputs,
+                                                            use_draft, cancellation)
+        while not (await asyncio.wait({future}, timeout=disconnect_poll_interval))[0]:
+            if await connection.is_disconnected():
+                cancellation.cancel(DISCONNECTED)
+        outputs = future.result()
+
+        if cancellation.reason is not None:
+            generated = 0 if outputs is None else outputs.shape[1] - prompt_length
+            cancellation_stats.record(cancellation.reason, generated, max(0, max_length - prompt_length),
+                                      started=outputs is not None)
+            if cancellation.reason == DEADLINE:
+                raise HTTPException(status_code=504, detail=f"Deadline exceeded after {generated} tokens")
+            raise HTTPException(status_code=499, detail="Client disconnected")
         result = tokenizer.decode(outputs[0], skip_special_tokens=True)
         return {"result": result}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics")
+async def metrics():
+    return {"backend": backend.name,
+            "worker": {"pid": os.getpid(), "threads": torch.get_num_threads(), **memory_usage()},
+            "speculative": {"enabled": draft_model is not None, "draft_tokens": num_draft_tokens,
+                            **speculative_stats.snapshot()},
+            "cancellation": cancellation_stats.snapshot()}
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Tata AI Inference API"}
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
-
+    if workers > 1:
+        import prefork
+        threads = os.environ.get("TATA_INFERENCE_THREADS")
+        prefork.serve(app, host="0.0.0.0", port=8000, workers=workers,
+                      threads_per_worker=int(threads) if threads else None)
+    else:
+        import uvicorn
+        uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,77 @@
+import os
+import sys
+import difflib
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared file writer for the generate_*.py scripts.
+#
+# Files are only written when their content hash differs from what is on disk,
+# and writes go through a temp file + rename, so unchanged files keep their
+# mtimes (and downstream Docker build caches) and readers never see a
+# half-written file. All files are planned and written in parallel.
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+def write_atomic(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    if os.path.exists(path):
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)  # keep e.g. executable bits
+    os.replace(tmp_path, path)
+
+# Decide what to do with one file and, unless dry_run, do it
+def sync_file(path, content, overwrite=True, dry_run=False):
+    data = content.encode() if isinstance(content, str) else content
+    try:
+        with open(path, "rb") as f:
+            existing = f.read()
+    except FileNotFoundError:
+        existing = None
+    if existing is None:
+        status = "create"
+    elif len(existing) == len(data) and content_hash(existing) == content_hash(data):
+        status = "unchanged"
+    elif not overwrite:
+        status = "kept"  # create-only file that already exists
+    else:
+        status = "update"
+    diff = ""
+    if status in ("create", "update"):
+        old_lines = existing.decode(errors="replace").splitlines(keepends=True) if existing else []
+        diff = "".join(difflib.unified_diff(old_lines, data.decode(errors="replace").splitlines(keepends=True),
+                                            fromfile=path if existing else "/dev/null", tofile=path))
+        if not dry_run:
+            write_atomic(path, data)
+    return {"path": path, "status": status, "diff": diff}
+
+def sync_files(files, overwrite=True, dry_run=False, workers=None):
+    """Syncs {path: content} in parallel; returns one result dict per file, in input order."""
+    paths = list(files)
+    with ThreadPoolExecutor(max_workers=workers or min(32, max(1, len(paths)))) as pool:
+        return list(pool.map(lambda p: sync_file(p, files[p], overwrite, dry_run), paths))
+
+def report(results, dry_run=False, show_diff=False):
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        if result["status"] in ("create", "update"):
+            verb = {"create": "Would create" if dry_run else "Created",
+                    "update": "Would update" if dry_run else "Updated"}[result["status"]]
+            print(f"{verb} {result['path']}")
+            if (show_diff or dry_run) and result["diff"]:
+                sys.stdout.write(result["diff"])
+        elif result["status"] == "kept":
+            print(f"{result['path']} already exists, leaving it as is")
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"Done: {summary or 'nothing to do'}")
+
+def parse_args(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--dry-run", action="store_true", help="show what would change without writing")
+    parser.add_argument("--diff", action="store_true", help="print a unified diff for every change (implied by --dry-run)")
+    return parser.parse_args()
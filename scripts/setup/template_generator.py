@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Generate per-node configurations from {{placeholder}} templates.
+
+    python scripts/setup/template_generator.py --all
+    python scripts/setup/template_generator.py --node "Universal.Tata-CORE.JB.5.0"
+
+Nodes are listed in configs/nodes.json. Placeholder values are layered: the
+manifest "defaults", then the env file, then values derived from the node name
+(node_name, node_scope, node_type, band, version), then the node's own
+"values". A node's TATA_<CORE>_DB_USER / _PASSWORD from the env file (as
+written by automate_system_setup.py) fill db_user / db_password last. Only
+configs whose template or values changed are rewritten.
+"""
+import os
+import sys
+import time
+import json
+import argparse
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "src"))
+from tata_common.config import DEFAULT_ENV_FILE, parse_env_file
+from tata_common.templates import TemplateError, compile_template, node_values, render_batch
+
+NODES_PATH = os.path.join(PROJECT_DIR, "configs", "nodes.json")
+OUTPUT_DIR = os.path.join(PROJECT_DIR, "configs", "generated")
+# Per-core env keys (TATA_<CORE>_DB + suffix) and the placeholders they fill
+CREDENTIAL_KEYS = {"db_user": "_USER", "db_password": "_PASSWORD"}
+
+def node_credentials(credentials, node_type):
+    prefix = f"{node_type.replace('-', '_').upper()}_DB"
+    return {name: credentials[prefix + suffix] for name, suffix in CREDENTIAL_KEYS.items()
+            if credentials.get(prefix + suffix)}
+
+def build_jobs(manifest, selected=None, env_path=DEFAULT_ENV_FILE):
+    credentials = parse_env_file(env_path)
+    defaults = manifest.get("defaults", {})
+    nodes = manifest.get("nodes", {})
+    if selected:
+        unknown = [name for name in selected if name not in nodes]
+        if unknown:
+            raise TemplateError(f"Unknown node(s): {', '.join(unknown)}")
+        nodes = {name: nodes[name] for name in selected}
+    jobs = []
+    for node_name, node in nodes.items():
+        template_path = os.path.join(PROJECT_DIR, node.get("template", manifest.get("template", "")))
+        derived = node_values(node_name)
+        values = dict(defaults)
+        values.update(credentials)
+        values.update(derived)
+        values.update(node.get("values", {}))
+        values.update(node_credentials(credentials, derived.get("node_type", "")))
+        jobs.append((node_name, compile_template(template_path), values))
+    return jobs
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate node configurations from templates")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--all", action="store_true", help="generate every node in the manifest")
+    target.add_argument("--node", action="append", help="node name to generate (repeatable)")
+    parser.add_argument("--nodes", default=NODES_PATH, help="node manifest")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="output directory")
+    parser.add_argument("--force", action="store_true", help="rewrite outputs even if unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be written")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.nodes, "r") as f:
+        manifest = json.load(f)
+    try:
+        jobs = build_jobs(manifest, None if args.all else args.node)
+        result = render_batch(jobs, args.output, force=args.force, dry_run=args.dry_run)
+    except TemplateError as e:
+        print(f"❌ {e}")
+        return 1
+    verb = "Would write" if args.dry_run else "Wrote"
+    for path in result["written"]:
+        print(f"{verb} {path}")
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"✅ {len(result['written'])} written, {len(result['unchanged'])} unchanged in {elapsed:.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
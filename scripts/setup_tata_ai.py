@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
+import asyncio
+import json
+import random
 import subprocess
 import time
-import socket
 
 def check_dependency(cmd, name):
     """Checks if a required dependency is installed."""
@@ -13,21 +15,82 @@ def check_dependency(cmd, name):
         return False
     return True
 
-def check_service(host, port, name, retries=5, delay=5):
-    """Checks if a service is running."""
+# Ports of the Node services that serve /api/health (services/*/src/app.js,
+# PORT || 800x); the 500x containers do not expose an HTTP health endpoint
+tata_services = {
+    "Tata-CORE": 8001,
+    "Tata-MEMEX": 8002,
+    "Tata-ZKP": 8003,
+    "Tata-FLOW": 8004,
+    "Tata-MOTO": 8005
+}
+
+# Exponential backoff with full jitter: sleep somewhere in [0, base * 2^attempt], capped
+def backoff_delay(attempt, base=0.5, cap=8.0):
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+async def http_get(conn, host, port, path, timeout):
+    """Sends a keep-alive GET over `conn` (opening it if needed) and returns (status, body, conn)."""
+    if conn is None or conn[1].is_closing():
+        conn = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    reader, writer = conn
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: keep-alive\r\n\r\n".encode())
+    await writer.drain()
+    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = dict(line.split(":", 1) for line in lines[1:] if ":" in line)
+    headers = {k.strip().lower(): v.strip() for k, v in headers.items()}
+    length = int(headers.get("content-length", 0))
+    body = await asyncio.wait_for(reader.readexactly(length), timeout) if length else b""
+    if headers.get("connection", "").lower() == "close":
+        writer.close()
+    return status, body, conn
+
+async def probe_service(host, port, name, path="/api/health", retries=5, timeout=2.0):
+    """Checks a service's HTTP health endpoint, retrying over one reused connection."""
+    result = {"name": name, "host": host, "port": port, "healthy": False,
+              "status": None, "latency_ms": None, "attempts": 0, "error": None}
+    conn = None
     for attempt in range(retries):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(2)
+        result["attempts"] = attempt + 1
+        start = time.perf_counter()
         try:
-            sock.connect((host, port))
-            print(f"[OK] {name} is running on {host}:{port}.")
-            sock.close()
-            return True
-        except:
-            print(f"[WARNING] {name} is NOT running on {host}:{port}. Retrying ({attempt + 1}/{retries})...")
-            time.sleep(delay)
-    print(f"[ERROR] {name} is NOT responding after multiple attempts.")
-    return False
+            status, body, conn = await http_get(conn, host, port, path, timeout)
+            result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            result["status"] = status
+            payload = json.loads(body or b"{}")
+            if status == 200 and payload.get("status") == "healthy":
+                result["healthy"] = True
+                result["error"] = None
+                break
+            result["error"] = f"unhealthy response: {status} {payload}"
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+            result["error"] = str(e) or type(e).__name__
+            if conn is not None:
+                conn[1].close()
+                conn = None
+        if attempt + 1 < retries:
+            await asyncio.sleep(backoff_delay(attempt))
+    if conn is not None:
+        conn[1].close()
+    return result
+
+async def probe_services(services, host="localhost", **kwargs):
+    """Probes all services concurrently and returns their results keyed by name."""
+    results = await asyncio.gather(*(probe_service(host, port, name, **kwargs) for name, port in services.items()))
+    return {result["name"]: result for result in results}
+
+def check_services(services, host="localhost", **kwargs):
+    """Synchronous wrapper around probe_services that also prints a summary line per service."""
+    results = asyncio.run(probe_services(services, host, **kwargs))
+    for name, result in results.items():
+        if result["healthy"]:
+            print(f"[OK] {name} is healthy on {host}:{result['port']} ({result['latency_ms']} ms).")
+        else:
+            print(f"[ERROR] {name} is NOT healthy on {host}:{result['port']} after "
+                  f"{result['attempts']} attempts: {result['error']}")
+    return results
 
 def full_self_check():
     """Runs all necessary checks and returns status."""
@@ -42,15 +105,8 @@ def full_self_check():
             return 1  # Dependency missing
     
     print("Checking Tata AI service connectivity...")
-    services = {
-        "Tata-CORE": 5001,
-        "Tata-MEMEX": 5002,
-        "Tata-ZKP": 5003,
-        "Tata-FLOW": 5004,
-        "Tata-MOTO": 5005
-    }
-    
-    missing_services = [name for name, port in services.items() if not check_service("localhost", port, name)]
+    results = check_services(tata_services)
+    missing_services = [name for name, result in results.items() if not result["healthy"]]
     
     if missing_services:
         print(f"[WARNING] Services not running: {', '.join(missing_services)}")
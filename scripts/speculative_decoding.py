@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Greedy speculative decoding with a small draft model.
+
+The draft model proposes `num_draft_tokens` tokens one at a time (cheap), then
+the main model scores all of them in a single forward pass and keeps the
+longest prefix that matches its own greedy choice, plus its own next token.
+Every emitted token is the main model's argmax given the tokens before it, so
+the output is the same as `model.generate(do_sample=False)`; the draft only
+decides how many tokens each main-model pass produces.
+
+Both models keep their KV cache between rounds and roll it back past rejected
+proposals. Batch size 1 only, which is what the inference server runs.
+
+    python3 speculative_decoding.py --model <path> --draft <path> --prompt "Hello"
+"""
+import time
+import threading
+import torch
+
+class SpeculativeStats:
+    """Running totals exposed by the inference server's /metrics endpoint."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.proposed = 0
+        self.accepted = 0
+        self.generated = 0
+        self.target_passes = 0
+        self.seconds = 0.0
+        self.baseline_requests = 0
+        self.baseline_tokens = 0
+        self.baseline_seconds = 0.0
+
+    def record(self, proposed, accepted, generated, target_passes, seconds):
+        with self.lock:
+            self.requests += 1
+            self.proposed += proposed
+            self.accepted += accepted
+            self.generated += generated
+            self.target_passes += target_passes
+            self.seconds += seconds
+
+    def record_baseline(self, generated, seconds):
+        """Timing of a plain model.generate request, used as the speedup reference."""
+        with self.lock:
+            self.baseline_requests += 1
+            self.baseline_tokens += generated
+            self.baseline_seconds += seconds
+
+    def snapshot(self):
+        with self.lock:
+            ms_per_token = 1000 * self.seconds / self.generated if self.generated else None
+            baseline_ms = 1000 * self.baseline_seconds / self.baseline_tokens if self.baseline_tokens else None
+            return {
+                "requests": self.requests,
+                "acceptance_rate": round(self.accepted / self.proposed, 4) if self.proposed else None,
+                "tokens_per_target_pass": round(self.generated / self.target_passes, 3) if self.target_passes else None,
+                "ms_per_token": round(ms_per_token, 3) if ms_per_token else None,
+                "baseline_requests": self.baseline_requests,
+                "baseline_ms_per_token": round(baseline_ms, 3) if baseline_ms else None,
+                "speedup": round(baseline_ms / ms_per_token, 3) if baseline_ms and ms_per_token else None,
+            }
+
+def crop_cache(past, length):
+    """Drops cached positions from `length` on; works for Cache objects and legacy tuples."""
+    if past is None:
+        return None
+    if hasattr(past, "crop"):
+        excess = cache_length(past) - length
+        if excess > 0:
+            past.crop(-excess)  # a negative count means "remove this many" in every transformers version
+        return past
+    return tuple(tuple(t[:, :, :length] for t in layer) for layer in past)
+
+def cache_length(past):
+    if past is None:
+        return 0
+    if hasattr(past, "get_seq_length"):
+        return past.get_seq_length()
+    return past[0][0].shape[2]
+
+def forward(model, tokens, past):
+    """Runs the uncached suffix of `tokens` (1 x n) and returns (logits for that suffix, cache)."""
+    start = cache_length(past)
+    out = model(input_ids=tokens[:, start:], past_key_values=past, use_cache=True)
+    return out.logits, out.past_key_values
+
+@torch.no_grad()
+def speculative_generate(model, draft_model, input_ids, max_new_tokens, num_draft_tokens=4,
+                         eos_token_id=None, stats=None, should_stop=None):
+    """Returns input_ids followed by up to max_new_tokens greedily decoded tokens.
+
+    should_stop, if given, is called before every round; returning True ends
+    generation early with the tokens accepted so far.
+    """
+    if input_ids.shape[0] != 1:
+        raise ValueError("speculative_generate only supports batch size 1")
+    eos_ids = set([eos_token_id] if isinstance(eos_token_id, int) else eos_token_id or [])
+    tokens = input_ids
+    prompt_length = input_ids.shape[1]
+    target_past = draft_past = None
+    proposed = accepted = target_passes = 0
+    started = time.perf_counter()
+
+    while tokens.shape[1] - prompt_length < max_new_tokens:
+        if should_stop is not None and should_stop():
+            break
+        budget = max_new_tokens - (tokens.shape[1] - prompt_length)
+        k = max(1, min(num_draft_tokens, budget - 1)) if budget > 1 else 0
+
+        # Draft k tokens greedily; its cache ends up covering all but the last proposal
+        draft = tokens
+        for _ in range(k):
+            logits, draft_past = forward(draft_model, draft, draft_past)
+            draft = torch.cat([draft, logits[:, -1:].argmax(-1)], dim=1)
+        proposals = draft[:, tokens.shape[1]:]
+
+        # One main-model pass scores every proposal and yields the token after them
+        logits, target_past = forward(model, draft, target_past)
+        target_passes += 1
+        choices = logits[:, -(k + 1):].argmax(-1)  # main model's pick at each proposal position, plus one
+        matches = (proposals[0] == choices[0, :k]).int()
+        m = int(matches.cumprod(0).sum()) if k else 0
+        proposed += k
+        accepted += m
+        new = torch.cat([proposals[:, :m], choices[:, m:m + 1]], dim=1)
+
+        # Roll both caches back to the accepted prefix (the last new token isn't cached yet)
+        base = tokens.shape[1]
+        target_past = crop_cache(target_past, base + m)
+        draft_past = crop_cache(draft_past, min(cache_length(draft_past), base + m))
+
+        if eos_ids:
+            hits = [i for i, t in enumerate(new[0].tolist()) if t in eos_ids]
+            if hits:
+                tokens = torch.cat([tokens, new[:, :hits[0] + 1]], dim=1)
+                break
+        tokens = torch.cat([tokens, new], dim=1)
+
+    tokens = tokens[:, :prompt_length + max_new_tokens]
+    if stats is not None:
+        stats.record(proposed, accepted, tokens.shape[1] - prompt_length, target_passes,
+                     time.perf_counter() - started)
+    return tokens
+
+def check_compatible(tokenizer, draft_tokenizer):
+    """The draft must tokenize exactly like the main model, or its proposals are meaningless."""
+    if tokenizer.get_vocab() != draft_tokenizer.get_vocab():
+        raise ValueError("draft model tokenizer does not match the main model's vocabulary")
+
+def main():
+    import argparse
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    parser = argparse.ArgumentParser(description="Compare speculative and plain greedy decoding")
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--draft", required=True)
+    parser.add_argument("--prompt", action="append", required=True)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--draft-tokens", type=int, default=4)
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    check_compatible(tokenizer, AutoTokenizer.from_pretrained(args.draft))
+    model = AutoModelForCausalLM.from_pretrained(args.model).eval()
+    draft_model = AutoModelForCausalLM.from_pretrained(args.draft).eval()
+
+    stats = SpeculativeStats()
+    for prompt in args.prompt:
+        input_ids = tokenizer(prompt, return_tensors="pt").input_ids
+        start = time.perf_counter()
+        with torch.no_grad():
+            plain = model.generate(input_ids, attention_mask=torch.ones_like(input_ids), do_sample=False,
+                                   num_beams=1, max_new_tokens=args.max_new_tokens,
+                                   pad_token_id=tokenizer.pad_token_id or tokenizer.eos_token_id)
+        stats.record_baseline(plain.shape[1] - input_ids.shape[1], time.perf_counter() - start)
+        fast = speculative_generate(model, draft_model, input_ids, args.max_new_tokens, args.draft_tokens,
+                                    eos_token_id=tokenizer.eos_token_id, stats=stats)
+        same = torch.equal(plain, fast)
+        print(f"{'identical' if same else 'DIFFERENT'}: {tokenizer.decode(fast[0], skip_special_tokens=True)!r}")
+    for key, value in stats.snapshot().items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
 import json
 import os
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "src"))
+from tata_common.config import ConfigLoader, parse_env_file
+from tata_common.templates import CompiledTemplate
 
 # Path to credentials and template files
 env_file_path = "/path/to/your/.env"
@@ -8,17 +14,15 @@ output_file_path = "/path/to/your/populated-template.json"
 
 # Function to load credentials from .env file
 def load_credentials(env_file_path):
-    credentials = {}
-    with open(env_file_path, "r") as f:
-        for line in f:
-            key, value = line.strip().split("=")
-            credentials[key] = value
-    return credentials
+    return parse_env_file(env_file_path)
 
 # Function to populate JSON template with credentials
 def populate_template(template_file_path, credentials):
-    with open(template_file_path, "r") as f:
-        template = json.load(f)
+    loader = ConfigLoader(config_dirs=[os.path.dirname(template_file_path)], schema_dir=None, env_file=None)
+    template = loader.get(os.path.basename(template_file_path))
+
+    # Fill any {{placeholder}} strings from the credentials; unknown ones are left as-is
+    template = CompiledTemplate(template, source=template_file_path).render(credentials, strict=False)
 
     # Replace placeholders with actual credentials
     template["credentials"]["database"]["host"] = credentials.get("DB_HOST", "localhost")
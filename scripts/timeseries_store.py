@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import struct
+from array import array
+
+# Resolution tiers as (bucket seconds, buckets kept): 10s for a day, 1min for a week, 1h for a year
+default_tiers = ((10, 8640), (60, 10080), (3600, 8760))
+
+# Columns kept per bucket; all stored as float64 arrays
+columns = ("ts", "mean", "min", "max", "count")
+
+file_magic = b"TATATS1\n"
+
+class RingSeries:
+    """Fixed-capacity columnar ring buffer of downsampled buckets for one metric at one resolution."""
+
+    def __init__(self, step, capacity):
+        self.step = step
+        self.capacity = capacity
+        self.cols = {name: array("d") for name in columns}  # grows up to capacity, then wraps
+        self.head = 0  # next slot to write
+        self.size = 0
+        self.open = None  # [bucket_ts, sum, min, max, count] still accumulating
+
+    def add(self, ts, value):
+        bucket = ts - (ts % self.step)
+        if self.open is not None and bucket != self.open[0]:
+            if bucket < self.open[0]:
+                return  # late sample for a bucket that has already been committed
+            self._commit()
+        if self.open is None:
+            self.open = [bucket, value, value, value, 1]
+        else:
+            self.open[1] += value
+            self.open[2] = min(self.open[2], value)
+            self.open[3] = max(self.open[3], value)
+            self.open[4] += 1
+
+    def _commit(self):
+        bucket, total, low, high, count = self.open
+        i = self.head
+        row = (bucket, total / count, low, high, count)
+        for name, value in zip(columns, row):
+            if i == len(self.cols[name]):
+                self.cols[name].append(value)
+            else:
+                self.cols[name][i] = value
+        self.head = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.open = None
+
+    def _slot(self, logical):
+        return (self.head - self.size + logical) % self.capacity
+
+    def oldest(self):
+        if self.size:
+            return self.cols["ts"][self._slot(0)]
+        return self.open[0] if self.open else None
+
+    def query(self, since=None, until=None):
+        """Returns [(ts, mean, min, max, count), ...] for buckets with since <= ts <= until."""
+        ts_col = self.cols["ts"]
+        lo, hi = 0, self.size
+        if since is not None:
+            while lo < hi:  # buckets are stored in time order, so bisect on the logical index
+                mid = (lo + hi) // 2
+                if ts_col[self._slot(mid)] < since - (since % self.step):
+                    lo = mid + 1
+                else:
+                    hi = mid
+        rows = []
+        for logical in range(lo, self.size):
+            i = self._slot(logical)
+            ts = ts_col[i]
+            if until is not None and ts > until:
+                break
+            rows.append((ts, self.cols["mean"][i], self.cols["min"][i], self.cols["max"][i], int(self.cols["count"][i])))
+        if self.open is not None and (until is None or self.open[0] <= until) \
+                and (since is None or self.open[0] >= since - (since % self.step)):
+            bucket, total, low, high, count = self.open
+            rows.append((bucket, total / count, low, high, count))
+        return rows
+
+class TimeSeriesStore:
+    """Multi-resolution ring-buffer store; every sample is folded into each tier on write."""
+
+    def __init__(self, path=None, tiers=default_tiers):
+        self.path = path
+        self.tiers = tuple(tuple(tier) for tier in tiers)
+        self.series = {}
+        if path and os.path.exists(path):
+            self.load()
+
+    def _series(self, metric):
+        if metric not in self.series:
+            self.series[metric] = [RingSeries(step, capacity) for step, capacity in self.tiers]
+        return self.series[metric]
+
+    def append(self, metric, value, ts=None):
+        ts = time.time() if ts is None else ts
+        for ring in self._series(metric):
+            ring.add(ts, float(value))
+
+    def append_many(self, samples, ts=None):
+        """Appends a {metric: value} mapping sharing one timestamp."""
+        ts = time.time() if ts is None else ts
+        for metric, value in samples.items():
+            if value is not None:
+                self.append(metric, value, ts)
+
+    def metrics(self):
+        return sorted(self.series)
+
+    def query(self, metric, window=None, since=None, until=None, now=None):
+        """Returns buckets for `metric` from the finest tier that still covers the requested window."""
+        if metric not in self.series:
+            return []
+        now = time.time() if now is None else now
+        if window is not None:
+            since = now - window
+        rings = self.series[metric]
+        for ring in rings:
+            oldest = ring.oldest()
+            if since is None or (oldest is not None and oldest <= since) or ring.size < ring.capacity:
+                return ring.query(since, until)
+        return rings[-1].query(since, until)
+
+    def latest(self, metric):
+        rows = self.series[metric][0].query() if metric in self.series else []
+        return rows[-1] if rows else None
+
+    def save(self):
+        """Writes every ring oldest-first as raw float64 columns after a small JSON header, atomically."""
+        if not self.path:
+            return
+        header = {"tiers": self.tiers, "series": {}}
+        blobs = []
+        for metric, rings in self.series.items():
+            header["series"][metric] = [{"size": r.size, "open": r.open} for r in rings]
+            for ring in rings:
+                order = [ring._slot(logical) for logical in range(ring.size)]
+                blobs.extend(array("d", (ring.cols[name][i] for i in order)).tobytes() for name in columns)
+        encoded = json.dumps(header).encode()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(file_magic)
+            f.write(struct.pack("<I", len(encoded)))
+            f.write(encoded)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        with open(self.path, "rb") as f:
+            if f.read(len(file_magic)) != file_magic:
+                raise ValueError(f"{self.path} is not a time-series store")
+            (length,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(length))
+            stored_tiers = tuple(tuple(tier) for tier in header["tiers"])
+            if stored_tiers != self.tiers:
+                raise ValueError(f"{self.path} was written with tiers {stored_tiers}, expected {self.tiers}")
+            for metric, states in header["series"].items():
+                rings = self._series(metric)
+                for ring, state in zip(rings, states):
+                    for name in columns:
+                        col = array("d")
+                        col.fromfile(f, state["size"])
+                        ring.cols[name] = col
+                    ring.size, ring.open = state["size"], state["open"]
+                    ring.head = ring.size % ring.capacity
@@ -1,11 +1,14 @@
 import os
-import json
+import sys
 from transformers import AutoTokenizer, AutoModelForCausalLM, TrainingArguments, Trainer
 from datasets import load_dataset
 
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "src"))
+from tata_common.config import load_config as load_shared_config
+
 def load_config():
-    with open('../configs/huggingface_config.json', 'r') as f:
-        return json.load(f)
+    return load_shared_config("huggingface_config")
 
 def load_model_and_tokenizer(config):
     model = AutoModelForCausalLM.from_pretrained(config['model_repo'])
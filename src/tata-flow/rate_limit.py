@@ -0,0 +1,465 @@
+"""Distributed token-bucket rate limiting and admission control.
+
+Every request draws ``cost`` tokens from its tenant's bucket and, when the
+endpoint has a limit of its own, from the endpoint's bucket (shared by all
+tenants). A bucket holds at most ``burst`` tokens and refills at ``rate``
+tokens per second. The buckets live in ``redis_flow`` and are only changed by
+one Lua script, which refills and draws atomically on the Redis clock.
+
+Asking Redis on every request would add a round trip to each one. Instead a
+process leases a few tokens at a time and admits requests from its lease
+locally. Leases grow while a process keeps using them up and shrink when
+tokens are left over. Leftovers go back to the bucket once a lease is
+``lease_ttl`` seconds old, and the return rides along with the next script
+call. Concurrent callers that run short share one round trip. At most
+``max_lease_fraction`` of each bucket is parked in any one process. The
+global limit is never exceeded, because a lease holds only tokens the bucket
+already gave out.
+
+While Redis is unreachable each process falls back to an in-memory bucket
+with the same limits (``fail_open``), or rejects everything.
+
+    limiter = RateLimiter.from_config(await get_client("redis", prefix="TATA_FLOW_REDIS"))
+    decision = await limiter.acquire("tenant-7", "tata-core:/decide")
+    if not decision.allowed:
+        ...  # 429, Retry-After: decision.retry_after
+
+    # any ASGI app; authenticate(scope) returns the caller's verified tenant id
+    app = RateLimitMiddleware(app, limiter, service="tata-core", authenticate=tenant_from_api_key)
+
+Limits come from configs/rate_limits.json (see configs/schemas) and are
+reloaded when the file changes.
+"""
+import asyncio
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# KEYS: bucket keys. ARGV: mode, then rate, burst, want, give_back per key.
+# mode "all" takes ``want`` from every bucket or from none; "lease" grants up to
+# ``want`` whole tokens from each bucket independently. Returns, per key, the
+# tokens granted and the tokens left, as strings (Lua numbers would be truncated).
+TOKEN_BUCKET_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local mode = ARGV[1]
+local levels = {}
+local admit = true
+for i, key in ipairs(KEYS) do
+    local base = 1 + (i - 1) * 4
+    local rate, burst = tonumber(ARGV[base + 1]), tonumber(ARGV[base + 2])
+    local want, give_back = tonumber(ARGV[base + 3]), tonumber(ARGV[base + 4])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local elapsed = math.max(0, now - (tonumber(state[2]) or now))
+    tokens = math.min(burst, tokens + elapsed * rate + give_back)
+    levels[i] = tokens
+    if tokens < want then
+        admit = false
+    end
+end
+local result = {}
+for i, key in ipairs(KEYS) do
+    local base = 1 + (i - 1) * 4
+    local rate, burst, want = tonumber(ARGV[base + 1]), tonumber(ARGV[base + 2]), tonumber(ARGV[base + 3])
+    local granted = 0
+    if mode == 'lease' then
+        granted = math.min(want, math.floor(levels[i]))
+    elseif admit then
+        granted = want
+    end
+    local tokens = levels[i] - granted
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil((burst - tokens) / rate * 1000) + 1000)
+    result[i] = {tostring(granted), tostring(tokens)}
+end
+return result
+"""
+
+
+@dataclass(frozen=True)
+class Limit:
+    rate: float   # tokens per second
+    burst: float  # bucket capacity
+
+    @classmethod
+    def from_dict(cls, data):
+        # Without a burst a bucket holds a second's worth, but always room for one request
+        rate = float(data["rate"])
+        return cls(rate, float(data.get("burst", max(rate, 1.0))))
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    retry_after: float = 0.0  # seconds until the request could be admitted
+
+
+ALLOWED = Decision(True)
+
+
+class Limits:
+    """Which buckets a request draws from, built from the rate_limits config."""
+
+    def __init__(self, default_tenant=None, tenants=None, endpoints=None):
+        self.default_tenant = default_tenant
+        self.tenants = dict(tenants or {})
+        self.endpoints = dict(endpoints or {})
+
+    @classmethod
+    def from_config(cls, config):
+        default = config.get("default_tenant")
+        return cls(Limit.from_dict(default) if default else None,
+                   {name: Limit.from_dict(limit) for name, limit in config.get("tenants", {}).items()},
+                   {name: Limit.from_dict(limit) for name, limit in config.get("endpoints", {}).items()})
+
+    def buckets(self, tenant, endpoint):
+        """[(bucket name, Limit)] for a request; an empty list means unlimited."""
+        buckets = []
+        limit = self.tenants.get(tenant, self.default_tenant)
+        if limit is not None:
+            buckets.append((f"tenant:{tenant}", limit))
+        limit = self.endpoints.get(endpoint)
+        if limit is not None:
+            buckets.append((f"endpoint:{endpoint}", limit))
+        return buckets
+
+
+class TokenBucket:
+    """An in-memory token bucket, used while Redis is unreachable."""
+
+    __slots__ = ("limit", "tokens", "updated")
+
+    def __init__(self, limit, now):
+        self.limit = limit
+        self.tokens = limit.burst
+        self.updated = now
+
+    def refill(self, now):
+        self.tokens = min(self.limit.burst, self.tokens + (now - self.updated) * self.limit.rate)
+        self.updated = now
+
+    def wait(self, cost):
+        """Seconds until ``cost`` tokens are available (0 if they are now)."""
+        return max(0.0, (cost - self.tokens) / self.limit.rate)
+
+
+class _Lease:
+    __slots__ = ("key", "limit", "tokens", "size", "granted_at", "remote", "pending", "empty_until")
+
+    def __init__(self, key, limit):
+        self.key = key
+        self.limit = limit
+        self.tokens = 0      # leased from Redis and not yet used
+        self.size = 1        # tokens to ask for next time
+        self.granted_at = float("-inf")
+        self.remote = 0.0    # tokens left in the bucket at the last grant
+        self.pending = 0     # tokens wanted by callers waiting on the next round trip
+        self.empty_until = 0.0  # the bucket ran dry; reject locally until it has refilled
+
+
+class RateLimiter:
+    def __init__(self, client, limits, prefix="tata:ratelimit", lease_ttl=1.0, max_lease_fraction=0.1,
+                 local=True, fail_open=True, retry_interval=1.0):
+        self.client = client
+        self.limits = limits
+        self.prefix = prefix
+        self.lease_ttl = lease_ttl
+        self.max_lease_fraction = max_lease_fraction
+        self.local = local  # False: one atomic round trip per request
+        self.fail_open = fail_open
+        self.retry_interval = retry_interval
+        self._leases = {}
+        self._fallback = {}
+        self._script = None
+        self._batch = None  # leases to top up in the next round trip
+        self._syncs = set()
+        self._failed_at = float("-inf")
+        self._task = None
+        self.admitted = 0
+        self.rejected = 0
+        self.local_admits = 0
+        self.round_trips = 0
+        self.errors = 0
+        self.fallback_admits = 0
+
+    @classmethod
+    def from_config(cls, client, name="rate_limits", **kwargs):
+        """A limiter whose limits follow configs/<name>.json as it changes."""
+        from tata_common.config import get_loader
+
+        limiter = cls(client, Limits(), **kwargs)
+        loader = get_loader()
+        loader.subscribe(name, limiter.set_limits)
+        loader.start_watching()
+        return limiter
+
+    def set_limits(self, config):
+        self.limits = config if isinstance(config, Limits) else Limits.from_config(config)
+
+    def _key(self, bucket):
+        return f"{self.prefix}:{bucket}"
+
+    async def acquire(self, tenant, endpoint, cost=1):
+        """Draws ``cost`` tokens for a request; returns a Decision."""
+        buckets = self.limits.buckets(tenant, endpoint)
+        if not buckets:
+            self.admitted += 1
+            return ALLOWED
+        for bucket, limit in buckets:
+            if cost > limit.burst:
+                raise ValueError(f"cost {cost} exceeds the burst of {bucket} ({limit.burst:g})")
+        if self._task is None and self.local:
+            self._task = asyncio.create_task(self._return_loop())
+        if time.monotonic() - self._failed_at < self.retry_interval:
+            return self._acquire_fallback(buckets, cost)
+        try:
+            if self.local:
+                decision = await self._acquire_leased(buckets, cost)
+            else:
+                decision = await self._acquire_remote(buckets, cost)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._redis_failed(e)
+            return self._acquire_fallback(buckets, cost)
+        if decision.allowed:
+            self.admitted += 1
+        else:
+            self.rejected += 1
+        return decision
+
+    async def _acquire_leased(self, buckets, cost):
+        leases = []
+        for bucket, limit in buckets:
+            lease = self._leases.get(bucket)
+            if lease is None:
+                lease = self._leases[bucket] = _Lease(self._key(bucket), limit)
+            lease.limit = limit
+            leases.append(lease)
+        round_trip = False
+        while True:
+            short = [lease for lease in leases if lease.tokens < cost]
+            if not short:
+                for lease in leases:
+                    lease.tokens -= cost
+                if not round_trip:
+                    self.local_admits += 1
+                return ALLOWED
+            now = time.monotonic()
+            if any(lease.empty_until > now for lease in short):
+                # The bucket ran dry: reject locally rather than with a round trip each
+                return Decision(False, max(max(lease.empty_until - now, (cost - lease.tokens - lease.remote)
+                                               / lease.limit.rate) for lease in short))
+            # Otherwise top up, again if other callers took the new tokens first
+            for lease in short:
+                lease.pending += cost
+            try:
+                await self._top_up(short)
+            finally:
+                for lease in short:
+                    lease.pending -= cost
+            round_trip = True
+
+    async def _top_up(self, leases):
+        """Waits for the next round trip that tops up ``leases``, starting one if needed."""
+        if self._batch is None:
+            self._batch = ({}, asyncio.get_running_loop().create_future())
+            task = asyncio.create_task(self._sync())
+            self._syncs.add(task)
+            task.add_done_callback(self._syncs.discard)
+        batch, done = self._batch
+        for lease in leases:
+            batch[lease.key] = lease
+        await asyncio.shield(done)
+
+    async def _sync(self):
+        # Runs once the callers that found their leases short in this loop iteration have joined
+        (batch, done), self._batch = self._batch, None
+        try:
+            await self._lease_round_trip(list(batch.values()))
+        except Exception as e:
+            done.set_exception(e)
+            done.exception()  # a batch nobody waits on any more shouldn't log "never retrieved"
+        else:
+            done.set_result(None)
+
+    async def _lease_round_trip(self, leases, want_tokens=True):
+        now = time.monotonic()
+        args, give_backs, wants = ["lease"], [], {}
+        for lease in leases:
+            max_lease = max(1, int(lease.limit.burst * self.max_lease_fraction))
+            give_back = 0
+            if now - lease.granted_at >= self.lease_ttl and lease.tokens:
+                give_back, lease.tokens = lease.tokens, 0
+                lease.size = max(1, lease.size // 2)  # tokens were left over
+            elif lease.tokens < lease.pending and now - lease.granted_at < self.lease_ttl:
+                lease.size = min(max_lease, lease.size * 2)  # used up within its ttl
+            want = max(lease.pending - lease.tokens, min(lease.size, max_lease)) if want_tokens else 0
+            give_backs.append(give_back)
+            wants[lease.key] = want
+            args += [lease.limit.rate, lease.limit.burst, want, give_back]
+        try:
+            result = await self._call([lease.key for lease in leases], args)
+        except BaseException:
+            for lease, give_back in zip(leases, give_backs):
+                lease.tokens += give_back
+            raise
+        now = time.monotonic()
+        for lease, (granted, remaining) in zip(leases, result):
+            granted = int(float(granted))
+            lease.tokens += granted
+            lease.remote = float(remaining)
+            if granted:
+                lease.granted_at = now
+            if want_tokens and granted < wants[lease.key]:
+                lease.empty_until = now + (1 - lease.remote) / lease.limit.rate  # until the next whole token
+
+    async def _acquire_remote(self, buckets, cost):
+        args = ["all"]
+        for _, limit in buckets:
+            args += [limit.rate, limit.burst, cost, 0]
+        result = await self._call([self._key(bucket) for bucket, _ in buckets], args)
+        if all(float(granted) for granted, _ in result):
+            return ALLOWED
+        return Decision(False, max(0.0, *((cost - float(remaining)) / limit.rate
+                                          for (_, limit), (_, remaining) in zip(buckets, result))))
+
+    async def _call(self, keys, args):
+        async with self.client.acquire() as redis:
+            if self._script is None:
+                self._script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+            self.round_trips += 1
+            result = await self._script(keys=keys, args=args, client=redis)
+        if self._failed_at != float("-inf"):
+            logger.info("rate limiter reconnected to redis")
+            self._failed_at = float("-inf")
+            self._fallback.clear()
+        return [(_text(granted), _text(remaining)) for granted, remaining in result]
+
+    def _redis_failed(self, error):
+        self.errors += 1
+        if self._failed_at == float("-inf"):  # once per outage
+            logger.warning("rate limiter cannot reach redis, limiting %s: %s",
+                           "per process" if self.fail_open else "everything", error)
+        self._failed_at = time.monotonic()
+
+    def _acquire_fallback(self, buckets, cost):
+        if not self.fail_open:
+            self.rejected += 1
+            return Decision(False, self.retry_interval)
+        now = time.monotonic()
+        local = []
+        for bucket, limit in buckets:
+            state = self._fallback.get(bucket)
+            if state is None or state.limit != limit:
+                state = self._fallback[bucket] = TokenBucket(limit, now)
+            state.refill(now)
+            local.append(state)
+        wait = max(state.wait(cost) for state in local)
+        if wait:
+            self.rejected += 1
+            return Decision(False, wait)
+        for state in local:
+            state.tokens -= cost
+        self.admitted += 1
+        self.fallback_admits += 1
+        return ALLOWED
+
+    async def _return_loop(self):
+        while True:
+            await asyncio.sleep(self.lease_ttl)
+            try:
+                await self.return_leases()
+            except Exception as e:
+                self._redis_failed(e)
+
+    async def return_leases(self, everything=False):
+        """Gives tokens in expired (or, with ``everything``, all) leases back, in one round trip."""
+        now = time.monotonic()
+        idle = [bucket for bucket, lease in self._leases.items()
+                if now - lease.granted_at >= self.lease_ttl and not lease.pending]
+        if everything:
+            for lease in self._leases.values():
+                lease.granted_at = float("-inf")
+        returning = [lease for lease in self._leases.values()
+                     if lease.tokens and now - lease.granted_at >= self.lease_ttl]
+        if returning:
+            await self._lease_round_trip(returning, want_tokens=False)
+        for bucket in idle:  # forget buckets this process stopped using
+            lease = self._leases.get(bucket)
+            if lease is not None and not lease.tokens and not lease.pending:
+                del self._leases[bucket]
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.return_leases(everything=True)
+        except Exception as e:
+            logger.warning("rate limiter could not return leased tokens: %s", e)
+
+    def stats(self):
+        return {"admitted": self.admitted, "rejected": self.rejected, "local_admits": self.local_admits,
+                "round_trips": self.round_trips, "errors": self.errors, "fallback_admits": self.fallback_admits,
+                "leases": len(self._leases), "leased_tokens": sum(lease.tokens for lease in self._leases.values()),
+                "degraded": time.monotonic() - self._failed_at < self.retry_interval}
+
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+# Tenant of requests whose tenant isn't known: they share one bucket
+UNKNOWN_TENANT = "unknown"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware answering 429 with Retry-After when a request isn't admitted.
+
+    ``authenticate(scope)`` should return the verified tenant id of a request
+    (or None). Without it, ``tenant_header`` is only believed for tenants named
+    in the config, which suits services behind a gateway that sets it.
+    Everything else counts as UNKNOWN_TENANT, so a client can't get fresh
+    buckets by inventing tenant ids. The endpoint is "<service>:<path>", e.g.
+    "tata-core:/decide".
+    """
+
+    def __init__(self, app, limiter, service, tenant_header="x-tenant-id", authenticate=None,
+                 exempt=("/health", "/metrics")):
+        self.app = app
+        self.limiter = limiter
+        self.service = service
+        self.tenant_header = tenant_header.lower().encode()
+        self.authenticate = authenticate
+        self.exempt = set(exempt)
+
+    def tenant(self, scope):
+        if self.authenticate is not None:
+            return str(self.authenticate(scope) or UNKNOWN_TENANT)
+        claimed = next((value.decode("latin-1") for name, value in scope.get("headers", ())
+                        if name == self.tenant_header), None)
+        return claimed if claimed in self.limiter.limits.tenants else UNKNOWN_TENANT
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt:
+            return await self.app(scope, receive, send)
+        tenant = self.tenant(scope)
+        decision = await self.limiter.acquire(tenant, f"{self.service}:{scope['path']}")
+        if decision.allowed:
+            return await self.app(scope, receive, send)
+        body = json.dumps({"detail": "Rate limit exceeded"}).encode()
+        await send({"type": "http.response.start", "status": 429,
+                    "headers": [(b"content-type", b"application/json"),
+                                (b"content-length", str(len(body)).encode()),
+                                (b"retry-after", str(max(1, math.ceil(decision.retry_after))).encode())]})
+        await send({"type": "http.response.body", "body": body})
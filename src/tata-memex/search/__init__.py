@@ -0,0 +1,19 @@
+"""Keyword search for MEMEX: an on-disk inverted index ranked with BM25.
+
+    from search import InvertedIndex
+
+    index = InvertedIndex("data/memex_index")
+    index.add("note-1", "Zero-knowledge proofs for the audit trail")
+    index.commit()                                   # new documents are searchable after commit
+    index.search("audit proofs", k=10)               # [("note-1", 1.73), ...]
+    index.hybrid_search("audit proofs", vector_hits) # fuse with [(doc id, similarity)] from vector search
+
+Posting lists are delta + varint compressed and decoded with numpy; segments
+merge incrementally as the index grows. ``python -m search`` builds and
+queries an index from the command line.
+"""
+from .hybrid import linear_fusion, reciprocal_rank_fusion
+from .index import InvertedIndex, tokenize
+from .segment import Segment
+
+__all__ = ["InvertedIndex", "Segment", "linear_fusion", "reciprocal_rank_fusion", "tokenize"]
@@ -0,0 +1,61 @@
+"""Build and query a MEMEX keyword index from the command line.
+
+    python -m search add data/memex_index documents.jsonl --id-key id --text-key text
+    python -m search query data/memex_index "zero knowledge audit" -k 5
+    python -m search merge data/memex_index
+    python -m search stats data/memex_index
+"""
+import argparse
+import json
+import time
+
+from .index import InvertedIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m search", description="MEMEX keyword index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="index documents from a JSONL file")
+    add.add_argument("index")
+    add.add_argument("documents")
+    add.add_argument("--id-key", default="id")
+    add.add_argument("--text-key", default="text")
+    query = commands.add_parser("query", help="run a BM25 query")
+    query.add_argument("index")
+    query.add_argument("text")
+    query.add_argument("-k", type=int, default=10)
+    query.add_argument("--all", action="store_true", help="only documents containing every term")
+    merge = commands.add_parser("merge", help="merge all segments into one")
+    merge.add_argument("index")
+    stats = commands.add_parser("stats", help="print segment statistics")
+    stats.add_argument("index")
+    args = parser.parse_args()
+
+    index = InvertedIndex(args.index)
+    start = time.perf_counter()
+    if args.command == "add":
+        added = 0
+        with open(args.documents, "r") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    index.add(record[args.id_key], record[args.text_key])
+                    added += 1
+        index.commit()
+        print(f"Indexed {added} documents in {time.perf_counter() - start:.1f}s ({len(index)} total)")
+    elif args.command == "query":
+        results = index.search(args.text, k=args.k, match_all=args.all)
+        elapsed = 1000 * (time.perf_counter() - start)
+        for doc_id, score in results:
+            print(f"{score:8.3f}  {doc_id}")
+        print(f"{len(results)} results in {elapsed:.1f}ms")
+    elif args.command == "merge":
+        index.merge()
+        print(f"Merged into {len(index.segments)} segment(s) in {time.perf_counter() - start:.1f}s")
+    else:
+        print(json.dumps(index.stats(), indent=2))
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
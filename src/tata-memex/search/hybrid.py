@@ -0,0 +1,41 @@
+"""Fusing keyword and vector rankings.
+
+Both functions take rankings as [(doc id, score)] lists, best first, and
+return one fused list in the same shape.
+"""
+
+# Rank offset for reciprocal rank fusion; 60 is the value from the original RRF paper
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(*rankings, k=RRF_K, weights=None):
+    """Scores each document by sum(weight / (k + rank)) over the rankings it appears in.
+
+    Only ranks are used, so BM25 scores and cosine similarities need no calibration.
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, (doc_id, _) in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: -item[1])
+
+
+def _normalise(ranking):
+    if not ranking:
+        return {}
+    scores = [score for _, score in ranking]
+    low, high = min(scores), max(scores)
+    span = high - low
+    return {doc_id: (score - low) / span if span else 1.0 for doc_id, score in ranking}
+
+
+def linear_fusion(keyword, vector, alpha=0.5):
+    """alpha * vector + (1 - alpha) * keyword, each min-max normalised to [0, 1] first.
+
+    A document missing from one ranking scores 0 on that side.
+    """
+    keyword, vector = _normalise(keyword), _normalise(vector)
+    fused = {doc_id: alpha * vector.get(doc_id, 0.0) + (1 - alpha) * keyword.get(doc_id, 0.0)
+             for doc_id in keyword.keys() | vector.keys()}
+    return sorted(fused.items(), key=lambda item: -item[1])
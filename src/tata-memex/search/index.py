@@ -0,0 +1,304 @@
+"""Segmented on-disk inverted index with BM25 ranking.
+
+Documents are buffered in memory and written out as an immutable segment every
+``flush_docs`` documents (or on ``commit()``); only committed documents are
+searchable. Small segments are merged incrementally: whenever ``merge_factor``
+segments of the same size tier exist they are rewritten as one, so the segment
+count stays logarithmic in the index size without ever rewriting everything.
+Deletes and updates mark the old copy deleted; merges drop it for good.
+
+index.json lists the live segments and their deletions. It is replaced
+atomically after segment files are written, and a segment file is only
+removed once no manifest refers to it, so a crash leaves the last committed
+state readable.
+"""
+import json
+import math
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+from .hybrid import linear_fusion, reciprocal_rank_fusion
+from .segment import Segment, SegmentWriter, write_segment
+
+MANIFEST = "index.json"
+
+_token = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return _token.findall(text.lower())
+
+
+class InvertedIndex:
+    merge_block_postings = 1_000_000
+
+    def __init__(self, path, k1=1.2, b=0.75, flush_docs=50_000, merge_factor=10):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.flush_docs = flush_docs
+        self.merge_factor = merge_factor
+        os.makedirs(path, exist_ok=True)
+        manifest_path = os.path.join(path, MANIFEST)
+        manifest = {"segments": [], "next_segment": 0}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+        self.next_segment = manifest["next_segment"]
+        self.segments = [Segment(os.path.join(path, entry["name"]), entry.get("deleted", ()))
+                         for entry in manifest["segments"]]
+        self._reset_buffer()
+
+    def _reset_buffer(self):
+        self._terms = {}           # term -> buffer term number
+        self._term_index = []      # per posting
+        self._docs = []
+        self._tfs = []
+        self._lengths = []         # per buffered document
+        self._ids = []
+        self._buffer_numbers = {}  # doc id -> buffered document number
+        self._buffer_deleted = set()
+
+    def __len__(self):
+        return sum(s.live_docs for s in self.segments) + len(self._ids) - len(self._buffer_deleted)
+
+    def add(self, doc_id, text):
+        """Indexes a document, replacing any earlier document with the same id."""
+        doc_id = str(doc_id)
+        self.delete(doc_id)
+        number = len(self._ids)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self._term_index.append(self._terms.setdefault(term, len(self._terms)))
+            self._docs.append(number)
+            self._tfs.append(tf)
+        self._lengths.append(sum(counts.values()))
+        self._ids.append(doc_id)
+        self._buffer_numbers[doc_id] = number
+        if len(self._ids) >= self.flush_docs:
+            self.commit()
+
+    def delete(self, doc_id):
+        """Marks a document deleted; returns whether it was in the index."""
+        doc_id = str(doc_id)
+        found = False
+        number = self._buffer_numbers.pop(doc_id, None)
+        if number is not None:
+            self._buffer_deleted.add(number)
+            found = True
+        for segment in self.segments:
+            number = segment.doc_number(doc_id)
+            if number is not None:
+                segment.deleted[number] = True
+                found = True
+        return found
+
+    def commit(self):
+        """Writes buffered documents to a new segment, merges if due and saves the manifest."""
+        if self._ids:
+            self._flush()
+        self._merge_tiers()
+        self._save_manifest()
+
+    def _flush(self):
+        live = np.ones(len(self._ids), dtype=bool)
+        live[list(self._buffer_deleted)] = False
+        renumber = np.cumsum(live) - 1
+        term_index = np.asarray(self._term_index, dtype=np.int64)
+        docs = np.asarray(self._docs, dtype=np.int64)
+        tfs = np.asarray(self._tfs, dtype=np.int64)
+        keep = live[docs]
+        term_index, docs, tfs = term_index[keep], renumber[docs[keep]], tfs[keep]
+
+        # Number terms in sorted order, dropping those only deleted documents used
+        terms = list(self._terms)
+        used = np.zeros(len(terms), dtype=bool)
+        used[term_index] = True
+        sorted_terms = sorted(term for term, in_use in zip(terms, used) if in_use)
+        numbers = {term: i for i, term in enumerate(sorted_terms)}
+        term_index = np.array([numbers.get(term, -1) for term in terms], dtype=np.int64)[term_index]
+        lengths = np.asarray(self._lengths, dtype=np.int64)[live]
+        ids = [doc_id for doc_id, keep_doc in zip(self._ids, live) if keep_doc]
+        self._reset_buffer()
+        if ids:
+            self._write(sorted_terms, term_index, docs, tfs, lengths, ids)
+
+    def _new_segment_path(self):
+        name = f"seg_{self.next_segment:06d}.six"
+        self.next_segment += 1
+        return os.path.join(self.path, name)
+
+    def _write(self, terms, term_index, docs, tfs, lengths, ids):
+        path = self._new_segment_path()
+        write_segment(path, terms, term_index, docs, tfs, lengths, ids)
+        segment = Segment(path)
+        self.segments.append(segment)
+        return segment
+
+    def _tier(self, segment):
+        ratio = max(segment.live_docs, 1) / self.flush_docs
+        return max(0, int(math.log(ratio, self.merge_factor))) if ratio > 1 else 0
+
+    def _merge_tiers(self):
+        while True:
+            tiers = {}
+            for segment in self.segments:
+                tiers.setdefault(self._tier(segment), []).append(segment)
+            due = next((group for _, group in sorted(tiers.items()) if len(group) >= self.merge_factor), None)
+            if due is None:
+                return
+            self.merge(due[:self.merge_factor])
+
+    def merge(self, segments=None):
+        """Rewrites the given segments (default: all) as one, dropping deleted documents.
+
+        Postings are streamed through in blocks of about ``merge_block_postings``
+        so memory stays bounded however large the segments are.
+        """
+        segments = list(self.segments if segments is None else segments)
+        if len(segments) < 2 and not any(s.deleted.any() for s in segments):
+            return None
+        merged_terms = sorted(set().union(*(s.terms for s in segments)))
+        numbers = {term: i for i, term in enumerate(merged_terms)}
+        term_numbers = [np.array([numbers[term] for term in s.terms], dtype=np.int64) for s in segments]
+        renumbers, lengths, ids, base = [], [], [], 0
+        for segment in segments:
+            live = ~segment.deleted
+            renumbers.append(np.cumsum(live) - 1 + base)
+            lengths.append(segment.lengths[live])
+            ids.extend(doc_id for doc_id, keep_doc in zip(segment.doc_ids, live) if keep_doc)
+            base += int(live.sum())
+
+        # Cut the merged vocabulary into blocks holding roughly the same number of postings
+        total_df = np.zeros(len(merged_terms), dtype=np.int64)
+        for segment, numbers_in_merged in zip(segments, term_numbers):
+            total_df[numbers_in_merged] += segment.df
+        block_ends = np.searchsorted(np.cumsum(total_df),
+                                     np.arange(1, total_df.sum() // self.merge_block_postings + 1)
+                                     * self.merge_block_postings)
+        bounds = np.unique(np.clip(np.concatenate([[0], block_ends + 1, [len(merged_terms)]]), 0, len(merged_terms)))
+
+        path = self._new_segment_path()
+        writer = SegmentWriter(path)
+        try:
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                parts = []
+                for segment, numbers_in_merged, renumber in zip(segments, term_numbers, renumbers):
+                    start, stop = np.searchsorted(numbers_in_merged, [lo, hi])
+                    if start == stop:
+                        continue
+                    term_index, docs, tfs = segment.postings_range(start, stop)
+                    keep = ~segment.deleted[docs]
+                    parts.append((numbers_in_merged[term_index[keep]] - lo, renumber[docs[keep]], tfs[keep]))
+                if parts:
+                    writer.add_block(merged_terms[lo:hi], *(np.concatenate(column) for column in zip(*parts)))
+            writer.finish(np.concatenate(lengths) if lengths else [], ids)
+        except BaseException:
+            writer.abort()
+            raise
+
+        position = self.segments.index(segments[0])
+        for segment in segments:
+            self.segments.remove(segment)
+        merged = None
+        if ids:
+            merged = Segment(path)
+            self.segments.insert(position, merged)
+        else:
+            os.remove(path)
+        self._save_manifest()
+        for segment in segments:
+            segment.close()
+            os.remove(segment.path)
+        return merged
+
+    def _save_manifest(self):
+        manifest = {"next_segment": self.next_segment,
+                    "segments": [{"name": s.name, "docs": s.n_docs,
+                                  "deleted": np.flatnonzero(s.deleted).tolist()} for s in self.segments]}
+        tmp_path = os.path.join(self.path, f"{MANIFEST}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(self.path, MANIFEST))
+
+    def search(self, query, k=10, match_all=False):
+        """Top ``k`` committed documents by BM25 as [(doc id, score)], best first.
+
+        With ``match_all`` only documents containing every query term are returned.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        n_docs = sum(s.live_docs for s in self.segments)
+        if not terms or not n_docs:
+            return []
+        avgdl = sum(s.live_length for s in self.segments) / n_docs
+        idf = {}
+        for term in terms:
+            df = sum(int(s.df[s.term_numbers[term]]) for s in self.segments if term in s.term_numbers)
+            idf[term] = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+        candidates = []  # (scores, segment number, local document numbers) per segment
+        for n, segment in enumerate(self.segments):
+            found_docs, found_scores = [], []
+            for term in terms:
+                postings = segment.postings(term)
+                if postings is None:
+                    continue
+                docs, tfs = postings
+                norm = self.k1 * (1 - self.b + self.b * segment.lengths[docs] / avgdl)
+                found_docs.append(docs)
+                found_scores.append(idf[term] * tfs * (self.k1 + 1) / (tfs + norm))
+            if not found_docs or (match_all and len(found_docs) < len(terms)):
+                continue
+            if len(found_docs) == 1:
+                docs, scores = found_docs[0], found_scores[0]
+            elif sum(len(d) for d in found_docs) * 8 > segment.n_docs:
+                # Common terms: accumulate into a dense array rather than sorting the postings
+                dense, hits = np.zeros(segment.n_docs), np.zeros(segment.n_docs, dtype=np.int32)
+                for term_docs, term_scores in zip(found_docs, found_scores):
+                    dense[term_docs] += term_scores  # a term lists each document once
+                    hits[term_docs] += 1
+                docs = np.flatnonzero(hits == len(terms) if match_all else hits)
+                scores = dense[docs]
+            else:
+                docs, inverse = np.unique(np.concatenate(found_docs), return_inverse=True)
+                scores = np.bincount(inverse, weights=np.concatenate(found_scores))
+                if match_all:
+                    complete = np.bincount(inverse) == len(terms)
+                    docs, scores = docs[complete], scores[complete]
+            if segment.deleted.any():
+                keep = ~segment.deleted[docs]
+                docs, scores = docs[keep], scores[keep]
+            if len(docs) > k:
+                top = np.argpartition(-scores, k)[:k]
+                docs, scores = docs[top], scores[top]
+            candidates.extend((float(score), n, int(doc)) for score, doc in zip(scores, docs))
+        candidates.sort(key=lambda c: -c[0])
+        return [(self.segments[n].doc_ids[doc], score) for score, n, doc in candidates[:k]]
+
+    def hybrid_search(self, query, vector_results, k=10, method="rrf", alpha=0.5, candidates=100):
+        """Fuses BM25 results with a vector search's [(doc id, similarity)] for the same query.
+
+        ``method`` is "rrf" (reciprocal rank fusion, robust to the two score
+        scales) or "linear" (min-max normalised scores, ``alpha`` weighting the
+        vector side).
+        """
+        keyword_results = self.search(query, k=candidates)
+        vector_results = [(str(doc_id), score) for doc_id, score in vector_results]
+        if method == "rrf":
+            return reciprocal_rank_fusion(keyword_results, vector_results)[:k]
+        if method == "linear":
+            return linear_fusion(keyword_results, vector_results, alpha)[:k]
+        raise ValueError(f"Unknown fusion method: {method!r} (expected 'rrf' or 'linear')")
+
+    def stats(self):
+        return {"documents": len(self), "segments": [{"name": s.name, "docs": s.n_docs, "deleted":
+                                                       int(s.deleted.sum()), "terms": s.n_terms}
+                                                      for s in self.segments],
+                "buffered": len(self._ids) - len(self._buffer_deleted)}
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
@@ -0,0 +1,170 @@
+"""Immutable on-disk index segments.
+
+A segment file holds, after a fixed header:
+
+    postings    per term: varint gaps between document numbers, then varint term frequencies
+    terms       sorted terms, utf-8, newline separated
+    offsets     uint64 byte offset of each term's postings (n_terms + 1 entries)
+    df          uint32 document frequency of each term
+    lengths     uint32 token count of each document
+    doc ids     JSON list of external document ids
+
+Postings come first so a writer can stream them out block by block and fill
+in the header last. Everything but the postings is read into memory when the
+segment is opened; postings are memory-mapped and decoded on demand.
+"""
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from . import varint
+
+MAGIC = b"TATAIX2\n"
+
+# magic, docs, terms, then the byte size of each section in file order
+HEADER = struct.Struct("<8sQQQQQQQQ")
+
+
+class SegmentWriter:
+    """Writes a segment from blocks of postings given in term order."""
+
+    def __init__(self, path):
+        self.path = path
+        self._tmp_path = f"{path}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(b"\0" * HEADER.size)
+        self.terms = []
+        self._term_bytes = []
+        self._df = []
+
+    def add_block(self, terms, term_index, docs, tfs):
+        """Appends postings for ``terms`` (sorted, after every earlier block's terms).
+
+        ``term_index`` numbers postings within ``terms``; terms left without
+        postings are dropped.
+        """
+        term_index = np.asarray(term_index, dtype=np.int64)
+        docs = np.asarray(docs, dtype=np.int64)
+        tfs = np.asarray(tfs, dtype=np.int64)
+        order = np.lexsort((docs, term_index))
+        term_index, docs, tfs = term_index[order], docs[order], tfs[order]
+
+        df = np.bincount(term_index, minlength=len(terms))
+        gaps = docs.copy()
+        gaps[1:] -= docs[:-1]
+        first = np.ones(len(docs), dtype=bool)
+        first[1:] = term_index[1:] != term_index[:-1]
+        gaps[first] = docs[first]
+
+        # Per term, all gaps and then all frequencies
+        values = np.concatenate([gaps, tfs])
+        group = np.concatenate([term_index, term_index])
+        kind = np.repeat([0, 1], len(docs))
+        position = np.concatenate([np.arange(len(docs))] * 2)
+        layout = np.lexsort((position, kind, group))
+        encoded, sizes = varint.encode(values[layout])
+        term_bytes = np.bincount(group[layout], weights=sizes, minlength=len(terms)).astype(np.int64)
+        self._file.write(encoded.tobytes())
+
+        used = df > 0
+        self.terms.extend(term for term, in_use in zip(terms, used) if in_use)
+        self._term_bytes.append(term_bytes[used])
+        self._df.append(df[used])
+
+    def finish(self, lengths, doc_ids):
+        postings_size = self._file.tell() - HEADER.size
+        offsets = np.zeros(len(self.terms) + 1, dtype=np.uint64)
+        if self.terms:
+            np.cumsum(np.concatenate(self._term_bytes), out=offsets[1:])
+        df = np.concatenate(self._df).astype(np.uint32) if self._df else np.zeros(0, dtype=np.uint32)
+        sections = ["\n".join(self.terms).encode(), offsets.tobytes(), df.tobytes(),
+                    np.asarray(lengths, dtype=np.uint32).tobytes(), json.dumps(list(doc_ids)).encode()]
+        for section in sections:
+            self._file.write(section)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, len(lengths), len(self.terms), postings_size,
+                                     *(len(s) for s in sections)))
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        os.remove(self._tmp_path)
+
+
+def write_segment(path, terms, term_index, docs, tfs, lengths, doc_ids):
+    """Writes a whole segment from parallel posting arrays (term number, document number, frequency)."""
+    writer = SegmentWriter(path)
+    writer.add_block(terms, term_index, docs, tfs)
+    writer.finish(lengths, doc_ids)
+
+
+class Segment:
+    def __init__(self, path, deleted=()):
+        self.path = path
+        self.name = os.path.basename(path)
+        self._file = open(path, "rb")
+        header = HEADER.unpack(self._file.read(HEADER.size))
+        if header[0] != MAGIC:
+            raise ValueError(f"{path} is not an index segment")
+        self.n_docs, self.n_terms = header[1], header[2]
+        postings_size, terms_size, offsets_size, df_size, lengths_size, ids_size = header[3:]
+
+        self._file.seek(HEADER.size + postings_size)
+        terms = self._file.read(terms_size).decode()
+        self.terms = terms.split("\n") if self.n_terms else []
+        self.term_numbers = {term: i for i, term in enumerate(self.terms)}
+        offsets = np.frombuffer(self._file.read(offsets_size), dtype=np.uint64)
+        self.offsets = offsets.astype(np.int64) + HEADER.size  # positions in the file
+        self.df = np.frombuffer(self._file.read(df_size), dtype=np.uint32)
+        self.lengths = np.frombuffer(self._file.read(lengths_size), dtype=np.uint32)
+        self.doc_ids = json.loads(self._file.read(ids_size))
+        self._postings = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.deleted = np.zeros(self.n_docs, dtype=bool)
+        self.deleted[list(deleted)] = True
+        self._id_numbers = None
+
+    @property
+    def live_docs(self):
+        return self.n_docs - int(self.deleted.sum())
+
+    @property
+    def live_length(self):
+        return int(self.lengths[~self.deleted].sum(dtype=np.int64))
+
+    def doc_number(self, doc_id):
+        """Local number of a live document, or None; builds the id lookup on first use."""
+        if self._id_numbers is None:
+            self._id_numbers = {d: i for i, d in enumerate(self.doc_ids)}
+        number = self._id_numbers.get(doc_id)
+        return None if number is None or self.deleted[number] else number
+
+    def postings(self, term):
+        """(document numbers, term frequencies) for a term, or None if the segment lacks it."""
+        i = self.term_numbers.get(term)
+        if i is None:
+            return None
+        values = varint.decode(self._postings[self.offsets[i]:self.offsets[i + 1]])
+        df = int(self.df[i])
+        return np.cumsum(values[:df], dtype=np.int64), values[df:].astype(np.int64)
+
+    def postings_range(self, start, stop):
+        """Postings of terms ``start`` to ``stop`` as (term number, document number, frequency) arrays."""
+        values = varint.decode(self._postings[self.offsets[start]:self.offsets[stop]])
+        df = self.df[start:stop].astype(np.int64)
+        counts = 2 * df
+        group_starts = np.cumsum(counts) - counts
+        position = np.arange(len(values)) - np.repeat(group_starts, counts)
+        is_doc = position < np.repeat(df, counts)
+        term_index = np.repeat(np.arange(start, stop), df)
+        gaps_sum = np.cumsum(values[is_doc].astype(np.int64))
+        before = np.concatenate([[0], gaps_sum])[np.cumsum(df) - df]
+        return term_index, gaps_sum - np.repeat(before, df), values[~is_doc].astype(np.int64)
+
+    def close(self):
+        self._postings.close()
+        self._file.close()
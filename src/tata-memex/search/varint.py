@@ -0,0 +1,43 @@
+"""LEB128 varints, encoded and decoded a whole array at a time with numpy.
+
+Each value is stored 7 bits per byte, low bits first, with the high bit set on
+every byte except the last. Posting lists store gaps between sorted document
+numbers, which are small, so most values take a single byte.
+"""
+import numpy as np
+
+_MAX_BYTES = 10  # enough for any uint64
+
+
+def encode(values):
+    """Returns (bytes as a uint8 array, byte length of each value) for non-negative integers."""
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    for k in range(1, _MAX_BYTES):
+        more = values >= np.uint64(1 << (7 * k))
+        if not more.any():
+            break
+        lengths += more
+    starts = np.zeros(len(values), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    for k in range(int(lengths.max()) if len(values) else 0):
+        present = lengths > k
+        chunk = (values[present] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        continues = (lengths[present] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[present] + k] = chunk | continues
+    return out, lengths
+
+
+def decode(buffer):
+    """Returns the uint64 values in a buffer of complete varints."""
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    if not len(data) or data.max() < 0x80:  # every value fits in one byte
+        return data.astype(np.uint64)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    shifts = (np.arange(len(data)) - np.repeat(starts, ends - starts + 1)) * 7
+    chunks = (data & 0x7F).astype(np.uint64) << shifts.astype(np.uint64)
+    return np.add.reduceat(chunks, starts)
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""Incremental Merkle commitment store with batched inclusion proofs.
+
+The tree is kept as one flat array of 32-byte hashes per level (leaves at
+level 0), in memory and in one file per level on disk. Appending m leaves or
+updating one leaf only recomputes the parents above the touched positions:
+O(m + log n) and O(log n) hashes. A whole million-leaf tree never needs
+rehashing. An odd node at the end of a level is promoted unchanged.
+
+Leaves and interior nodes are hashed with different prefixes (0x00 and 0x01,
+as in RFC 6962), so a leaf can never be passed off as an interior node.
+
+A proof for several leaves at once shares the sibling hashes their paths have
+in common. k leaves cost far fewer than k * log n hashes, and the verifier
+recomputes the root in a single pass.
+
+    store = MerkleStore("data/merkle/files")
+    store.append_many([b"record-1", b"record-2", ...])
+    store.update(17, b"record-17 v2")
+    store.commit()                                    # write dirty nodes + meta.json
+    proof = store.prove([3, 17, 40_000])
+    verify(store.root(), proof, [b"record-4", b"record-17 v2", b"..."])
+
+    python3 merkle.py build-files data/merkle/files   # commit file_integrity_report.txt
+    python3 merkle.py prove data/merkle/files /path/as/listed/in/the/report > proof.json
+    python3 merkle.py verify proof.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+
+HASH_SIZE = 32
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+META = "meta.json"
+
+
+def _as_bytes(data):
+    return data.encode() if isinstance(data, str) else bytes(data)
+
+
+def leaf_hash(data):
+    return hashlib.sha256(LEAF_PREFIX + _as_bytes(data)).digest()
+
+
+def node_hash(left, right):
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+
+@dataclass
+class InclusionProof:
+    """Sibling hashes proving that the leaves at ``indices`` are in a tree of ``leaf_count`` leaves."""
+
+    leaf_count: int
+    indices: list
+    hashes: list = field(default_factory=list)
+
+    def to_dict(self):
+        return {"leaf_count": self.leaf_count, "indices": self.indices, "hashes": [h.hex() for h in self.hashes]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["leaf_count"], list(data["indices"]), [bytes.fromhex(h) for h in data["hashes"]])
+
+
+def verify(root, proof, leaves):
+    """Whether ``leaves`` (the data at ``proof.indices``, in that order) hash up to ``root``."""
+    if len(leaves) != len(proof.indices) or not proof.indices:
+        return False
+    nodes = {}
+    for index, data in zip(proof.indices, leaves):
+        if not 0 <= index < proof.leaf_count or nodes.setdefault(index, leaf_hash(data)) != leaf_hash(data):
+            return False
+    hashes = iter(proof.hashes)
+    size = proof.leaf_count
+    try:
+        while size > 1:
+            nodes, size = _parents(nodes, size, lambda _: next(hashes)), (size + 1) // 2
+    except StopIteration:
+        return False
+    return next(hashes, None) is None and nodes.get(0) == root
+
+
+def _parents(nodes, size, sibling_hash):
+    """Hashes one level of known nodes up to their parents, fetching missing siblings in index order."""
+    parents = {}
+    for index in sorted(nodes):
+        parent = index >> 1
+        if parent in parents:
+            continue
+        sibling = index ^ 1
+        if sibling >= size:
+            parents[parent] = nodes[index]  # promoted
+            continue
+        other = nodes[sibling] if sibling in nodes else sibling_hash(sibling)
+        parents[parent] = node_hash(nodes[index], other) if index % 2 == 0 else node_hash(other, nodes[index])
+    return parents
+
+
+class MerkleStore:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.levels = [bytearray()]
+        self._dirty = [[]]  # per level, (first, end) node ranges not yet written
+        meta_path = os.path.join(path, META)
+        if os.path.exists(meta_path):
+            with open(meta_path, "r") as f:
+                self._load(json.load(f))
+
+    def _load(self, meta):
+        size = meta["leaf_count"]
+        self.levels, self._dirty = [], []
+        for level in range(meta["levels"]):
+            with open(self._level_path(level), "rb") as f:
+                self.levels.append(bytearray(f.read(size * HASH_SIZE)))
+            self._dirty.append([])
+            size = (size + 1) // 2
+        if meta.get("root") and self.root().hex() != meta["root"]:
+            # A commit was interrupted after rewriting some nodes: rebuild from the leaves
+            leaves = self.levels[0]
+            self.levels, self._dirty = [leaves], [[(0, len(leaves) // HASH_SIZE)]]
+            self._recompute(range(0, len(leaves) // HASH_SIZE))
+
+    def _level_path(self, level):
+        return os.path.join(self.path, f"level_{level:02d}.bin")
+
+    def __len__(self):
+        return len(self.levels[0]) // HASH_SIZE
+
+    def node(self, level, index):
+        return bytes(self.levels[level][index * HASH_SIZE:(index + 1) * HASH_SIZE])
+
+    def root(self):
+        if not len(self):
+            return EMPTY_ROOT
+        return self.node(len(self.levels) - 1, 0)
+
+    def leaf(self, index):
+        return self.node(0, index)
+
+    def append(self, data):
+        """Adds a leaf and returns its index."""
+        return self.append_many([data]).start
+
+    def append_many(self, items):
+        """Adds leaves in order and returns the range of their indices."""
+        first = len(self)
+        self.levels[0].extend(b"".join(leaf_hash(data) for data in items))
+        added = range(first, len(self))
+        self._dirty[0].append((added.start, added.stop))
+        self._recompute(added)
+        return added
+
+    def update(self, index, data):
+        self.update_many({index: data})
+
+    def update_many(self, updates):
+        """Replaces leaves given as {index: data}; shared ancestors are hashed once."""
+        leaves = self.levels[0]
+        for index, data in updates.items():
+            if not 0 <= index < len(self):
+                raise IndexError(f"leaf {index} out of range for {len(self)} leaves")
+            leaves[index * HASH_SIZE:(index + 1) * HASH_SIZE] = leaf_hash(data)
+            self._dirty[0].append((index, index + 1))
+        self._recompute(sorted(updates))
+
+    def _recompute(self, changed):
+        """Rehashes the ancestors of the changed level-0 positions (a range or a sorted list)."""
+        level = 0
+        while len(self.levels[level]) > HASH_SIZE:
+            children = self.levels[level]
+            size = len(children) // HASH_SIZE
+            if level + 1 == len(self.levels):
+                self.levels.append(bytearray())
+                self._dirty.append([])
+            parents = self.levels[level + 1]
+            parent_size = (size + 1) // 2
+            if len(parents) < parent_size * HASH_SIZE:
+                parents.extend(bytes(parent_size * HASH_SIZE - len(parents)))
+            if isinstance(changed, range):
+                changed = range(changed.start >> 1, (changed.stop + 1) >> 1)
+            else:
+                changed = sorted({index >> 1 for index in changed})
+            for parent in changed:
+                left = 2 * parent * HASH_SIZE
+                if 2 * parent + 1 < size:
+                    digest = node_hash(children[left:left + HASH_SIZE],
+                                       children[left + HASH_SIZE:left + 2 * HASH_SIZE])
+                else:
+                    digest = children[left:left + HASH_SIZE]
+                parents[parent * HASH_SIZE:(parent + 1) * HASH_SIZE] = digest
+            if isinstance(changed, range):
+                self._dirty[level + 1].append((changed.start, changed.stop))
+            else:
+                self._dirty[level + 1].extend((i, i + 1) for i in changed)
+            level += 1
+
+    def prove(self, indices):
+        """An InclusionProof for the leaves at ``indices``, sharing common siblings."""
+        indices = list(indices)
+        for index in indices:
+            if not 0 <= index < len(self):
+                raise IndexError(f"leaf {index} out of range for {len(self)} leaves")
+        hashes = []
+        nodes = {index: self.leaf(index) for index in indices}
+        for level in range(len(self.levels) - 1):
+            size = len(self.levels[level]) // HASH_SIZE
+
+            def sibling_hash(sibling, level=level):
+                hashes.append(self.node(level, sibling))
+                return hashes[-1]
+            nodes = _parents(nodes, size, sibling_hash)
+        return InclusionProof(len(self), indices, hashes)
+
+    def commit(self, sync=True):
+        """Writes the changed nodes of every level, then meta.json (atomically)."""
+        for level, ranges in enumerate(self._dirty):
+            data = self.levels[level]
+            fd = os.open(self._level_path(level), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                for first, end in _merge_ranges(ranges):
+                    os.pwrite(fd, data[first * HASH_SIZE:end * HASH_SIZE], first * HASH_SIZE)
+                os.ftruncate(fd, len(data))
+                if sync:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+            ranges.clear()
+        meta = {"leaf_count": len(self), "levels": len(self.levels), "hash": "sha256", "root": self.root().hex()}
+        tmp_path = os.path.join(self.path, f"{META}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.path, META))
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for first, end in sorted(ranges):
+        if merged and first <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([first, end])
+    return merged
+
+
+# File commitments built from scripts/file_integrity.py's report: leaf i is
+# "<path>\0<digest>" for the i-th path in paths.txt. New files are appended and
+# changed or removed ones update their leaf in place, so re-commits are incremental.
+# paths.txt is written before the tree is committed; entries past the committed
+# leaf count belong to an interrupted run and are ignored.
+
+PATHS = "paths.txt"
+
+
+def file_leaf(path, digest):
+    return f"{path}\0{digest or ''}"
+
+
+def read_report(report_path):
+    digests = {}
+    with open(report_path, "r") as f:
+        for line in f:
+            digest, _, path = line.rstrip("\n").partition("  ")
+            if path:
+                digests[path] = digest
+    return digests
+
+
+def read_paths(store):
+    """The file path of each committed leaf, in leaf order."""
+    paths_file = os.path.join(store.path, PATHS)
+    if not os.path.exists(paths_file):
+        return []
+    with open(paths_file, "r") as f:
+        return f.read().splitlines()[:len(store)]
+
+
+def _write_paths(store, paths):
+    paths_file = os.path.join(store.path, PATHS)
+    tmp_path = f"{paths_file}.tmp"
+    with open(tmp_path, "w") as f:
+        f.writelines(f"{path}\n" for path in paths)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, paths_file)
+
+
+def commit_files(store_path, report_path):
+    store = MerkleStore(store_path)
+    paths, digests = read_paths(store), read_report(report_path)
+    known = set(paths)
+    # Rewrite every leaf whose digest changed (removed files get an empty digest)
+    updates = {i: file_leaf(path, digests.get(path)) for i, path in enumerate(paths)
+               if store.leaf(i) != leaf_hash(file_leaf(path, digests.get(path)))}
+    store.update_many(updates)
+    new_paths = sorted(path for path in digests if path not in known)
+    store.append_many(file_leaf(path, digests[path]) for path in new_paths)
+    if new_paths:
+        _write_paths(store, paths + new_paths)
+    store.commit()
+    return store, len(new_paths), len(updates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merkle commitments over records and files")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build-files", help="commit file_integrity_report.txt into a store")
+    build.add_argument("store")
+    build.add_argument("--report", default="file_integrity_report.txt")
+    root = commands.add_parser("root", help="print the committed root")
+    root.add_argument("store")
+    prove = commands.add_parser("prove", help="print a JSON inclusion proof for file paths")
+    prove.add_argument("store")
+    prove.add_argument("paths", nargs="+")
+    prove.add_argument("--report", default="file_integrity_report.txt", help="digests the store was built from")
+    check = commands.add_parser("verify", help="verify a proof written by 'prove'")
+    check.add_argument("proof")
+    check.add_argument("--root", help="expected root (hex); defaults to the one in the proof")
+    args = parser.parse_args()
+
+    if args.command == "build-files":
+        store, added, updated = commit_files(args.store, args.report)
+        print(f"{len(store)} leaves ({added} added, {updated} updated); root {store.root().hex()}")
+    elif args.command == "root":
+        print(MerkleStore(args.store).root().hex())
+    elif args.command == "prove":
+        store = MerkleStore(args.store)
+        positions = {path: i for i, path in enumerate(read_paths(store))}
+        missing = [path for path in args.paths if path not in positions]
+        if missing:
+            parser.error(f"not in the store: {', '.join(missing)}")
+        digests = read_report(args.report)
+        leaves = [file_leaf(path, digests.get(path)) for path in args.paths]
+        stale = [path for path, leaf in zip(args.paths, leaves) if store.leaf(positions[path]) != leaf_hash(leaf)]
+        if stale:
+            parser.error(f"report differs from the committed leaves (run build-files): {', '.join(stale)}")
+        proof = store.prove([positions[path] for path in args.paths])
+        json.dump({"root": store.root().hex(), "leaves": leaves, **proof.to_dict()}, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.proof, "r") as f:
+            data = json.load(f)
+        ok = verify(bytes.fromhex(args.root or data["root"]), InclusionProof.from_dict(data), data["leaves"])
+        print("valid" if ok else "INVALID")
+        return 0 if ok else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
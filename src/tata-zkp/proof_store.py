@@ -0,0 +1,259 @@
+"""Bulk persistence of verified-proof records to postgres_zkp.
+
+Verifiers call ``record()``, which only appends to an in-memory buffer. A
+background task writes the buffer with one binary COPY per batch: every
+``flush_interval`` seconds, or sooner when ``batch_size`` records are waiting.
+Per-row INSERTs cost a round trip and a statement execution each; COPY streams
+thousands of rows in one.
+
+proof_records is range-partitioned on verified_at (by hour, day or month).
+Partitions are created ahead of time and on demand for whatever periods a
+batch covers. Partitions older than the retention period are dropped whole,
+which is instant and leaves no dead rows to vacuum, unlike DELETE.
+
+    from tata_common.db import get_client
+    from proof_store import ProofStore
+
+    store = ProofStore(await get_client("postgres", prefix="TATA_ZKP_DB"))
+    await store.start()
+    await store.record("proof-42", circuit="balance_check", valid=True, duration_ms=3.1)
+    ...
+    await store.close()   # flushes what is left
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("proof_id", "verified_at", "circuit", "verifier", "valid", "public_inputs", "proof_hash", "duration_ms")
+
+INTERVALS = ("hour", "day", "month")
+
+_identifier = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def period_start(moment, interval):
+    """Start (UTC) of the partition period containing ``moment``."""
+    moment = moment.astimezone(timezone.utc)
+    if interval == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if interval == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_period(start, interval):
+    if interval == "hour":
+        return start + timedelta(hours=1)
+    if interval == "day":
+        return start + timedelta(days=1)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def partition_name(table, start, interval):
+    suffix = {"hour": "%Y%m%d%H", "day": "%Y%m%d", "month": "%Y%m"}[interval]
+    return f"{table}_p{start.strftime(suffix)}"
+
+
+class ProofStore:
+    def __init__(self, client, table="proof_records", interval=None, retention_days=None, batch_size=5000,
+                 flush_interval=1.0, max_buffer=200_000, premake=3):
+        interval = interval or os.environ.get("TATA_ZKP_PARTITION_INTERVAL", "day")
+        if interval not in INTERVALS:
+            raise ValueError(f"Unknown partition interval: {interval!r} (expected one of {INTERVALS})")
+        if not _identifier.match(table):
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.client = client
+        self.table = table
+        self.interval = interval
+        self.retention = timedelta(days=float(retention_days if retention_days is not None else
+                                              os.environ.get("TATA_ZKP_PROOF_RETENTION_DAYS", "90")))
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.premake = premake  # partitions created ahead of the current one
+        self._buffer = []
+        self._partitions = set()  # period starts known to exist
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task = None
+        self._closing = False
+        self._last_maintenance = 0.0
+        self._failed_at = float("-inf")
+        self._shedding = False
+        self.written = 0
+        self.flushes = 0
+        self.errors = 0
+        self.dropped_records = 0
+        self.copy_seconds = 0.0
+        self.partitions_ensured = 0
+        self.partitions_dropped = 0
+
+    async def start(self):
+        await self.create_schema()
+        await self.maintain()
+        self._task = asyncio.create_task(self._flush_loop())
+        return self
+
+    async def close(self):
+        if self._task is not None:
+            # Let the loop finish a flush in progress rather than cancelling it mid-COPY
+            self._closing = True
+            self._wake.set()
+            try:
+                await self._task
+            finally:
+                self._task = None
+        await self.flush()
+
+    async def create_schema(self):
+        await self.client.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                proof_id      text        NOT NULL,
+                verified_at   timestamptz NOT NULL,
+                circuit       text        NOT NULL,
+                verifier      text,
+                valid         boolean     NOT NULL,
+                public_inputs jsonb,
+                proof_hash    bytea,
+                duration_ms   real
+            ) PARTITION BY RANGE (verified_at)""")
+        await self.client.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_proof_id ON {self.table} (proof_id)")
+        # Rows arrive in time order, so a BRIN index on verified_at stays tiny and still prunes well
+        await self.client.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_verified_at ON {self.table} USING brin (verified_at)")
+
+    async def record(self, proof_id, circuit, valid, verifier=None, public_inputs=None, proof_hash=None,
+                     duration_ms=None, verified_at=None):
+        """Queues one verified proof; it reaches the database with the next batch."""
+        verified_at = verified_at or datetime.now(timezone.utc)
+        if verified_at.tzinfo is None:
+            verified_at = verified_at.replace(tzinfo=timezone.utc)
+        self._buffer.append((str(proof_id), verified_at, circuit, verifier, bool(valid),
+                             json.dumps(public_inputs) if public_inputs is not None else None,
+                             proof_hash, duration_ms))
+        if len(self._buffer) >= self.max_buffer:
+            # Back-pressure: the caller waits for a flush rather than the buffer growing forever,
+            # unless the database just failed, in which case the oldest records are shed
+            if time.monotonic() - self._failed_at >= self.flush_interval:
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.warning("proof store flush failed: %s", e)
+            self._shed(len(self._buffer) - self.max_buffer)
+        elif len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    async def flush(self):
+        """Writes everything buffered so far with COPY; returns the number of records written."""
+        async with self._flush_lock:
+            pending, self._buffer = self._buffer, []
+            written = 0
+            for offset in range(0, len(pending), self.batch_size):
+                batch = pending[offset:offset + self.batch_size]
+                try:
+                    await self._ensure_partitions({period_start(r[1], self.interval) for r in batch})
+                    start = time.perf_counter()
+                    await self.client.copy_records(self.table, batch, columns=COLUMNS)
+                except BaseException as e:
+                    self._buffer[:0] = pending[offset:]  # failed or cancelled: the next flush retries
+                    if isinstance(e, Exception):
+                        self.errors += 1
+                        self._failed_at = time.monotonic()
+                        self._partitions.clear()  # another process may have dropped one; re-check next time
+                        self._shed(len(self._buffer) - self.max_buffer)
+                    raise
+                self.copy_seconds += time.perf_counter() - start
+                self.flushes += 1
+                self.written += len(batch)
+                written += len(batch)
+            self._shedding = False
+            return written
+
+    def _shed(self, excess):
+        if excess <= 0:
+            return
+        del self._buffer[:excess]
+        self.dropped_records += excess
+        if not self._shedding:  # once per outage
+            logger.warning("proof store buffer full while the database is failing; dropping oldest records")
+            self._shedding = True
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._closing:
+                return  # close() flushes what is left
+            try:
+                await self.flush()
+                if time.monotonic() - self._last_maintenance >= 3600:
+                    await self.maintain()
+            except Exception as e:
+                logger.warning("proof store flush failed, retrying: %s", e)
+
+    async def _ensure_partitions(self, starts):
+        for start in sorted(starts - self._partitions):
+            name = partition_name(self.table, start, self.interval)
+            end = next_period(start, self.interval)
+            await self.client.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {self.table} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')")
+            self._partitions.add(start)
+            self.partitions_ensured += 1
+
+    async def partitions(self):
+        """[(partition name, period start)] currently attached to the table, oldest first."""
+        rows = await self.client.fetch(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass($1)", self.table)
+        pattern = {"hour": "%Y%m%d%H", "day": "%Y%m%d", "month": "%Y%m"}[self.interval]
+        found = []
+        for row in rows:
+            name = row["relname"]
+            try:
+                start = datetime.strptime(name.rsplit("_p", 1)[1], pattern).replace(tzinfo=timezone.utc)
+            except (IndexError, ValueError):
+                continue  # not one of ours
+            found.append((name, start))
+        return sorted(found, key=lambda item: item[1])
+
+    async def maintain(self, now=None):
+        """Creates the next ``premake`` partitions and drops those past the retention period."""
+        now = now or datetime.now(timezone.utc)
+        start = period_start(now, self.interval)
+        upcoming = {start}
+        for _ in range(self.premake):
+            start = next_period(start, self.interval)
+            upcoming.add(start)
+        await self._ensure_partitions(upcoming)
+
+        cutoff = now - self.retention
+        for name, start in await self.partitions():
+            if next_period(start, self.interval) <= cutoff:
+                await self.client.execute(f"DROP TABLE IF EXISTS {name}")
+                self._partitions.discard(start)
+                self.partitions_dropped += 1
+                logger.info("dropped expired partition %s", name)
+        self._last_maintenance = time.monotonic()
+
+    async def find(self, proof_id):
+        """Stored records for a proof id, newest first."""
+        return await self.client.fetch(
+            f"SELECT {', '.join(COLUMNS)} FROM {self.table} WHERE proof_id = $1 ORDER BY verified_at DESC",
+            str(proof_id))
+
+    def stats(self):
+        return {"buffered": len(self._buffer), "written": self.written, "flushes": self.flushes,
+                "errors": self.errors, "dropped_records": self.dropped_records,
+                "mean_copy_ms": round(1000 * self.copy_seconds / self.flushes, 3) if self.flushes else None,
+                "rows_per_s_in_copy": round(self.written / self.copy_seconds) if self.copy_seconds else None,
+                "partitions_ensured": self.partitions_ensured, "partitions_dropped": self.partitions_dropped}
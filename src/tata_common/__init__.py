@@ -0,0 +1 @@
+"""Code shared by the Tata AI Python services (src/tata-*)."""
@@ -0,0 +1,271 @@
+"""Cached, validated configuration loading with hot reload.
+
+Each config is looked up by name (``huggingface_config`` ->
+``huggingface_config.json``) in the config directories, parsed once and cached
+until the file changes. Layers are merged in order, later winning:
+
+1. the JSON file,
+2. ``TATA_<SECTION>__<KEY>[__<SUBKEY>...]`` entries in the ``.env`` file,
+3. the same keys in the process environment,
+
+where ``SECTION`` is the name without its ``_config`` suffix, e.g.
+``TATA_HUGGINGFACE__MODEL_REPO``. The merged result is validated against
+``configs/schemas/<name>.schema.json`` when one exists.
+
+Running services can ``subscribe()`` to a config and call ``start_watching()``;
+a background thread polls file mtimes and pushes validated reloads to the
+callbacks. An invalid edit is logged and the last good config is kept.
+"""
+import os
+import copy
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_CONFIG_DIRS = [os.path.join(PROJECT_DIR, "configs"), os.path.join(PROJECT_DIR, "config")]
+DEFAULT_SCHEMA_DIR = os.path.join(PROJECT_DIR, "configs", "schemas")
+# Written by scripts/generate_env.py; every reader of the env file uses this path
+DEFAULT_ENV_FILE = os.environ.get("TATA_ENV_FILE", os.path.join(PROJECT_DIR, "envs", ".env"))
+
+
+class ConfigError(Exception):
+    """Raised when a config file is missing, unreadable or fails validation."""
+
+
+def parse_env_file(path):
+    """Parses KEY=VALUE lines, skipping blanks and comments; missing files give {}."""
+    values = {}
+    if path and os.path.exists(path):
+        with open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                key, value = line.split("=", 1)
+                values[key.strip()] = value.strip().strip("'\"")
+    return values
+
+
+_TYPES = {
+    "object": dict, "array": list, "string": str, "boolean": bool,
+    "integer": int, "number": (int, float), "null": type(None),
+}
+
+
+def validate(data, schema, path="$"):
+    """Checks ``data`` against a JSON-schema subset (type, required, properties,
+    additionalProperties, items, enum, minimum, maximum) and returns a list of errors."""
+    errors = []
+    expected = schema.get("type")
+    if expected:
+        types = expected if isinstance(expected, list) else [expected]
+        ok = any(isinstance(data, _TYPES[t]) and not (t in ("integer", "number") and isinstance(data, bool))
+                 for t in types)
+        if not ok:
+            return [f"{path}: expected {' or '.join(types)}, got {type(data).__name__}"]
+    if "enum" in schema and data not in schema["enum"]:
+        errors.append(f"{path}: {data!r} is not one of {schema['enum']}")
+    if isinstance(data, (int, float)) and not isinstance(data, bool):
+        if "minimum" in schema and data < schema["minimum"]:
+            errors.append(f"{path}: {data} is below the minimum {schema['minimum']}")
+        if "maximum" in schema and data > schema["maximum"]:
+            errors.append(f"{path}: {data} is above the maximum {schema['maximum']}")
+    if isinstance(data, dict):
+        properties = schema.get("properties", {})
+        for key in schema.get("required", []):
+            if key not in data:
+                errors.append(f"{path}: missing required key {key!r}")
+        for key, value in data.items():
+            if key in properties:
+                errors.extend(validate(value, properties[key], f"{path}.{key}"))
+            elif schema.get("additionalProperties") is False:
+                errors.append(f"{path}: unexpected key {key!r}")
+            elif isinstance(schema.get("additionalProperties"), dict):
+                errors.extend(validate(value, schema["additionalProperties"], f"{path}.{key}"))
+    if isinstance(data, list) and "items" in schema:
+        for i, item in enumerate(data):
+            errors.extend(validate(item, schema["items"], f"{path}[{i}]"))
+    return errors
+
+
+def _coerce(value, schema):
+    """Converts an environment string to the type the schema expects."""
+    expected = (schema or {}).get("type")
+    try:
+        if expected == "integer":
+            return int(value)
+        if expected == "number":
+            return float(value)
+        if expected == "boolean":
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        if expected in ("object", "array"):
+            return json.loads(value)
+    except ValueError:
+        pass  # left as a string so validation reports it
+    return value
+
+
+def _deep_merge(base, override):
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _deep_merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+class ConfigLoader:
+    def __init__(self, config_dirs=None, schema_dir=DEFAULT_SCHEMA_DIR, env_file=DEFAULT_ENV_FILE,
+                 environ=None, prefix="TATA_"):
+        env_dirs = [os.environ["TATA_CONFIG_DIR"]] if os.environ.get("TATA_CONFIG_DIR") else []
+        self.config_dirs = list(config_dirs) if config_dirs is not None else env_dirs + DEFAULT_CONFIG_DIRS
+        self.schema_dir = schema_dir
+        self.env_file = env_file
+        self.environ = os.environ if environ is None else environ
+        self.prefix = prefix
+        self._cache = {}        # name -> (signature, config)
+        self._subscribers = {}  # name -> [callback]
+        self._lock = threading.RLock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def find(self, name):
+        filename = name if name.endswith(".json") else f"{name}.json"
+        for directory in self.config_dirs:
+            path = os.path.join(directory, filename)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def _schema_path(self, name):
+        return os.path.join(self.schema_dir, f"{name.removesuffix('.json')}.schema.json") if self.schema_dir else None
+
+    def _signature(self, name):
+        """(mtime_ns, size) of every file feeding this config; a change means reload."""
+        signature = []
+        for path in (self.find(name), self._schema_path(name), self.env_file):
+            try:
+                st = os.stat(path) if path else None
+                signature.append((path, st.st_mtime_ns, st.st_size) if st else (path, None, None))
+            except OSError:
+                signature.append((path, None, None))
+        return tuple(signature)
+
+    def _env_overrides(self, name, schema):
+        section = name.removesuffix(".json").removesuffix("_config").upper()
+        head = f"{self.prefix}{section}__"
+        layered = dict(parse_env_file(self.env_file))
+        layered.update(self.environ)
+        overrides = {}
+        for key, value in layered.items():
+            if not key.startswith(head):
+                continue
+            parts = [part.lower() for part in key[len(head):].split("__") if part]
+            node, node_schema = overrides, schema
+            for part in parts[:-1]:
+                node = node.setdefault(part, {})
+                node_schema = (node_schema or {}).get("properties", {}).get(part)
+            leaf_schema = (node_schema or {}).get("properties", {}).get(parts[-1]) if parts else None
+            if parts:
+                node[parts[-1]] = _coerce(value, leaf_schema)
+        return overrides
+
+    def _build(self, name):
+        path = self.find(name)
+        if path is None:
+            raise ConfigError(f"Config {name!r} not found in {self.config_dirs}")
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ConfigError(f"Cannot read {path}: {e}") from e
+        schema = None
+        schema_path = self._schema_path(name)
+        if schema_path and os.path.exists(schema_path):
+            with open(schema_path, "r") as f:
+                schema = json.load(f)
+        config = _deep_merge(data, self._env_overrides(name, schema))
+        if schema is not None:
+            errors = validate(config, schema)
+            if errors:
+                raise ConfigError(f"{path} is invalid: " + "; ".join(errors))
+        return config
+
+    def get(self, name):
+        """Returns a copy of the merged, validated config; parsed at most once per change."""
+        with self._lock:
+            signature = self._signature(name)
+            cached = self._cache.get(name)
+            if cached is None or cached[0] != signature:
+                cached = (signature, self._build(name))
+                self._cache[name] = cached
+            return copy.deepcopy(cached[1])
+
+    def subscribe(self, name, callback):
+        """Calls ``callback(config)`` now and after every valid change to the config."""
+        with self._lock:
+            self._subscribers.setdefault(name, []).append(callback)
+        callback(self.get(name))
+
+    def reload_if_changed(self):
+        """Reloads changed configs that have subscribers; returns the names that were pushed."""
+        reloaded = []
+        with self._lock:
+            names = [name for name in self._subscribers
+                     if name not in self._cache or self._cache[name][0] != self._signature(name)]
+        for name in names:
+            try:
+                config = self.get(name)
+            except ConfigError as e:
+                logger.error("Keeping previous %s: %s", name, e)
+                with self._lock:  # don't retry the same bad edit every poll
+                    if name in self._cache:
+                        self._cache[name] = (self._signature(name), self._cache[name][1])
+                continue
+            for callback in list(self._subscribers.get(name, [])):
+                try:
+                    callback(copy.deepcopy(config))
+                except Exception:
+                    logger.exception("Config subscriber for %s failed", name)
+            reloaded.append(name)
+        return reloaded
+
+    def start_watching(self, interval=1.0):
+        """Polls subscribed configs for changes in a daemon thread."""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.reload_if_changed()
+
+        self._watcher = threading.Thread(target=loop, name="tata-config-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._stop.set()
+            self._watcher.join()
+            self._watcher = None
+
+
+_default_loader = None
+
+
+def get_loader():
+    global _default_loader
+    if _default_loader is None:
+        _default_loader = ConfigLoader()
+    return _default_loader
+
+
+def load_config(name, default=None):
+    """Loads a config with the shared loader; returns ``default`` if it doesn't exist."""
+    loader = get_loader()
+    if default is not None and loader.find(name) is None:
+        return copy.deepcopy(default)
+    return loader.get(name)
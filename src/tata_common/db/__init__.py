@@ -0,0 +1,62 @@
+"""Shared async, pooled database clients for the Tata AI services.
+
+    from tata_common.db import get_client
+
+    pg = await get_client("postgres")            # POSTGRES_* from .env / environment
+    rows = await pg.fetch("SELECT * FROM decisions WHERE id = $1", 42)
+
+Drivers are imported only for the backends a service actually uses:
+asyncpg (postgres), motor (mongo), aiomysql (mysql), redis (redis).
+"""
+import asyncio
+import importlib
+
+from .config import DatabaseConfig, load_env
+from .metrics import PoolMetrics
+from .pool import PooledClient, PoolTimeout
+
+__all__ = ["DatabaseConfig", "PoolMetrics", "PoolTimeout", "PooledClient",
+           "close_all", "create_client", "get_client", "load_env", "pool_metrics"]
+
+_CLIENT_CLASSES = {
+    "postgres": ("postgres", "PostgresClient"),
+    "mongo": ("mongo", "MongoClient"),
+    "mysql": ("mysql", "MySQLClient"),
+    "redis": ("redis", "RedisClient"),
+}
+
+_clients = {}
+_lock = None
+
+
+def create_client(config):
+    """Returns an unconnected client for ``config.kind``."""
+    if config.kind not in _CLIENT_CLASSES:
+        raise ValueError(f"Unknown database kind: {config.kind!r}")
+    module_name, class_name = _CLIENT_CLASSES[config.kind]
+    module = importlib.import_module(f"{__name__}.{module_name}")
+    return getattr(module, class_name)(config)
+
+
+async def get_client(kind, prefix=None, env=None):
+    """Returns the process-wide connected client for a backend, creating it on first use."""
+    global _lock
+    if _lock is None:
+        _lock = asyncio.Lock()
+    key = (kind, (prefix or kind).upper())
+    async with _lock:
+        if key not in _clients:
+            client = create_client(DatabaseConfig.from_env(kind, prefix, env))
+            _clients[key] = await client.connect()
+        return _clients[key]
+
+
+async def close_all():
+    while _clients:
+        _, client = _clients.popitem()
+        await client.close()
+
+
+def pool_metrics():
+    """Metrics for every open client, keyed by "<kind>:<prefix>"."""
+    return {f"{kind}:{prefix}": client.stats() for (kind, prefix), client in _clients.items()}
@@ -0,0 +1,55 @@
+"""Database settings read from the generated .env file and the environment."""
+import os
+from dataclasses import dataclass, field
+
+from ..config import DEFAULT_ENV_FILE, parse_env_file
+
+# Default ports per backend, matching docker-compose.yml
+DEFAULT_PORTS = {"postgres": 5432, "mongo": 27017, "mysql": 3306, "redis": 6379}
+
+
+def load_env(path=DEFAULT_ENV_FILE):
+    """Parses KEY=VALUE lines; process environment variables take precedence."""
+    values = parse_env_file(path)
+    values.update(os.environ)
+    return values
+
+
+@dataclass
+class DatabaseConfig:
+    kind: str
+    host: str = "localhost"
+    port: int = 0
+    database: str = ""
+    user: str = ""
+    password: str = field(default="", repr=False)
+    pool_min: int = 1
+    pool_max: int = 10
+    acquire_timeout: float = 5.0
+    statement_cache_size: int = 256
+
+    @classmethod
+    def from_env(cls, kind, prefix=None, env=None):
+        """Builds a config from <PREFIX>_HOST, _PORT, _DB, _USER, _PASSWORD and _POOL_* keys.
+
+        The prefix defaults to the backend name, so Postgres reads the POSTGRES_* keys
+        generate_env.py writes; pass e.g. prefix="TATA_CORE_DB" for per-service settings.
+        """
+        env = load_env() if env is None else env
+        prefix = (prefix or kind).upper()
+
+        def get(name, default=""):
+            return env.get(f"{prefix}_{name}", default)
+
+        return cls(
+            kind=kind,
+            host=get("HOST", "localhost") or "localhost",
+            port=int(get("PORT", "") or DEFAULT_PORTS.get(kind, 0)),
+            database=get("DB", "") or get("DATABASE", "") or get("NAME", ""),
+            user=get("USER", ""),
+            password=get("PASSWORD", ""),
+            pool_min=int(get("POOL_MIN", "1")),
+            pool_max=int(get("POOL_MAX", "10")),
+            acquire_timeout=float(get("ACQUIRE_TIMEOUT", "5")),
+            statement_cache_size=int(get("STATEMENT_CACHE_SIZE", "256")),
+        )
@@ -0,0 +1,73 @@
+"""Pool checkout metrics and the adjustable limit used for health-aware sizing."""
+import asyncio
+import time
+
+
+class PoolMetrics:
+    """Counters for one pool: checkouts, wait time, in-use connections, timeouts and errors."""
+
+    def __init__(self):
+        self.acquired = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._window_wait = 0.0
+        self._window_acquired = 0
+
+    def observe_acquire(self, waited):
+        self.acquired += 1
+        self.in_use += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self._window_wait += waited
+        self._window_acquired += 1
+
+    def observe_release(self):
+        self.in_use -= 1
+
+    def take_window(self):
+        """Returns (checkouts, mean wait) since the previous call; used by the pool sizer."""
+        acquired, waited = self._window_acquired, self._window_wait
+        self._window_acquired, self._window_wait = 0, 0.0
+        return acquired, (waited / acquired if acquired else 0.0)
+
+    def snapshot(self):
+        return {
+            "acquired": self.acquired,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "mean_wait_ms": round(1000 * self.total_wait / self.acquired, 3) if self.acquired else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait, 3),
+        }
+
+
+class AdjustableLimiter:
+    """A semaphore whose limit can be raised or lowered while connections are checked out."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_use = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self, timeout):
+        start = time.perf_counter()
+        async with self._cond:
+            await asyncio.wait_for(self._cond.wait_for(lambda: self.in_use < self.limit), timeout)
+            self.in_use += 1
+        return time.perf_counter() - start
+
+    async def release(self):
+        async with self._cond:
+            self.in_use -= 1
+            self._cond.notify()
+
+    async def resize(self, limit):
+        async with self._cond:
+            self.limit = limit
+            self._cond.notify_all()
@@ -0,0 +1,30 @@
+"""Async MongoDB client on motor."""
+from contextlib import asynccontextmanager
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from .pool import PooledClient
+
+
+class MongoClient(PooledClient):
+    """motor pools sockets itself; checkouts hand out the configured database."""
+
+    kind = "mongo"
+
+    async def _open(self):
+        c = self.config
+        self.client = AsyncIOMotorClient(
+            host=c.host, port=c.port, username=c.user or None, password=c.password or None,
+            minPoolSize=c.pool_min, maxPoolSize=c.pool_max,
+            waitQueueTimeoutMS=int(c.acquire_timeout * 1000),
+        )
+
+    async def _close(self):
+        self.client.close()
+
+    @asynccontextmanager
+    async def _checkout(self):
+        yield self.client[self.config.database or "tata"]
+
+    async def _ping(self):
+        await self.client.admin.command("ping")
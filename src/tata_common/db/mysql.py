@@ -0,0 +1,45 @@
+"""Async MySQL client on an aiomysql pool."""
+import aiomysql
+
+from .pool import PooledClient
+
+
+class MySQLClient(PooledClient):
+    """aiomysql has no server-side prepared statements, so ``statement_cache_size``
+    does not apply here; pooling still removes the per-request connect."""
+
+    kind = "mysql"
+
+    async def _open(self):
+        c = self.config
+        self.pool = await aiomysql.create_pool(
+            host=c.host, port=c.port, user=c.user, password=c.password, db=c.database or None,
+            minsize=c.pool_min, maxsize=c.pool_max, autocommit=True,
+        )
+
+    async def _close(self):
+        self.pool.close()
+        await self.pool.wait_closed()
+
+    def _checkout(self):
+        return self.pool.acquire()
+
+    async def _ping(self):
+        async with self.pool.acquire() as conn:
+            await conn.ping(reconnect=False)
+
+    async def fetch(self, query, args=None):
+        async with self.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(query, args)
+                return await cur.fetchall()
+
+    async def execute(self, query, args=None):
+        async with self.acquire() as conn:
+            async with conn.cursor() as cur:
+                return await cur.execute(query, args)
+
+    async def executemany(self, query, args):
+        async with self.acquire() as conn:
+            async with conn.cursor() as cur:
+                return await cur.executemany(query, args)
@@ -0,0 +1,123 @@
+"""Base class for pooled async database clients."""
+import asyncio
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from .metrics import AdjustableLimiter, PoolMetrics
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out within the acquire timeout."""
+
+
+class PooledClient:
+    """Wraps a driver pool with checkout metrics and health-aware sizing.
+
+    The driver pool is opened at ``pool_max``; an adjustable limit in front of it
+    decides how many connections may be checked out at once. Every
+    ``sizing_interval`` seconds the backend is pinged: failures halve the limit so
+    a struggling database isn't hammered, while slow checkouts on a healthy backend
+    grow it back towards ``pool_max`` and idle pools shrink towards ``pool_min``.
+    """
+
+    kind = None
+    sizing_interval = 5.0
+    slow_wait = 0.05  # mean checkout wait (seconds) that triggers growth
+
+    def __init__(self, config):
+        self.config = config
+        self.metrics = PoolMetrics()
+        self.limiter = AdjustableLimiter(config.pool_max)
+        self.healthy = True
+        self._errors_seen = 0
+        self._sizer = None
+
+    async def connect(self):
+        await self._open()
+        self._sizer = asyncio.create_task(self._size_loop())
+        return self
+
+    async def close(self):
+        if self._sizer is not None:
+            self._sizer.cancel()
+            try:
+                await self._sizer
+            except asyncio.CancelledError:
+                pass
+            self._sizer = None
+        await self._close()
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Checks out a connection (or database handle), recording wait time and errors."""
+        start = time.perf_counter()
+        try:
+            await self.limiter.acquire(self.config.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            raise PoolTimeout(f"{self.kind}: no connection within {self.config.acquire_timeout}s") from None
+        try:
+            async with AsyncExitStack() as stack:
+                try:
+                    conn = await stack.enter_async_context(self._checkout())
+                except Exception:
+                    self.metrics.errors += 1  # only checkout failures, not errors in the caller's block
+                    raise
+                self.metrics.observe_acquire(time.perf_counter() - start)
+                try:
+                    yield conn
+                finally:
+                    self.metrics.observe_release()
+        finally:
+            await self.limiter.release()
+
+    async def ping(self):
+        try:
+            await asyncio.wait_for(self._ping(), self.config.acquire_timeout)
+            return True
+        except Exception:
+            return False
+
+    def stats(self):
+        return dict(self.metrics.snapshot(), limit=self.limiter.limit, healthy=self.healthy)
+
+    async def _size_loop(self):
+        while True:
+            await asyncio.sleep(self.sizing_interval)
+            await self.resize()
+
+    async def resize(self):
+        """One sizing step; see the class docstring."""
+        config = self.config
+        self.healthy = await self.ping()
+        new_errors = self.metrics.errors - self._errors_seen
+        self._errors_seen = self.metrics.errors
+        checkouts, mean_wait = self.metrics.take_window()
+        limit = self.limiter.limit
+        if not self.healthy or new_errors > checkouts // 2 > 0:
+            limit = max(config.pool_min, limit // 2)
+        elif mean_wait > self.slow_wait:
+            limit = min(config.pool_max, limit + max(1, limit // 4))
+        elif self.metrics.in_use < limit // 2:
+            limit = max(config.pool_min, limit - 1)
+        if limit != self.limiter.limit:
+            await self.limiter.resize(limit)
+
+    # Driver hooks
+    async def _open(self):
+        raise NotImplementedError
+
+    async def _close(self):
+        raise NotImplementedError
+
+    def _checkout(self):
+        raise NotImplementedError
+
+    async def _ping(self):
+        raise NotImplementedError
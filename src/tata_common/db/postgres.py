@@ -0,0 +1,55 @@
+"""Async PostgreSQL client on an asyncpg pool."""
+import asyncpg
+
+from .pool import PooledClient
+
+
+class PostgresClient(PooledClient):
+    """asyncpg keeps an LRU of prepared statements per connection
+    (``statement_cache_size``), so repeated queries skip parse/plan."""
+
+    kind = "postgres"
+
+    async def _open(self):
+        c = self.config
+        self.pool = await asyncpg.create_pool(
+            host=c.host, port=c.port, user=c.user or None, password=c.password or None,
+            database=c.database or None, min_size=c.pool_min, max_size=c.pool_max,
+            statement_cache_size=c.statement_cache_size,
+        )
+
+    async def _close(self):
+        await self.pool.close()
+
+    def _checkout(self):
+        return self.pool.acquire()
+
+    async def _ping(self):
+        async with self.pool.acquire() as conn:
+            await conn.fetchval("SELECT 1")
+
+    async def fetch(self, query, *args):
+        async with self.acquire() as conn:
+            return await conn.fetch(query, *args)
+
+    async def fetchrow(self, query, *args):
+        async with self.acquire() as conn:
+            return await conn.fetchrow(query, *args)
+
+    async def fetchval(self, query, *args):
+        async with self.acquire() as conn:
+            return await conn.fetchval(query, *args)
+
+    async def execute(self, query, *args):
+        async with self.acquire() as conn:
+            return await conn.execute(query, *args)
+
+    async def executemany(self, query, args):
+        async with self.acquire() as conn:
+            return await conn.executemany(query, args)
+
+    async def copy_records(self, table, records, columns=None, schema_name=None):
+        """Bulk-loads tuples with binary COPY ... FROM STDIN; far faster than INSERT per row."""
+        async with self.acquire() as conn:
+            return await conn.copy_records_to_table(table, records=records, columns=columns,
+                                                    schema_name=schema_name)
@@ -0,0 +1,31 @@
+"""Async Redis client on a redis.asyncio connection pool."""
+from contextlib import asynccontextmanager
+
+import redis.asyncio as aioredis
+
+from .pool import PooledClient
+
+
+class RedisClient(PooledClient):
+    """Commands borrow a pooled connection per call; checkouts hand out the client."""
+
+    kind = "redis"
+
+    async def _open(self):
+        c = self.config
+        self.pool = aioredis.ConnectionPool(
+            host=c.host, port=c.port, password=c.password or None, db=int(c.database or 0),
+            max_connections=c.pool_max, socket_connect_timeout=c.acquire_timeout,
+        )
+        self.client = aioredis.Redis(connection_pool=self.pool)
+
+    async def _close(self):
+        await self.client.aclose()
+        await self.pool.disconnect()
+
+    @asynccontextmanager
+    async def _checkout(self):
+        yield self.client
+
+    async def _ping(self):
+        await self.client.ping()
@@ -0,0 +1,59 @@
+"""Binary RPC between the Tata AI Python services.
+
+Calls are msgpack frames over one persistent TCP connection per peer; many
+calls share it concurrently, are pipelined without waiting for earlier
+replies, and carry their deadline so nested calls inherit what is left of it.
+
+    from tata_common.rpc import RpcServer, get_client
+
+    server = RpcServer("tata-memex")
+
+    @server.method()
+    async def recall(params):
+        return {"items": await search(params["query"])}
+
+    await server.serve_forever(port=6002)
+
+    memex = get_client("tata-memex")                       # TATA_RPC_TATA_MEMEX=host:port
+    result = await memex.call("recall", {"query": "..."}, timeout=0.5)
+
+Needs the msgpack package.
+"""
+from ..db.config import load_env
+from .client import RpcClient
+from .protocol import DeadlineExceeded, RpcError, remaining
+from .server import RpcServer
+
+__all__ = ["DeadlineExceeded", "RpcClient", "RpcError", "RpcServer", "close_all", "get_client",
+           "remaining", "rpc_address"]
+
+# By convention RPC ports sit 1000 above each service's HTTP port (500x). They are
+# not published in docker-compose.yml: containers on tata-network reach them by
+# service name, anything else sets TATA_RPC_<SERVICE>=host:port
+DEFAULT_PORTS = {"tata-core": 6001, "tata-memex": 6002, "tata-zkp": 6003, "tata-flow": 6004, "tata-moto": 6005}
+
+_clients = {}
+
+
+def rpc_address(service, env=None):
+    """(host, port) for a service from TATA_RPC_<SERVICE>=host:port, else its compose name."""
+    env = load_env() if env is None else env
+    service = service.lower()
+    value = env.get(f"TATA_RPC_{service.upper().replace('-', '_')}", "")
+    host, _, port = value.rpartition(":") if ":" in value else (value, "", "")
+    return host or service, int(port or DEFAULT_PORTS.get(service, 0))
+
+
+def get_client(service, env=None):
+    """Returns the process-wide client for a service; it connects on the first call."""
+    service = service.lower()
+    if service not in _clients:
+        host, port = rpc_address(service, env)
+        _clients[service] = RpcClient(host, port, name=service)
+    return _clients[service]
+
+
+async def close_all():
+    while _clients:
+        _, client = _clients.popitem()
+        await client.close()
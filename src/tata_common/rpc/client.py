@@ -0,0 +1,143 @@
+"""RPC client: one persistent connection per peer, multiplexed by message id."""
+import asyncio
+import itertools
+import time
+
+from .protocol import (CANCEL, DEADLINE_EXCEEDED, REQUEST, RESPONSE, DeadlineExceeded, RpcError,
+                       effective_timeout, encode, read_frame)
+
+# Only wait for the socket to drain once this much is buffered, so pipelined requests batch up
+WRITE_HIGH_WATER = 256 * 1024
+
+
+class RpcClient:
+    """Sends calls over a single connection without waiting for earlier replies.
+
+    Any number of coroutines can ``await client.call(...)`` at once; requests are
+    written back to back (pipelined) and matched to replies by id, in whatever
+    order the server finishes them. A dropped connection fails the calls in
+    flight with ConnectionError and is re-opened by the next call.
+    """
+
+    def __init__(self, host, port, name=None, connect_timeout=5.0):
+        self.host = host
+        self.port = port
+        self.name = name or f"{host}:{port}"
+        self.connect_timeout = connect_timeout
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._writer = None
+        self._reader_task = None
+        self._connect_lock = asyncio.Lock()
+        self.stats = {"calls": 0, "errors": 0, "timeouts": 0, "reconnects": 0, "in_flight": 0,
+                      "peak_in_flight": 0, "total_latency": 0.0}
+
+    @property
+    def connected(self):
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self):
+        async with self._connect_lock:
+            if self.connected:
+                return self
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port),
+                                                    self.connect_timeout)
+            if self._reader_task is not None:
+                self.stats["reconnects"] += 1
+            self._writer = writer
+            self._reader_task = asyncio.ensure_future(self._read_loop(reader))
+        return self
+
+    async def _read_loop(self, reader):
+        error = ConnectionError(f"connection to {self.name} closed")
+        try:
+            while True:
+                message = await read_frame(reader)
+                if message is None:
+                    break
+                if message[0] != RESPONSE:
+                    continue
+                _, msgid, err, result = message
+                future = self._pending.pop(msgid, None)
+                if future is None or future.done():
+                    continue  # the caller already gave up
+                if err is None:
+                    future.set_result(result)
+                elif err[0] == DEADLINE_EXCEEDED:
+                    future.set_exception(DeadlineExceeded(err[1]))
+                else:
+                    future.set_exception(RpcError(err[0], err[1]))
+        except (ConnectionError, RpcError) as e:
+            error = ConnectionError(f"connection to {self.name} failed: {e}")
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+            self._writer = None
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+
+    async def call(self, method, params=None, timeout=None):
+        """Calls ``method`` on the peer and returns its result.
+
+        ``timeout`` (seconds) is sent along as the request's deadline; when this
+        call is made while handling another RPC, it is capped by that request's
+        remaining budget, so deadlines propagate down a chain of services.
+        """
+        timeout = effective_timeout(timeout)
+        if timeout is not None and timeout <= 0:
+            self.stats["timeouts"] += 1
+            raise DeadlineExceeded(f"{method}: no time left")
+        if not self.connected:
+            await self.connect()
+        msgid = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[msgid] = future
+        budget_ms = None if timeout is None else int(timeout * 1000)
+        self._writer.write(encode([REQUEST, msgid, method, params, budget_ms]))
+        if self._writer.transport.get_write_buffer_size() > WRITE_HIGH_WATER:
+            await self._writer.drain()
+
+        stats = self.stats
+        stats["calls"] += 1
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            stats["timeouts"] += 1
+            self._cancel(msgid)
+            raise DeadlineExceeded(f"{method}: no reply within {timeout:.3f}s") from None
+        except asyncio.CancelledError:
+            self._cancel(msgid)
+            raise
+        except (RpcError, ConnectionError):
+            stats["errors"] += 1
+            raise
+        finally:
+            stats["in_flight"] -= 1
+            stats["total_latency"] += time.perf_counter() - start
+
+    def _cancel(self, msgid):
+        self._pending.pop(msgid, None)
+        if self.connected:
+            self._writer.write(encode([CANCEL, msgid]))
+
+    async def ping(self, timeout=1.0):
+        return await self.call("_ping", timeout=timeout) == "pong"
+
+    def snapshot(self):
+        stats = dict(self.stats)
+        latency = stats.pop("total_latency")
+        stats["mean_latency_ms"] = round(1000 * latency / stats["calls"], 3) if stats["calls"] else 0.0
+        stats["connected"] = self.connected
+        return stats
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+            self._reader_task = None
@@ -0,0 +1,80 @@
+"""Wire format, errors and deadline handling shared by the RPC client and server.
+
+Every message is a 4-byte big-endian length followed by a msgpack array:
+
+    [REQUEST,  msgid, method, params, budget_ms]   budget_ms is None for no deadline
+    [RESPONSE, msgid, error, result]               error is None or [code, message]
+    [CANCEL,   msgid]                              the caller stopped waiting
+
+Deadlines travel as a remaining budget rather than a wall-clock time, so hosts
+don't need synchronised clocks.
+"""
+import asyncio
+import contextvars
+import struct
+
+import msgpack
+
+REQUEST, RESPONSE, CANCEL = 0, 1, 2
+
+HEADER = struct.Struct(">I")
+
+# Refuse frames larger than this instead of buffering an unbounded message
+MAX_FRAME = 64 * 1024 * 1024
+
+# Error codes carried in responses
+UNKNOWN_METHOD = "unknown_method"
+DEADLINE_EXCEEDED = "deadline_exceeded"
+INTERNAL = "internal"
+CANCELLED = "cancelled"
+
+
+class RpcError(Exception):
+    """Raised by a call whose handler failed on the server; ``code`` says why."""
+
+    def __init__(self, code, message=""):
+        super().__init__(f"{code}: {message}" if message else code)
+        self.code = code
+        self.message = message
+
+
+class DeadlineExceeded(RpcError):
+    def __init__(self, message="deadline exceeded"):
+        super().__init__(DEADLINE_EXCEEDED, message)
+
+
+def encode(message):
+    body = msgpack.packb(message, use_bin_type=True)
+    return HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader):
+    """Returns the next decoded message, or None when the peer closed the connection."""
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+    (length,) = HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise RpcError(INTERNAL, f"frame of {length} bytes exceeds the {MAX_FRAME} byte limit")
+    return msgpack.unpackb(await reader.readexactly(length), raw=False)
+
+
+# Absolute deadline (event-loop time) of the request being handled in this task, if any
+_deadline = contextvars.ContextVar("tata_rpc_deadline", default=None)
+
+
+def remaining(loop=None):
+    """Seconds left before the current request's deadline, or None if it has none."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - (loop or asyncio.get_running_loop()).time())
+
+
+def effective_timeout(timeout):
+    """Caps an outgoing call's timeout by whatever budget the current request has left."""
+    left = remaining()
+    if left is None:
+        return timeout
+    return left if timeout is None else min(timeout, left)
@@ -0,0 +1,131 @@
+"""RPC server: one task per request, responses written as soon as each finishes."""
+import asyncio
+import inspect
+import logging
+
+from .protocol import (CANCEL, CANCELLED, DEADLINE_EXCEEDED, INTERNAL, REQUEST, RESPONSE, UNKNOWN_METHOD,
+                       RpcError, _deadline, encode, read_frame)
+
+logger = logging.getLogger(__name__)
+
+# Only wait for the socket to drain once this much is buffered, so small responses batch up
+WRITE_HIGH_WATER = 256 * 1024
+
+
+class RpcServer:
+    """Serves registered handlers over persistent connections.
+
+    Handlers are ``async def handler(params)`` (plain functions work too and run
+    inline). Requests on one connection run concurrently, so a slow call never
+    holds up the ones pipelined behind it. A handler's deadline is enforced
+    here and visible to nested calls through ``protocol.remaining()``.
+    """
+
+    def __init__(self, name="tata-rpc"):
+        self.name = name
+        self.handlers = {}
+        self.stats = {"requests": 0, "errors": 0, "deadline_exceeded": 0, "cancelled": 0, "connections": 0}
+        self._server = None
+        self._connections = set()
+        self.register("_ping", lambda params: "pong")
+
+    def register(self, method, handler):
+        self.handlers[method] = handler
+        return handler
+
+    def method(self, name=None):
+        """Decorator form of ``register``; the method name defaults to the function name."""
+        def decorator(handler):
+            return self.register(name or handler.__name__, handler)
+        return decorator
+
+    async def start(self, host="0.0.0.0", port=0):
+        self._server = await asyncio.start_server(self._serve_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self, host="0.0.0.0", port=0):
+        await self.start(host, port)
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _serve_connection(self, reader, writer):
+        self.stats["connections"] += 1
+        self._connections.add(writer)
+        tasks = {}
+        try:
+            while True:
+                try:
+                    message = await read_frame(reader)
+                except (ConnectionError, RpcError) as e:
+                    logger.warning("%s: dropping connection: %s", self.name, e)
+                    break
+                if message is None:
+                    break
+                if message[0] == REQUEST:
+                    _, msgid, method, params, budget_ms = message
+                    task = asyncio.ensure_future(self._handle(writer, msgid, method, params, budget_ms))
+                    tasks[msgid] = task
+                    task.add_done_callback(lambda _, msgid=msgid: tasks.pop(msgid, None))
+                elif message[0] == CANCEL and message[1] in tasks:
+                    tasks[message[1]].cancel()
+        finally:
+            for task in list(tasks.values()):
+                task.cancel()
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _handle(self, writer, msgid, method, params, budget_ms):
+        self.stats["requests"] += 1
+        loop = asyncio.get_running_loop()
+        error, result, cancelled = None, None, None
+        handler = self.handlers.get(method)
+        try:
+            if handler is None:
+                raise RpcError(UNKNOWN_METHOD, method)
+            if budget_ms is not None:
+                timeout = budget_ms / 1000
+                _deadline.set(loop.time() + timeout)
+                if timeout <= 0:
+                    raise asyncio.TimeoutError
+            else:
+                timeout = None
+            result = handler(params)
+            if inspect.isawaitable(result):
+                result = await asyncio.wait_for(result, timeout)
+        except asyncio.TimeoutError:
+            self.stats["deadline_exceeded"] += 1
+            error = [DEADLINE_EXCEEDED, method]
+        except asyncio.CancelledError as e:
+            self.stats["cancelled"] += 1
+            error = [CANCELLED, method]  # the client is no longer waiting; reply is best effort
+            cancelled = e
+        except RpcError as e:
+            self.stats["errors"] += 1
+            error = [e.code, e.message]
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.exception("%s: %s failed", self.name, method)
+            error = [INTERNAL, f"{type(e).__name__}: {e}"]
+        try:
+            if writer.is_closing():
+                return
+            try:
+                writer.write(encode([RESPONSE, msgid, error, None if error else result]))
+            except (TypeError, ValueError) as e:  # result msgpack can't encode
+                writer.write(encode([RESPONSE, msgid, [INTERNAL, f"unserializable result: {e}"], None]))
+            if writer.transport.get_write_buffer_size() > WRITE_HIGH_WATER:
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    pass
+        finally:
+            if cancelled is not None:
+                raise cancelled  # let whoever cancelled the task (e.g. shutdown) see it end
@@ -0,0 +1,198 @@
+"""Compiled ``{{placeholder}}`` rendering for JSON node-configuration templates.
+
+A template is parsed once and compiled into a flat plan of pre-encoded JSON
+text chunks and substitution slots, so rendering a node is a single join with
+no tree walking or re-serialisation of the constant parts. A string that is
+exactly ``"{{name}}"`` is replaced by the value itself (numbers, lists and
+objects keep their type); placeholders inside longer strings are interpolated
+as text.
+
+``render_batch`` fingerprints each node's template and values and skips
+outputs whose inputs are unchanged, so regenerating a large cluster only
+writes the configs that actually changed.
+"""
+import os
+import re
+import json
+import hashlib
+
+PLACEHOLDER = re.compile(r"{{\s*([A-Za-z0-9_.\-]+)\s*}}")
+
+# Matches the json.dump(..., indent=4) layout the existing scripts write
+INDENT = 4
+
+
+class TemplateError(Exception):
+    """Raised for unreadable templates or placeholders without a value."""
+
+
+class _Value:
+    """Slot for a string that is a single placeholder: emits the JSON value itself."""
+
+    __slots__ = ("name", "pad")
+
+    def __init__(self, name, level):
+        self.name = name
+        self.pad = "\n" + " " * (INDENT * level)
+
+    def render(self, values):
+        text = json.dumps(values[self.name], indent=INDENT, ensure_ascii=False)
+        return text.replace("\n", self.pad) if "\n" in text else text
+
+
+class _Text:
+    """Slot for a string with embedded placeholders: emits a JSON string."""
+
+    __slots__ = ("segments",)
+
+    def __init__(self, segments):
+        self.segments = segments  # alternating literal text and placeholder names
+
+    def render(self, values):
+        parts = self.segments[:]
+        for i in range(1, len(parts), 2):
+            value = values[parts[i]]
+            parts[i] = value if isinstance(value, str) else json.dumps(value)
+        return json.dumps("".join(parts), ensure_ascii=False)
+
+
+def _string_slot(text, level, names):
+    segments = PLACEHOLDER.split(text)
+    if len(segments) == 1:
+        return json.dumps(text, ensure_ascii=False)
+    names.update(segments[1::2])
+    if len(segments) == 3 and segments[0] == "" and segments[2] == "":
+        return _Value(segments[1], level)
+    return _Text(segments)
+
+
+def _compile(node, level, out, names):
+    pad = " " * (INDENT * (level + 1))
+    close = " " * (INDENT * level)
+    if isinstance(node, dict):
+        if not node:
+            out.append("{}")
+            return
+        out.append("{\n")
+        for i, (key, value) in enumerate(node.items()):
+            out.append(pad)
+            key_slot = _string_slot(key, level + 1, names)
+            out.append(key_slot if not isinstance(key_slot, _Value) else _Text(["", key_slot.name, ""]))
+            out.append(": ")
+            _compile(value, level + 1, out, names)
+            out.append(",\n" if i < len(node) - 1 else "\n")
+        out.append(close + "}")
+    elif isinstance(node, list):
+        if not node:
+            out.append("[]")
+            return
+        out.append("[\n")
+        for i, value in enumerate(node):
+            out.append(pad)
+            _compile(value, level + 1, out, names)
+            out.append(",\n" if i < len(node) - 1 else "\n")
+        out.append(close + "]")
+    elif isinstance(node, str):
+        out.append(_string_slot(node, level, names))
+    else:
+        out.append(json.dumps(node))
+
+
+class CompiledTemplate:
+    def __init__(self, template, source=None):
+        parts, names = [], set()
+        _compile(template, 0, parts, names)
+        # Merge adjacent literal chunks so rendering touches as few parts as possible
+        plan = []
+        for part in parts:
+            if isinstance(part, str) and plan and isinstance(plan[-1], str):
+                plan[-1] += part
+            else:
+                plan.append(part)
+        self.plan = plan
+        self.placeholders = frozenset(names)
+        self.source = source
+        self.digest = hashlib.sha256(json.dumps(template, sort_keys=True).encode()).hexdigest()
+
+    def render_text(self, values, strict=True):
+        missing = self.placeholders.difference(values)
+        if missing:
+            if strict:
+                raise TemplateError(f"{self.source or 'template'}: no value for {', '.join(sorted(missing))}")
+            values = dict(values, **{name: "{{%s}}" % name for name in missing})
+        return "".join(part if isinstance(part, str) else part.render(values) for part in self.plan) + "\n"
+
+    def render(self, values, strict=True):
+        return json.loads(self.render_text(values, strict))
+
+
+_compiled = {}
+
+
+def compile_template(path):
+    """Loads and compiles a template file, reusing the compiled plan until the file changes."""
+    try:
+        st = os.stat(path)
+    except OSError as e:
+        raise TemplateError(f"Cannot read template {path}: {e}") from e
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _compiled.get(path)
+    if cached is None or cached[0] != key:
+        try:
+            with open(path, "r") as f:
+                template = json.load(f)
+        except (OSError, ValueError) as e:
+            raise TemplateError(f"Cannot read template {path}: {e}") from e
+        cached = (key, CompiledTemplate(template, source=path))
+        _compiled[path] = cached
+    return cached[1]
+
+
+def node_values(node_name):
+    """Placeholders derived from a node name such as ``Universal.Tata-CORE.JB.5.0``."""
+    parts = node_name.split(".")
+    values = {"node_name": node_name}
+    if len(parts) >= 3:
+        values.update(node_scope=parts[0], node_type=parts[1], band=parts[2], version=".".join(parts[3:]))
+    return values
+
+
+def fingerprint(compiled, values):
+    payload = json.dumps(values, sort_keys=True, default=str).encode()
+    return hashlib.sha256(compiled.digest.encode() + b"\0" + payload).hexdigest()
+
+
+def render_batch(jobs, output_dir, manifest_name=".render_manifest.json", force=False, dry_run=False):
+    """Renders ``jobs`` ([(node_name, compiled_template, values), ...]) into output_dir.
+
+    Outputs whose template and values fingerprint matches the manifest (and which
+    still exist) are skipped. Writes are atomic. Returns {"written": [...], "unchanged": [...]}.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, manifest_name)
+    try:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    result = {"written": [], "unchanged": []}
+    for node_name, compiled, values in jobs:
+        output_path = os.path.join(output_dir, f"{node_name}.json")
+        digest = fingerprint(compiled, values)
+        if not force and manifest.get(node_name) == digest and os.path.exists(output_path):
+            result["unchanged"].append(output_path)
+            continue
+        text = compiled.render_text(values)
+        if not dry_run:
+            tmp_path = f"{output_path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(text)
+            os.replace(tmp_path, output_path)
+            manifest[node_name] = digest
+        result["written"].append(output_path)
+    if result["written"] and not dry_run:
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=INDENT, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+    return result
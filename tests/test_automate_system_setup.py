@@ -0,0 +1,62 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("cryptography")
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "scripts"))
+import automate_system_setup as setup
+from tata_common.config import parse_env_file
+from tata_common.db.config import DatabaseConfig
+
+
+def zkp_spec(encrypted_password=None):
+    return setup.DatabaseSpec("Tata-ZKP", "postgresql://localhost:5433", "tata-zkp_db", "tata-zkp_admin",
+                              encrypted_password)
+
+
+def test_plan_actions_returns_only_missing_steps():
+    assert setup.plan_actions({"database": False, "user": False, "privileges": False}) == list(setup.ACTIONS)
+    assert setup.plan_actions({"database": True, "user": False, "privileges": False}) == \
+        ["create_user", "grant_privileges"]
+    assert setup.plan_actions({"database": True, "user": True, "privileges": True}) == []
+
+
+def test_provisioning_saves_a_generated_password_once(tmp_path):
+    env_file = str(tmp_path / ".env")
+    with open(env_file, "w") as f:
+        f.write("POSTGRES_HOST=localhost\n")
+    backend = setup.SQLiteBackend(str(tmp_path / "dbs"))
+    backends = {"postgresql://localhost:5433": backend}
+    key = setup.generate_key()
+    try:
+        first = setup.provision([zkp_spec()], backends, key, save_password=setup.EnvFileWriter(env_file))
+        saved = parse_env_file(env_file)
+        # A re-run finds everything in place; a forced re-save replaces the keys
+        second = setup.provision([zkp_spec()], backends, key, save_password=setup.EnvFileWriter(env_file))
+        setup.EnvFileWriter(env_file)(zkp_spec(), "rotated")
+    finally:
+        backend.close()
+
+    assert first["Tata-ZKP"]["actions"] == list(setup.ACTIONS)
+    assert second["Tata-ZKP"]["actions"] == []
+    assert saved["POSTGRES_HOST"] == "localhost"
+    with open(env_file) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == len(set(line.split("=", 1)[0] for line in lines)) == 6
+    assert oct(os.stat(env_file).st_mode & 0o777) == "0o600"
+    config = DatabaseConfig.from_env("postgresql", prefix="TATA_ZKP_DB", env=saved)
+    assert (config.host, config.port, config.database, config.user) == \
+        ("localhost", 5433, "tata-zkp_db", "tata-zkp_admin")
+    assert config.password
+    assert parse_env_file(env_file)["TATA_ZKP_DB_PASSWORD"] == "rotated"
+
+
+def test_missing_password_without_a_saver_is_an_error(tmp_path):
+    backend = setup.SQLiteBackend(str(tmp_path))
+    try:
+        results = setup.provision([zkp_spec()], {"postgresql://localhost:5433": backend}, setup.generate_key())
+    finally:
+        backend.close()
+    assert "No password configured" in results["Tata-ZKP"]["error"]
@@ -0,0 +1,84 @@
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("reportlab")  # pulled in by the report renderer
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+import docker_container_report_generator as generator
+from docker_scan_cache import ScanCache
+
+WEB_ID = "abc123def4567890"
+WORKER_ID = "fed987cba6543210"
+
+
+def write_file(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+
+@pytest.fixture
+def fleet(tmp_path, monkeypatch):
+    # Two containers on one image: web added a config, worker grew one from the image
+    for rootfs in ("web", "worker"):
+        write_file(str(tmp_path / rootfs / "etc" / "base.conf"), 1024)
+        write_file(str(tmp_path / rootfs / "var" / "lib" / "app.db"), 4096)
+    write_file(str(tmp_path / "web" / "etc" / "app.conf"), 2048)
+    write_file(str(tmp_path / "worker" / "etc" / "base.conf"), 300 * 1024)
+    with open(tmp_path / "containers.json", "w") as f:
+        json.dump({
+            "images": {"sha256:img1": {"layers": ["sha256:l1", "sha256:l2"]}},
+            "containers": {
+                WEB_ID: {"name": "web", "image": "app:latest", "image_id": "sha256:img1", "rootfs": "web",
+                         "diff": [["C", "/etc"], ["A", "/etc/app.conf"]]},
+                WORKER_ID: {"name": "worker", "image": "app:latest", "image_id": "sha256:img1",
+                            "rootfs": "worker", "diff": [["C", "/etc"], ["C", "/etc/base.conf"]]},
+            },
+        }, f)
+    log_path = tmp_path / "docker.log"
+    monkeypatch.setenv("FAKE_DOCKER_ROOT", str(tmp_path))
+    monkeypatch.setenv("FAKE_DOCKER_LOG", str(log_path))
+    monkeypatch.setattr(generator, "docker_cmd", [sys.executable, os.path.join(SCRIPTS_DIR, "fake_docker.py")])
+    return tmp_path, log_path
+
+
+def run_report(cache_path, log_path):
+    """One report run with a cache loaded from disk; returns (details by name, docker calls)."""
+    if log_path.exists():
+        log_path.unlink()
+    cache = ScanCache(str(cache_path))
+    container_ids = generator.list_containers()
+    details = {name: (image, large, db, config) for name, image, large, db, config
+               in generator.collect_container_details(container_ids, workers=1, cache=cache)}
+    cache.prune(set(container_ids))
+    cache.save()
+    return details, log_path.read_text().splitlines()
+
+
+def full_scans(calls):
+    return [call for call in calls if call.startswith("exec") and " find / " in call]
+
+
+def test_second_run_reuses_the_scan_cache(fleet):
+    tmp_path, log_path = fleet
+    cache_path = tmp_path / "reports" / ".scan_cache.json"
+
+    first, first_calls = run_report(cache_path, log_path)
+    second, second_calls = run_report(cache_path, log_path)
+
+    # Only the first container is scanned in full; the other starts from the image baseline
+    assert len(full_scans(first_calls)) == 1
+    assert full_scans(second_calls) == []
+    assert second == first
+    assert first["web"][3] == [(2, "/etc/app.conf"), (1, "/etc/base.conf")]
+    assert first["worker"][3] == [(300, "/etc/base.conf")]
+    assert first["worker"][2] == [(4, "/var/lib/app.db")]
+
+
+def test_inspect_returns_the_containers_that_exist(fleet):
+    inspected = generator.inspect_containers([WEB_ID[:12], "missing"])
+    assert inspected[WEB_ID[:12]]["container_name"] == "web"
+    assert inspected["missing"] is None
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "tata-zkp"))
+from proof_store import ProofStore
+
+
+class SlowCopyClient:
+    """Stands in for the postgres client; COPY takes ``copy_delay`` seconds."""
+
+    def __init__(self, copy_delay):
+        self.copy_delay = copy_delay
+        self.rows = []
+
+    async def execute(self, query, *args):
+        return "OK"
+
+    async def fetch(self, query, *args):
+        return []
+
+    async def copy_records(self, table, records, columns=None, schema_name=None):
+        await asyncio.sleep(self.copy_delay)
+        self.rows.extend(records)
+
+
+def test_close_during_background_flush_writes_everything():
+    async def scenario():
+        client = SlowCopyClient(copy_delay=0.2)
+        store = await ProofStore(client, flush_interval=0.01).start()
+        for i in range(25):
+            await store.record(f"proof-{i}", circuit="balance_check", valid=True)
+        await asyncio.sleep(0.05)  # the loop is now inside COPY
+        await store.close()
+        return client, store
+
+    client, store = asyncio.run(scenario())
+    assert sorted(row[0] for row in client.rows) == sorted(f"proof-{i}" for i in range(25))
+    assert store.stats()["buffered"] == 0
+    assert store.dropped_records == 0
+
+
+def test_cancelled_flush_requeues_its_batch():
+    async def scenario():
+        client = SlowCopyClient(copy_delay=1.0)
+        store = ProofStore(client)
+        for i in range(10):
+            await store.record(f"proof-{i}", circuit="balance_check", valid=True)
+        flush = asyncio.create_task(store.flush())
+        await asyncio.sleep(0.05)
+        flush.cancel()
+        try:
+            await flush
+        except asyncio.CancelledError:
+            pass
+        return store
+
+    store = asyncio.run(scenario())
+    assert store.stats()["buffered"] == 10
+    assert store.errors == 0
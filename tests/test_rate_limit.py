@@ -0,0 +1,129 @@
+import asyncio
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "tata-flow"))
+from rate_limit import Limit, Limits, RateLimiter, RateLimitMiddleware
+
+
+class FakeRedisClient:
+    """Stands in for the redis_flow client; runs TOKEN_BUCKET_SCRIPT in Python."""
+
+    def __init__(self):
+        self.buckets = {}  # key -> [tokens, ts]
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    def register_script(self, source):
+        return self.run_script
+
+    async def run_script(self, keys, args, client=None):
+        await asyncio.sleep(0)
+        now = time.monotonic()
+        mode, params = args[0], [args[1 + i * 4:5 + i * 4] for i in range(len(keys))]
+        levels = []
+        for key, (rate, burst, want, give_back) in zip(keys, params):
+            tokens, ts = self.buckets.get(key, (burst, now))
+            levels.append(min(burst, tokens + max(0, now - ts) * rate + give_back))
+        admit = all(level >= want for level, (_, _, want, _) in zip(levels, params))
+        result = []
+        for key, level, (rate, burst, want, give_back) in zip(keys, levels, params):
+            granted = min(want, int(level)) if mode == "lease" else (want if admit else 0)
+            self.buckets[key] = (level - granted, now)
+            result.append((str(granted), str(level - granted)))
+        return result
+
+
+def test_burst_defaults_to_one_request_for_slow_rates():
+    limit = Limit.from_dict({"rate": 0.5})
+    assert limit.burst == 1
+    assert Limit.from_dict({"rate": 50}).burst == 50
+
+    async def scenario():
+        limiter = RateLimiter(FakeRedisClient(), Limits(limit), local=False)
+        first = await limiter.acquire("tenant-1", "tata-core:/decide")
+        second = await limiter.acquire("tenant-1", "tata-core:/decide")
+        await limiter.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first.allowed
+    assert not second.allowed and 1.5 < second.retry_after <= 2
+
+
+def test_middleware_answers_429_for_slow_rates():
+    limiter = RateLimiter(FakeRedisClient(), Limits.from_config({"default_tenant": {"rate": 0.5}}))
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def scenario():
+        middleware = RateLimitMiddleware(app, limiter, service="tata-core")
+        statuses = []
+        for _ in range(2):
+            sent = []
+
+            async def send(message):
+                sent.append(message)
+
+            await middleware({"type": "http", "path": "/decide", "headers": []}, None, send)
+            statuses.append(sent[0]["status"])
+        await limiter.close()
+        return statuses
+
+    assert asyncio.run(scenario()) == [200, 429]
+
+
+def test_leased_admissions_stay_within_the_bucket():
+    rate, burst = 200.0, 50.0
+    client = FakeRedisClient()
+
+    async def scenario():
+        limiters = [RateLimiter(client, Limits(Limit(rate, burst)), lease_ttl=0.05) for _ in range(3)]
+        admitted = 0
+        start = time.monotonic()
+
+        async def worker(limiter):
+            nonlocal admitted
+            while time.monotonic() - start < 0.3:
+                decision = await limiter.acquire("tenant-1", "tata-core:/decide")
+                if decision.allowed:
+                    admitted += 1
+                else:
+                    await asyncio.sleep(min(decision.retry_after, 0.005))
+
+        await asyncio.gather(*(worker(limiter) for limiter in limiters for _ in range(4)))
+        elapsed = time.monotonic() - start
+        for limiter in limiters:
+            await limiter.close()
+        return limiters, admitted, elapsed
+
+    limiters, admitted, elapsed = asyncio.run(scenario())
+    assert burst <= admitted <= burst + rate * elapsed + 1
+    assert all(limiter.stats()["leased_tokens"] == 0 for limiter in limiters)  # close() gave them back
+
+
+def test_leased_fast_path_admits_without_round_trips():
+    client = FakeRedisClient()
+
+    async def scenario():
+        limiter = RateLimiter(client, Limits(Limit(100000.0, 100000.0)))
+
+        async def worker():
+            for _ in range(250):
+                assert (await limiter.acquire("tenant-1", "tata-core:/decide")).allowed
+
+        await asyncio.gather(*(worker() for _ in range(8)))
+        stats = limiter.stats()
+        await limiter.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats["admitted"] == 2000
+    assert stats["round_trips"] < 100
+    assert stats["local_admits"] > 1800
@@ -0,0 +1,41 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("msgpack")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from tata_common.rpc import RpcClient, RpcError, RpcServer
+
+
+def test_cancelled_handler_replies_and_stays_cancelled():
+    async def scenario():
+        server = RpcServer("test")
+        started = asyncio.Event()
+
+        @server.method()
+        async def slow(params):
+            started.set()
+            await asyncio.sleep(10)
+
+        host, port = await server.start("127.0.0.1", 0)
+        client = RpcClient(host, port, name="test")
+        call = asyncio.ensure_future(client.call("slow", {}, timeout=5))
+        await started.wait()
+        handle = next(task for task in asyncio.all_tasks() if task.get_coro().__qualname__ == "RpcServer._handle")
+        handle.cancel()  # as a server shutting down would
+        try:
+            await call
+            reply = None
+        except RpcError as e:
+            reply = e
+        await asyncio.sleep(0)
+        await client.close()
+        await server.close()
+        return server, handle, reply
+
+    server, handler, reply = asyncio.run(scenario())
+    assert server.stats["cancelled"] == 1
+    assert reply is not None  # the caller was still told
+    assert handler.cancelled()